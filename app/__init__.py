@@ -12,13 +12,22 @@ from flask import (
     send_from_directory
 )
 
-from .utils.db import get_db, close_db, db_available
+from .extensions import scheduler
+from .utils.db import (
+    get_db, close_db, db_available, pool_stats,
+    pretranslate_dao_modules, translation_stats
+)
+from .commands import register_commands
+from .utils import query_log, identity, report_cache
+from .services import money, checkout_queue
+from .dao.auth_dao import get_user_identity
 from .api.auth import auth_bp
+from .api.lookup import lookup_bp
 from .views.manager.routes import manager_bp
 from .views.cashier.routes import cashier_bp
 
 
-def create_app() -> Flask:
+def create_app(test_config: dict | None = None) -> Flask:
     # ------------------------------------------------------------------
     # базове створення застосунку
     # ------------------------------------------------------------------
@@ -29,6 +38,9 @@ def create_app() -> Flask:
         template_folder='templates'
     )
     app.config.from_object('app.config.Config')
+    if test_config:
+        # перевизначення для бенчмарків / окремих запусків
+        app.config.update(test_config)
 
     # ------------------------------------------------------------------
     # налагодження та логування
@@ -60,22 +72,39 @@ def create_app() -> Flask:
     app.register_blueprint(auth_bp,    url_prefix='/auth')
     app.register_blueprint(manager_bp, url_prefix='/manager')
     app.register_blueprint(cashier_bp, url_prefix='/cashier')
+    app.register_blueprint(lookup_bp,  url_prefix='/api/lookup')
 
     # ------------------------------------------------------------------
-    # закриття БД після кожного запиту
+    # журнал запитів до БД: підсумок у заголовках, лог повільних
+    # ------------------------------------------------------------------
+    query_log.init_app(app)
+
+    # ------------------------------------------------------------------
+    # CLI-команди (flask rollups …)
+    # ------------------------------------------------------------------
+    register_commands(app)
+
+    # ------------------------------------------------------------------
+    # переклад SQL-літералів DAO один раз, а не на кожному запиті
+    # (лише для SQLite — PostgreSQL отримує діалект DAO як є)
+    # ------------------------------------------------------------------
+    if app.config.get('SQL_PRETRANSLATE') and app.config['DB_BACKEND'] == 'sqlite':
+        pretranslate_dao_modules()
+
+    # ------------------------------------------------------------------
+    # повернення з'єднання в пул після кожного запиту
     # ------------------------------------------------------------------
     @app.teardown_appcontext
     def teardown_db(exception=None):
         close_db()
     
     # ------------------------------------------------------------------
-    # автоматичне застосування акцій перед кожним запитом
+    # фоновий планувальник: акції застосовуються за розкладом
+    # (SCHEDULER_JOBS) і з DAO при зміні залишку/терміну, а не в запитах
     # ------------------------------------------------------------------
-    @app.before_request
-    def _auto_apply_promos():
-        # сервіс, що вмикає/вимикає акції та переоцінює товари
-        from app.services.promo_service import apply_promotions
-        apply_promotions()
+    if app.config.get('SCHEDULER_ENABLED') and not scheduler.running:
+        scheduler.init_app(app)
+        scheduler.start()
 
     # ------------------------------------------------------------------
     # поточний користувач у `g`
@@ -83,56 +112,38 @@ def create_app() -> Flask:
     @app.before_request
     def load_current_user():
         g.current_user = None
-        if 'user_id' in session:
-            conn = get_db()
-            if not conn:
-                # БД недоступна, пропускаємо
-                return
-            
+        if 'user_id' not in session:
+            return
+
+        user_id = session['user_id']
+        user = identity.get(user_id)
+        if user is None:
             try:
-                cur = conn.cursor()
-                cur.execute(
-                    """
-                    SELECT id, username, role, employee_id
-                      FROM auth_user
-                     WHERE id = %s
-                    """,
-                    (session['user_id'],)
-                )
-                row = cur.fetchone()
-                if row:
-                    # за замовчуванням виводимо username
-                    full_name = row[1]
-                    # якщо привʼязаний працівник — замінюємо на прізвище + ім'я
-                    if row[3]:
-                        cur.execute(
-                            """
-                            SELECT empl_surname, empl_name
-                              FROM Employee
-                             WHERE id_employee = %s
-                            """,
-                            (row[3],)
-                        )
-                        emp = cur.fetchone()
-                        if emp:
-                            full_name = f"{emp[0]} {emp[1]}"
-
-                    g.current_user = type(
-                        'User', (), {
-                            'id':       row[0],
-                            'username': row[1],
-                            'name':     full_name,
-                            'role':     row[2]
-                        }
-                    )
+                row = get_user_identity(user_id)
             except Exception as e:
                 print(f"[WARNING] Error loading user: {e}")
-            finally:
-                close_db(conn)
+                return
+            if not row:
+                return
+            # за замовчуванням виводимо username,
+            # якщо привʼязаний працівник — прізвище + ім'я
+            full_name = f"{row[4]} {row[5]}" if row[4] else row[1]
+            user = identity.CurrentUser(
+                id=row[0],
+                username=row[1],
+                name=full_name,
+                role=row[2],
+                employee_id=row[3]
+            )
+            identity.put(user, app.config['IDENTITY_TTL'])
+        g.current_user = user
 
     # ------------------------------------------------------------------
     # змінні доступні у всіх шаблонах
     # ------------------------------------------------------------------
+    # суми в копійках (app/services/money.py) → '1234.50'
+    app.add_template_filter(money.fmt, 'money')
+
     @app.context_processor
     def inject_globals():
         return {
@@ -163,7 +174,11 @@ def create_app() -> Flask:
         is_available = db_available()
         return {
             'available': is_available,
-            'message': 'База даних підключена' if is_available else 'База даних недоступна'
+            'message': 'База даних підключена' if is_available else 'База даних недоступна',
+            'pool': pool_stats(),
+            'sql_cache': translation_stats(),
+            'checkout': checkout_queue.writer_stats(),
+            'report_cache': report_cache.stats()
         }
 
     # ------------------------------------------------------------------
@@ -0,0 +1,44 @@
+"""
+JSON-автодоповнення для форм: товари (UPC або назва) та картки клієнтів.
+
+Відповіді обмежені LOOKUP_MAX_LIMIT записами й кешуються браузером
+на LOOKUP_MAX_AGE секунд, тож сторінки форм не вбудовують увесь каталог.
+"""
+
+from flask import Blueprint, jsonify, request, session, current_app
+
+from app.dao.product_dao       import lookup_products
+from app.dao.customer_card_dao import lookup_cards
+
+lookup_bp = Blueprint('lookup', __name__, url_prefix='/api/lookup')
+
+
+@lookup_bp.before_request
+def _require_login():
+    if 'user_id' not in session:
+        return jsonify(error='unauthorized'), 401
+
+
+def _limit() -> int:
+    cfg = current_app.config
+    limit = request.args.get('limit', cfg['LOOKUP_LIMIT'], type=int)
+    return max(1, min(limit, cfg['LOOKUP_MAX_LIMIT']))
+
+
+def _cached(payload):
+    resp = jsonify(payload)
+    resp.headers['Cache-Control'] = (
+        f"private, max-age={current_app.config['LOOKUP_MAX_AGE']}"
+    )
+    resp.vary.add('Cookie')
+    return resp
+
+
+@lookup_bp.route('/products')
+def products():
+    return _cached(lookup_products(request.args.get('q', ''), _limit()))
+
+
+@lookup_bp.route('/cards')
+def cards():
+    return _cached(lookup_cards(request.args.get('q', ''), _limit()))
@@ -0,0 +1,109 @@
+"""
+CLI-команди застосунку (`flask --app app <група> <команда>`).
+"""
+
+import time
+
+import click
+from flask.cli import AppGroup
+
+from app.dao.rollup_dao import rebuild_rollups, verify_rollups
+from app.dao.check_dao  import backfill_check_totals
+from app.utils.db       import wal_checkpoint
+from app.services       import datagen
+
+
+rollups_cli = AppGroup('rollups', help='Денні агрегати продажів.')
+
+
+@rollups_cli.command('rebuild')
+def rollups_rebuild():
+    """Перераховує агрегати з таблиць "check" та Sale."""
+    counts = rebuild_rollups()
+    for table, rows in counts.items():
+        click.echo(f"{table}: {rows} рядків")
+
+
+@rollups_cli.command('verify')
+def rollups_verify():
+    """Порівнює агрегати з «сирими» даними; код виходу 1 при розбіжностях."""
+    diff = verify_rollups()
+    for table, bad in diff.items():
+        click.echo(f"{table}: {'OK' if not bad else f'{bad} розбіжних рядків'}")
+    if any(diff.values()):
+        raise SystemExit(1)
+
+
+checks_cli = AppGroup('checks', help='Чеки.')
+
+
+@checks_cli.command('backfill-totals')
+@click.option('--batch-size', default=500, show_default=True, type=int)
+def checks_backfill_totals(batch_size):
+    """Заповнює subtotal / discount / vat / line_count старих чеків."""
+    click.echo(f"оновлено чеків: {backfill_check_totals(batch_size)}")
+
+
+db_cli = AppGroup('db', help='Обслуговування файлу SQLite.')
+
+
+@db_cli.command('checkpoint')
+@click.option('--mode', default='TRUNCATE', show_default=True,
+              type=click.Choice(['PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'],
+                                case_sensitive=False))
+def db_checkpoint(mode):
+    """Переносить WAL-журнал у файл БД (PRAGMA wal_checkpoint)."""
+    result = wal_checkpoint(mode)
+    click.echo(
+        f"{result['mode']}: сторінок у журналі {result['log']}, "
+        f"перенесено {result['checkpointed']}"
+        + (", БД зайнята" if result['busy'] else "")
+    )
+
+
+data_cli = AppGroup('data', help='Синтетичні дані для навантажувальних тестів.')
+
+
+@data_cli.command('generate')
+@click.option('--categories',     default=20,      show_default=True, type=int)
+@click.option('--products',       default=2000,    show_default=True, type=int)
+@click.option('--store-products', default=None,    type=int,
+              help='Партій у магазині (за замовчуванням = --products).')
+@click.option('--employees',      default=40,      show_default=True, type=int)
+@click.option('--cards',          default=5000,    show_default=True, type=int)
+@click.option('--lines',          default=100_000, show_default=True, type=int,
+              help='Скільки рядків Sale згенерувати.')
+@click.option('--days',           default=365,     show_default=True, type=int)
+@click.option('--end',            default=None,    type=click.DateTime(['%Y-%m-%d']),
+              help='Останній день історії (за замовчуванням сьогодні).')
+@click.option('--promo-ratio',    default=0.1,     show_default=True, type=float)
+@click.option('--card-ratio',     default=0.35,    show_default=True, type=float)
+@click.option('--seed',           default=42,      show_default=True, type=int)
+@click.option('--batch',          default=20_000,  show_default=True, type=int,
+              help='Чеків в одній транзакції.')
+def data_generate(categories, products, store_products, employees, cards,
+                  lines, days, end, promo_ratio, card_ratio, seed, batch):
+    """Дописує в БД відтворюваний (за --seed і --end) синтетичний магазин."""
+    started = time.perf_counter()
+
+    def progress(done):
+        elapsed = time.perf_counter() - started
+        click.echo(f"  Sale: {done:>10} / {lines}  ({done / elapsed:,.0f} рядків/с)")
+
+    counts = datagen.generate(
+        categories=categories, products=products,
+        store_products=store_products, employees=employees, cards=cards,
+        lines=lines, days=days, end=end.date() if end else None,
+        promo_ratio=promo_ratio, card_ratio=card_ratio,
+        seed=seed, batch=batch, progress=progress
+    )
+    for table, rows in counts.items():
+        click.echo(f"{table}: {rows}")
+    click.echo(f"готово за {time.perf_counter() - started:.1f} с")
+
+
+def register_commands(app) -> None:
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(checks_cli)
+    app.cli.add_command(db_cli)
+    app.cli.add_command(data_cli)
@@ -2,15 +2,97 @@ import os
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-key')
-    # рядок підключення до PostgreSQL
+    # бекенд БД за get_db(): 'sqlite' (один файл) або 'postgres' (psycopg_pool)
+    DB_BACKEND = os.environ.get('DB_BACKEND', 'sqlite')
+    # рядок підключення до PostgreSQL (DB_BACKEND = 'postgres')
     DB_URL = os.environ.get(
         'DATABASE_URL',
         'dbname=zlagoda user=postgres password=vladhulko2006'
     )
 
+    # файл SQLite та пул з'єднань (app/utils/db.py; розмір і тайм-аут — для обох бекендів)
+    SQLITE_PATH = os.environ.get(
+        'SQLITE_PATH',
+        os.path.join(os.path.dirname(__file__), 'zlagoda.db')
+    )
+    DB_POOL_SIZE             = int(os.environ.get('DB_POOL_SIZE', 8))
+    DB_POOL_TIMEOUT          = 5.0     # сек. очікування вільного з'єднання
+    DB_POOL_HEALTHCHECK_IDLE = 30.0    # сек. простою, після яких робимо SELECT 1
+    # окремий службовий пул get_dedicated_db (резерв блоків ID): викликач
+    # уже тримає з'єднання запиту й не має чекати на друге з того ж пулу
+    DB_AUX_POOL_SIZE         = 2
+    # PRAGMA, що виконуються один раз для кожного нового з'єднання (по порядку).
+    # WAL: читачі не чекають на коміт чека іншого касира, лише письменники
+    # стають у чергу один за одним.
+    DB_PRAGMAS = {
+        'busy_timeout': 5000,          # мс очікування блокування замість помилки
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous':  os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'cache_size':   -16000,        # ~16 МБ кешу сторінок на з'єднання
+        'mmap_size':    268435456,     # 256 МБ файлу БД читаються через mmap
+        'temp_store':   'MEMORY'       # тимчасові B-дерева сортувань — у пам'яті
+    }
+    # періодичний checkpoint WAL-журналу (задача планувальника нижче)
+    WAL_CHECKPOINT_MODE    = 'PASSIVE' # не чекає на активних читачів/письменників
+    WAL_CHECKPOINT_MINUTES = 5
+    # режими, дозволені для POST /manager/db/checkpoint; RESTART і TRUNCATE
+    # чекають на письменників — лише через `flask db checkpoint`
+    WAL_CHECKPOINT_HTTP_MODES = ('PASSIVE', 'FULL')
+
+    # журнал запитів до БД (app/utils/query_log.py)
+    QUERY_LOG_ENABLED = True
+    SLOW_QUERY_MS     = 100     # поріг «повільного» запиту (execute + вибірка), мс
+    QUERY_LOG_KEEP    = 50      # найповільніших записів у g.query_log на запит
+    QUERY_COUNT_WARN  = 50      # попередження, якщо за запит більше інструкцій
+
+    # скільки секунд тримати g.current_user у кеші (app/utils/identity.py)
+    IDENTITY_TTL = 300
+
+    # рядків на сторінці списків товарів (keyset-пагінація)
+    PRODUCTS_PAGE_SIZE = 50
+
+    # черга оформлення чеків з груповим комітом (app/services/checkout_queue.py)
+    CHECKOUT_QUEUE_ENABLED = True
+    CHECKOUT_QUEUE_SIZE    = 256     # замовлень у черзі, далі — CheckoutBusy
+    CHECKOUT_BATCH_MAX     = 32      # чеків в одній транзакції
+    CHECKOUT_BATCH_WAIT_MS = 5       # скільки чекати на «попутні» чеки
+    CHECKOUT_TIMEOUT       = 10.0    # сек. очікування результату касою
+
+    # розмір блоку ID, що процес резервує в id_sequence за раз
+    # (app/services/id_allocator.py); невикористаний залишок — пропуск у нумерації
+    ID_BLOCK_SIZES = {
+        'category': 1,
+        'product':  10,
+        'upc':      100,
+        'card':     50,
+        'check':    200,
+    }
+
+    # кеш важких звітів сторінки статистики (app/utils/report_cache.py)
+    REPORT_CACHE_ENABLED = True
+    REPORT_CACHE_SIZE    = 64       # записів (функція × аргументи), далі — LRU
+
+    # рядків на одну порцію fetchmany при вивантаженні CSV (app/dao/export_dao.py)
+    EXPORT_FETCH_SIZE = 1000
+
+    # JSON-автодоповнення (app/api/lookup.py)
+    LOOKUP_LIMIT     = 10       # записів у відповіді за замовчуванням
+    LOOKUP_MAX_LIMIT = 25       # верхня межа для ?limit=
+    LOOKUP_MAX_AGE   = 30       # сек. для Cache-Control: private, max-age
+
+    # перекласти SQL-літерали з app/dao при створенні застосунку
+    SQL_PRETRANSLATE = True
+
+    # фоновий планувальник (flask_apscheduler); вимикається для бенчмарків
+    SCHEDULER_ENABLED = True
     SCHEDULER_API_ENABLED = True
 
     SCHEDULER_JOBS = [
+        {
+            'id':       'auto_promotion_startup',
+            'func':     'app.services.auto_promotions:run_promotion',
+            'trigger':  'date'  # одноразово при старті (повний прохід)
+        },
         {
             'id':       'auto_promotion_job',
             'func':     'app.services.auto_promotions:run_promotion',
@@ -18,4 +100,10 @@ class Config:
             'hour':     0,      # запуск щодня о 00:00
             'minute':   0
         },
+        {
+            'id':       'wal_checkpoint_job',
+            'func':     'app.services.db_maintenance:run_wal_checkpoint',
+            'trigger':  'interval',
+            'minutes':  WAL_CHECKPOINT_MINUTES
+        },
     ]
\ No newline at end of file
@@ -1,4 +1,5 @@
 from app.utils.db import get_db, close_db
+from app.utils import identity
 
 def get_user_by_username(username):
     conn = get_db()
@@ -23,3 +24,25 @@ def create_user(username, password_hash, role, employee_id):
     )
     conn.commit()
     close_db(conn)
+    identity.invalidate(username=username, employee_id=employee_id)
+
+def get_user_identity(user_id):
+    """
+    Дані для g.current_user одним запитом:
+    (id, username, role, employee_id, empl_surname, empl_name) або None.
+    """
+    conn = get_db()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT u.id, u.username, u.role, u.employee_id,
+               e.empl_surname, e.empl_name
+          FROM auth_user     AS u
+          LEFT JOIN Employee AS e ON e.id_employee = u.employee_id
+         WHERE u.id = %s
+        """,
+        (user_id,)
+    )
+    row = cur.fetchone()
+    close_db(conn)
+    return row
@@ -4,6 +4,8 @@ DAO-рівень для таблиці Category.
 
 from typing import List, Dict, Any
 from app.utils.db import get_db, close_db
+from app.utils import report_cache
+from app.services.id_allocator import next_category_number
 
 
 # ─────────────────────────── CREATE ────────────────────────────
@@ -11,14 +13,14 @@ def create_category(name: str) -> int:
     """
     Створює нову категорію й повертає її category_number.
     """
+    new_id = next_category_number()
     conn = get_db()
     cur = conn.cursor()
-    cur.execute("SELECT COALESCE(MAX(category_number), 0) + 1 FROM Category")
-    new_id = cur.fetchone()[0]
     cur.execute(
         "INSERT INTO Category (category_number, category_name) VALUES (%s, %s)",
         (new_id, name)
     )
+    report_cache.bump(cur, 'category')
     conn.commit()
     close_db(conn)
     return new_id
@@ -73,8 +75,10 @@ def update_category(cat_id: int, name: str) -> bool:
         "UPDATE Category SET category_name=%s WHERE category_number=%s",
         (name, cat_id)
     )
-    conn.commit()
     updated = cur.rowcount > 0
+    if updated:
+        report_cache.bump(cur, 'category')
+    conn.commit()
     close_db(conn)
     return updated
 
@@ -84,7 +88,9 @@ def delete_category(cat_id: int) -> bool:
     conn = get_db()
     cur  = conn.cursor()
     cur.execute("DELETE FROM Category WHERE category_number=%s", (cat_id,))
-    conn.commit()
     deleted = cur.rowcount > 0
+    if deleted:
+        report_cache.bump(cur, 'category')
+    conn.commit()
     close_db(conn)
     return deleted
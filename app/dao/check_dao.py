@@ -4,13 +4,23 @@ DAO-рівень для таблиць "check" та Sale.
 деталі окремого чеку.
 """
 
-import uuid
 from datetime import datetime, date
-from decimal   import Decimal, ROUND_HALF_UP
+from decimal   import Decimal
 from collections import defaultdict
 from typing    import List, Dict, Any
 
 from app.utils.db import get_db, close_db
+from app.utils.sql import date_range, kopecks
+from app.utils import report_cache
+from app.services.money import to_kop, to_db, basket_totals
+from app.services.id_allocator import next_check_number
+from app.services.promo_service import refresh_promotions
+from app.dao.rollup_dao import (
+    add_check_to_rollups, remove_check_from_rollups
+)
+
+# таблиці (покоління report_generation), які змінює write_check
+CHECK_TABLES = ('check', 'sale', 'store_product')
 
 
 def _format_datetime(value):
@@ -22,110 +32,278 @@ def _format_datetime(value):
     return str(value)
 
 
+def _placeholders(n: int) -> str:
+    """'%s, %s, …' для списку з n значень (WHERE … IN (…))."""
+    return ", ".join(["%s"] * n)
+
+
 # ────────────────────────────── CREATE ──────────────────────────────
 def create_check(check_number: str | None,
                  employee_id: str,
                  card_number: str | None,
                  sales: List[Dict[str, Any]]) -> str:
     """
-    Створює чек разом із рядками Sale й одразу зменшує залишок у Store_Product.
-
-    sales = [{'upc': '123456789012', 'qty': 2}, …]
-
-    * Агрегує однакові UPC, перевіряє, що qty ≤ залишок.
-    * Рахує підсумок, знижку (% поля percent у Customer_Card), VAT=20 %.
-    * У sum_total записує суму ДО СПЛАТИ.
-    * Повертає номер чека (згенерує, якщо None).
-    * Кидає ValueError(HTML-рядок), якщо є помилки залишку чи відсутній товар.
+    Створює чек в окремій транзакції (див. write_check) і комітить її.
+    Повертає номер чека; ValueError(HTML-рядок) — якщо не вистачає товару.
     """
     if not check_number:
-        check_number = uuid.uuid4().hex[:10]
-
-    # ── агрегуємо однакові UPC ────────────────────────────────────────
-    aggregated: dict[str, int] = defaultdict(int)
-    for item in sales:
-        aggregated[item['upc']] += int(item['qty'])
-    sales_agg = [{'upc': u, 'qty': q} for u, q in aggregated.items()]
-
+        check_number = next_check_number()
     conn = get_db()
     cur  = conn.cursor()
+    try:
+        write_check(cur, check_number, employee_id, card_number, sales)
+    except ValueError:
+        conn.rollback()
+        close_db(conn)
+        raise
+    report_cache.bump(cur, *CHECK_TABLES)
+    conn.commit()
+    close_db(conn)
+    return check_number
 
-    # ── відсоток знижки за карткою клієнта ────────────────────────────
-    discount_percent = Decimal('0')
-    if card_number:
-        cur.execute("SELECT percent FROM Customer_Card WHERE card_number=%s",
-                    (card_number,))
-        row = cur.fetchone()
-        if row:
-            discount_percent = Decimal(row[0]).quantize(Decimal('1'))
+# скільки разів перечитувати залишок, якщо умовне списання не вдалося
+STOCK_RETRIES = 3
 
-    # ── перевірка залишків + subtotal ─────────────────────────────────
-    errors   = []
-    subtotal = Decimal('0.00')
 
+def _read_stock(cur, sales_agg) -> dict[str, tuple[int, int]]:
+    """
+    Ціни (у копійках) і залишки позицій кошика одним запитом:
+    {UPC: (ціна, залишок)}. ValueError(HTML), якщо товару нема чи не вистачає.
+    """
+    upcs = [item['upc'] for item in sales_agg]
+    cur.execute(
+        "SELECT UPC, selling_price, products_number "
+        f"FROM Store_Product WHERE UPC IN ({_placeholders(len(upcs))})",
+        upcs
+    )
+    stock = {r[0]: (to_kop(r[1]), r[2]) for r in cur.fetchall()}
+
+    errors = []
     for item in sales_agg:
-        cur.execute(
-            "SELECT selling_price, products_number "
-            "FROM Store_Product WHERE UPC=%s",
-            (item['upc'],)
-        )
-        row = cur.fetchone()
+        row = stock.get(item['upc'])
         if row is None:
             errors.append(f"Товар <strong>{item['upc']}</strong> не існує.")
             continue
 
-        price, stock = row
-        if item['qty'] > stock:
+        price, left = row
+        if item['qty'] > left:
             errors.append(
-                f"Для <strong>{item['upc']}</strong> доступно {stock}, "
+                f"Для <strong>{item['upc']}</strong> доступно {left}, "
                 f"запитано {item['qty']}."
             )
-        subtotal += (price * item['qty']).quantize(Decimal('0.01'))
 
     if errors:
-        conn.rollback()
-        close_db(conn)
         raise ValueError("<br>".join(errors))
+    return stock
+
+
+def _reserve_stock(cur, sales_agg) -> bool:
+    """
+    Умовне списання всього кошика одним UPDATE: рядок зменшується, лише
+    якщо products_number >= qty, тож залишок ніколи не стає від'ємним
+    і ексклюзивне блокування на час оформлення не потрібне.
+
+    Якщо списалися не всі позиції (кількість рядків RETURNING менша за
+    кошик), уже списане повертається назад і результат — False.
+    """
+    upcs  = [item['upc'] for item in sales_agg]
+    cases = " ".join(["WHEN %s THEN %s"] * len(sales_agg))
+    qty_params: list = []
+    for item in sales_agg:
+        qty_params += [item['upc'], item['qty']]
+
+    cur.execute(
+        "UPDATE Store_Product "
+        f"SET products_number = products_number - CASE UPC {cases} END "
+        f"WHERE UPC IN ({_placeholders(len(upcs))}) "
+        f"AND products_number >= CASE UPC {cases} END "
+        "RETURNING UPC",
+        qty_params + upcs + qty_params
+    )
+    reserved = [r[0] for r in cur.fetchall()]
+    if len(reserved) == len(sales_agg):
+        return True
+
+    if reserved:
+        cur.execute(
+            "UPDATE Store_Product "
+            f"SET products_number = products_number + CASE UPC {cases} END "
+            f"WHERE UPC IN ({_placeholders(len(reserved))})",
+            qty_params + reserved
+        )
+    return False
+
+
+def write_check(cur,
+                check_number: str,
+                employee_id: str,
+                card_number: str | None,
+                sales: List[Dict[str, Any]]) -> str:
+    """
+    Створює чек разом із рядками Sale й одразу зменшує залишок у Store_Product
+    у поточній транзакції курсора; коміт і відкат — справа викликача
+    (create_check або черга app/services/checkout_queue.py).
+
+    sales = [{'upc': '123456789012', 'qty': 2}, …]
+
+    * Агрегує однакові UPC, перевіряє, що qty ≤ залишок, і списує залишок
+      умовно (_reserve_stock) з повтором при гонці з іншою касою.
+    * Рахує підсумок, знижку (% поля percent у Customer_Card), VAT=20 %
+      у цілих копійках (app/services/money.py).
+    * У sum_total записує суму ДО СПЛАТИ, поруч — subtotal, discount, vat
+      і line_count, щоб перегляд чека їх не перераховував.
+    * Повертає номер чека; його видає викликач (next_check_number) ще до
+      транзакції, бо резерв блоку номерів пише в id_sequence окремим
+      з'єднанням і на SQLite чекав би на блокування запису цієї транзакції.
+    * Кидає ValueError(HTML-рядок), якщо є помилки залишку чи відсутній товар.
+    """
+    # ── агрегуємо однакові UPC ────────────────────────────────────────
+    aggregated: dict[str, int] = defaultdict(int)
+    for item in sales:
+        aggregated[item['upc']] += int(item['qty'])
+    sales_agg = [{'upc': u, 'qty': q} for u, q in aggregated.items()]
+
+    # ── відсоток знижки за карткою клієнта ────────────────────────────
+    discount_percent = 0
+    if card_number:
+        cur.execute("SELECT percent FROM Customer_Card WHERE card_number=%s",
+                    (card_number,))
+        row = cur.fetchone()
+        if row:
+            discount_percent = int(row[0])
+
+    # ── ціни й залишки → умовне списання; якщо між читанням і списанням
+    #    залишок змінила інша каса — читаємо заново (не більше STOCK_RETRIES)
+    upcs = list(aggregated)
+    for _ in range(STOCK_RETRIES):
+        stock = _read_stock(cur, sales_agg)
+        if _reserve_stock(cur, sales_agg):
+            break
+    else:
+        raise ValueError("Залишок цих товарів саме змінюють інші каси, "
+                         "спробуйте ще раз.")
 
     # ── підсумки (знижка, VAT, до сплати) ────────────────────────────
-    discount = (subtotal * discount_percent / 100).quantize(Decimal('0.01'))
-    taxable  = subtotal - discount
-    vat      = (taxable * Decimal('0.20')).quantize(Decimal('0.01'))
-    payable  = (taxable + vat).quantize(Decimal('0.01'), ROUND_HALF_UP)
+    totals = basket_totals(
+        [stock[item['upc']][0] for item in sales_agg],
+        [item['qty'] for item in sales_agg],
+        discount_percent
+    )
 
     # ── шапка чека ────────────────────────────────────────────────────
     cur.execute(
         """
         INSERT INTO "check"
-              (check_number, id_employee, card_number, print_date, sum_total)
-        VALUES (%s,%s,%s,%s,%s)
+              (check_number, id_employee, card_number, print_date, sum_total,
+               subtotal, discount, vat, line_count)
+        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
         """,
-        (check_number, employee_id, card_number, datetime.now(), payable)
+        (check_number, employee_id, card_number, datetime.now(),
+         to_db(totals.total), to_db(totals.subtotal), to_db(totals.discount),
+         to_db(totals.vat), totals.lines)
     )
 
-    # ── рядки Sale + оновлення залишку ────────────────────────────────
-    for item in sales_agg:
-        cur.execute(
-            """
-            INSERT INTO Sale
-                  (UPC, check_number, product_number, selling_price)
-            VALUES (
-                %s, %s, %s,
-                (SELECT selling_price FROM Store_Product WHERE UPC=%s)
-            )
-            """,
-            (item['upc'], check_number, item['qty'], item['upc'])
-        )
+    # ── рядки Sale за вже прочитаними цінами ──────────────────────────
+    cur.executemany(
+        """
+        INSERT INTO Sale
+              (UPC, check_number, product_number, selling_price)
+        VALUES (%s, %s, %s, %s)
+        """,
+        [(item['upc'], check_number, item['qty'], to_db(stock[item['upc']][0]))
+         for item in sales_agg]
+    )
+
+    # залишок змінився — акційність могла перемкнутися
+    refresh_promotions(cur, upcs)
+
+    # ── денні агрегати в тій самій транзакції ─────────────────────────
+    add_check_to_rollups(cur, check_number)
+
+    return check_number
+
+
+# ─────────────────────── Збережені підсумки чека ───────────────────────
+def store_check_totals(cur, check_numbers, with_total: bool = False) -> int:
+    """
+    Перераховує subtotal / discount / vat / line_count за рядками Sale
+    (тими самими правилами, що й create_check) і записує їх у "check".
+    З with_total=True тим самим UPDATE перезаписує й sum_total (до сплати) —
+    коли склад чека змінився (sale_dao.delete_sale); інакше sum_total,
+    тобто фактично сплачена сума, лишається як є (backfill_check_totals).
+    Працює в транзакції викликача. Повертає кількість оновлених чеків.
+    """
+    check_numbers = list(check_numbers)
+    if not check_numbers:
+        return 0
+    in_list = _placeholders(len(check_numbers))
+
+    cur.execute(
+        f"""
+        SELECT c.check_number, COALESCE(cc.percent, 0)
+          FROM "check" AS c
+          LEFT JOIN Customer_Card AS cc ON cc.card_number = c.card_number
+         WHERE c.check_number IN ({in_list})
+        """,
+        check_numbers
+    )
+    percents = {r[0]: int(r[1]) for r in cur.fetchall()}
+
+    cur.execute(
+        f"""
+        SELECT check_number, selling_price, product_number
+          FROM Sale
+         WHERE check_number IN ({in_list})
+        """,
+        check_numbers
+    )
+    lines: dict[str, tuple[list, list]] = {n: ([], []) for n in percents}
+    for number, price, qty in cur.fetchall():
+        prices, qtys = lines[number]
+        prices.append(to_kop(price))
+        qtys.append(qty)
+
+    rows = []
+    for number, (prices, qtys) in lines.items():
+        t = basket_totals(prices, qtys, percents[number])
+        total = (to_db(t.total),) if with_total else ()
+        rows.append((*total, to_db(t.subtotal), to_db(t.discount),
+                     to_db(t.vat), t.lines, number))
+    cur.executemany(
+        f"""
+        UPDATE "check"
+           SET {"sum_total = %s, " if with_total else ""}subtotal = %s,
+               discount = %s, vat = %s, line_count = %s
+         WHERE check_number = %s
+        """,
+        rows
+    )
+    return len(rows)
+
+
+def backfill_check_totals(batch_size: int = 500) -> int:
+    """
+    Разове заповнення підсумків для чеків, створених до їх збереження
+    (subtotal IS NULL). Комітить пачками по batch_size чеків.
+    Знижка рахується за поточним відсотком картки клієнта.
+    Повертає кількість оброблених чеків.
+    """
+    conn = get_db()
+    cur  = conn.cursor()
+    done = 0
+    while True:
         cur.execute(
-            "UPDATE Store_Product "
-            "SET products_number = products_number - %s "
-            "WHERE UPC=%s",
-            (item['qty'], item['upc'])
+            'SELECT check_number FROM "check" WHERE subtotal IS NULL LIMIT %s',
+            (batch_size,)
         )
-
-    conn.commit()
+        numbers = [r[0] for r in cur.fetchall()]
+        if not numbers:
+            break
+        done += store_check_totals(cur, numbers)
+        report_cache.bump(cur, 'check')
+        conn.commit()
     close_db(conn)
-    return check_number
+    return done
 
 
 # ─────────────────────── Списки чеків (із сортуванням) ──────────────────────
@@ -152,24 +330,22 @@ def get_checks_by_employee_period(employee_id: str,
                                   sort_by: str = 'date',
                                   order:   str = 'desc'):
     """
-    Чеки касира у межах [date_from; date_to] (включно) + сортування.
+    Чеки касира у межах [date_from; date_to] (включно) + сортування;
+    total — у копійках.
     """
     sort_col   = _VALID_COLS.get(sort_by, _VALID_COLS['date'])
     sort_order = 'ASC' if order.lower() == 'asc' else 'DESC'
 
     sql = [
-        'SELECT check_number, print_date, sum_total',
+        f'SELECT check_number, print_date, {kopecks("sum_total")}',
         'FROM "check"',
         'WHERE id_employee = %s'
     ]
     params = [employee_id]
 
-    if date_from:
-        sql.append('AND DATE(print_date) >= %s')
-        params.append(date_from)
-    if date_to:
-        sql.append('AND DATE(print_date) <= %s')
-        params.append(date_to)
+    where, period = date_range('print_date', date_from, date_to)
+    sql += ['AND ' + w for w in where]
+    params += period
 
     sql.append(f'ORDER BY {sort_col} {sort_order}')
 
@@ -183,7 +359,7 @@ def get_checks_by_employee_period(employee_id: str,
         {
             "number": r[0],
             "date":   _format_datetime(r[1]),
-            "total":  float(r[2])
+            "total":  r[2]
         } for r in rows
     ]
 
@@ -208,7 +384,10 @@ def get_check_details(check_number: str) -> Dict[str, Any] | None:
                 c.sum_total,
                 e.empl_surname || ' ' || e.empl_name AS cashier,
                 cc.card_number,
-                COALESCE(cc.percent,0)              AS discount_percent
+                COALESCE(cc.percent,0)              AS discount_percent,
+                c.subtotal,
+                c.discount,
+                c.vat
         FROM "check"        AS c
         JOIN Employee       AS e  ON e.id_employee = c.id_employee
         LEFT JOIN Customer_Card AS cc USING(card_number)
@@ -224,7 +403,7 @@ def get_check_details(check_number: str) -> Dict[str, Any] | None:
     header = {
         "number":  head[0],
         "date":    _format_datetime(head[1]),
-        "total":   float(head[2]),
+        "total":   to_kop(head[2]),
         "cashier": head[3],
         "card":    head[4],
         "disc":    int(head[5])
@@ -247,33 +426,42 @@ def get_check_details(check_number: str) -> Dict[str, Any] | None:
     rows = cur.fetchall()
     close_db(conn)
 
-    items = [
-        {
-            "upc":   r[0],
-            "name":  r[1],
-            "qty":   r[2],
-            "price": float(r[3]),
-            "total": float(r[3] * r[2])
-        } for r in rows
-    ]
-
-    subtotal = sum(i["total"] for i in items)
-    discount = subtotal * header["disc"] / 100
-    taxable  = subtotal - discount
-    vat      = taxable * 0.20
-
-    header.update({
-        "subtotal": round(subtotal, 2),
-        "discount": round(discount, 2),
-        "vat":      round(vat, 2)
-    })
+    # суми — у копійках (шаблон форматує фільтром |money)
+    items = []
+    for upc, name, qty, price in rows:
+        price = to_kop(price)
+        items.append({
+            "upc":   upc,
+            "name":  name,
+            "qty":   qty,
+            "price": price,
+            "total": price * qty
+        })
+
+    if head[6] is not None:
+        # підсумки, збережені create_check, — саме те, що сплатили
+        header.update({
+            "subtotal": to_kop(head[6]),
+            "discount": to_kop(head[7]),
+            "vat":      to_kop(head[8])
+        })
+    else:
+        # чек ще без збережених підсумків (до backfill_check_totals)
+        totals = basket_totals([i["price"] for i in items],
+                               [i["qty"] for i in items],
+                               header["disc"])
+        header.update({
+            "subtotal": totals.subtotal,
+            "discount": totals.discount,
+            "vat":      totals.vat
+        })
 
     return {"header": header, "items": items}
 # ─────────────────────── СПИСОК УСІХ ЧЕКІВ ────────────────────────
 def get_all_checks(sort_by: str = 'date',
                    order: str   = 'desc') -> list[dict]:
     """
-    Повертає простий список чеків (для звіту).
+    Повертає простий список чеків (для звіту); total — у копійках.
     """
     cols = {
         'number': 'check_number',
@@ -287,7 +475,7 @@ def get_all_checks(sort_by: str = 'date',
     cur  = conn.cursor()
     cur.execute(
         f"""
-        SELECT check_number, print_date, id_employee, sum_total
+        SELECT check_number, print_date, id_employee, {kopecks("sum_total")}
           FROM "check"
          ORDER BY {sort_col} {sort_order}
         """
@@ -299,7 +487,7 @@ def get_all_checks(sort_by: str = 'date',
             'number': r[0],
             'date':   _format_datetime(r[1]),
             'cashier': r[2],
-            'total':  float(r[3])
+            'total':  r[3]
         } for r in rows
     ]
 
@@ -312,29 +500,23 @@ def get_checks_all_period(date_from: date | None,
     """
     Усі чеки (усіх касирів) за період [date_from; date_to].
     Повертає список словників:
-      {'number','date','total','cashier_id','cashier_name'}
+      {'number','date','total','cashier_id','cashier_name'}, total — у копійках.
     """
     sort_col = _VALID_COLS.get(sort_by, _VALID_COLS['date'])
     sort_ord = 'ASC' if order.lower() == 'asc' else 'DESC'
 
     sql = [
-        """SELECT c.check_number,
+        f"""SELECT c.check_number,
                   c.print_date,
-                  c.sum_total,
+                  {kopecks("c.sum_total")},
                   e.id_employee,
                   e.empl_surname || ' ' || e.empl_name AS cashier
            FROM "check" AS c
            JOIN Employee AS e ON e.id_employee = c.id_employee"""
     ]
-    params = []
-
-    if date_from:
-        sql.append("WHERE DATE(c.print_date) >= %s")
-        params.append(date_from)
-    if date_to:
-        sql.append("AND DATE(c.print_date) <= %s" if params else
-                   "WHERE DATE(c.print_date) <= %s")
-        params.append(date_to)
+    where, params = date_range('c.print_date', date_from, date_to)
+    if where:
+        sql.append("WHERE " + " AND ".join(where))
 
     sql.append(f"ORDER BY {sort_col} {sort_ord}")
 
@@ -348,7 +530,7 @@ def get_checks_all_period(date_from: date | None,
         {
             "number": r[0],
             "date":   _format_datetime(r[1]),
-            "total":  float(r[2]),
+            "total":  r[2],
             "cashier_id":   r[3],
             "cashier_name": r[4]
         } for r in rows
@@ -388,18 +570,15 @@ def get_total_sales_by_cashier_period(employee_id: str,
     """
     Повертає загальну суму sum_total з таблиці "check"
     для даного касира в період [date_from; date_to].
+    Читає денні агрегати (sales_daily_cashier), а не всі чеки.
     """
-    sql = ["SELECT COALESCE(SUM(sum_total),0) FROM \"check\" WHERE id_employee = %s"]
-    params = [employee_id]
-    if date_from:
-        sql.append("AND DATE(print_date) >= %s")
-        params.append(date_from)
-    if date_to:
-        sql.append("AND DATE(print_date) <= %s")
-        params.append(date_to)
+    where, params = date_range('sale_day', date_from, date_to)
+    sql = ["SELECT COALESCE(ROUND(SUM(sum_total), 2),0) FROM sales_daily_cashier",
+           "WHERE id_employee = %s"]
+    sql += ["AND " + w for w in where]
     conn = get_db()
     cur = conn.cursor()
-    cur.execute(" ".join(sql), params)
+    cur.execute(" ".join(sql), [employee_id] + params)
     total = cur.fetchone()[0]  # Decimal
     close_db(conn)
     return total
@@ -409,16 +588,10 @@ def get_total_sales_all_period(date_from: date | None,
     """
     Повертає загальну суму sum_total з таблиці "check"
     для всіх касирів у період [date_from; date_to].
+    Читає денні агрегати (sales_daily_cashier), а не всі чеки.
     """
-    sql = ["SELECT COALESCE(SUM(sum_total),0) FROM \"check\""]
-    params = []
-    where = []
-    if date_from:
-        where.append("DATE(print_date) >= %s")
-        params.append(date_from)
-    if date_to:
-        where.append("DATE(print_date) <= %s")
-        params.append(date_to)
+    where, params = date_range('sale_day', date_from, date_to)
+    sql = ["SELECT COALESCE(ROUND(SUM(sum_total), 2),0) FROM sales_daily_cashier"]
     if where:
         sql.append("WHERE " + " AND ".join(where))
     conn = get_db()
@@ -434,23 +607,15 @@ def get_quantity_sold_period(upc: str,
     """
     Повертає загальну кількість одиниць товару з Sale.UPC=upc,
     проданих у період [date_from; date_to].
+    Читає денні агрегати (sales_daily_upc), а не всі продажі.
     """
-    sql = [
-        "SELECT COALESCE(SUM(s.product_number),0)",
-        "FROM Sale AS s",
-        "JOIN \"check\" AS c ON s.check_number = c.check_number",
-        "WHERE s.UPC = %s"
-    ]
-    params = [upc]
-    if date_from:
-        sql.append("AND DATE(c.print_date) >= %s")
-        params.append(date_from)
-    if date_to:
-        sql.append("AND DATE(c.print_date) <= %s")
-        params.append(date_to)
+    where, params = date_range('sale_day', date_from, date_to)
+    sql = ["SELECT COALESCE(SUM(units),0) FROM sales_daily_upc",
+           "WHERE UPC = %s"]
+    sql += ["AND " + w for w in where]
     conn = get_db()
     cur = conn.cursor()
-    cur.execute(" ".join(sql), params)
+    cur.execute(" ".join(sql), [upc] + params)
     qty = cur.fetchone()[0]
     close_db(conn)
     return qty
@@ -463,8 +628,11 @@ def delete_check(check_number: str) -> bool:
     """
     conn = get_db()
     cur = conn.cursor()
+    remove_check_from_rollups(cur, check_number)
     cur.execute('DELETE FROM "check" WHERE check_number=%s', (check_number,))
-    conn.commit()
     deleted = cur.rowcount > 0
+    if deleted:
+        report_cache.bump(cur, 'check', 'sale')
+    conn.commit()
     close_db(conn)
     return deleted
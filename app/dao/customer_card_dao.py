@@ -1,23 +1,15 @@
-import random
-
 from app.utils.db import get_db, close_db
+from app.utils.sql import prefix_range, search_key
+from app.services.id_allocator import next_card_number
 
 # ──────────────── допоміжне ──────────────────────────────────
 def generate_card_number() -> str:
     """
-    Генерує унікальний card_number формату 'C' + 12 цифр.
-    Перевіряє відсутність у БД.
+    Унікальний card_number формату 'C' + 12 цифр — з послідовності
+    id_sequence, без запиту до Customer_Card.
     """
-    conn = get_db()
-    cur  = conn.cursor()
-    while True:
-        new_num = 'C' + ''.join(random.choices('0123456789', k=12))
-        cur.execute("SELECT 1 FROM Customer_Card WHERE card_number=%s",
-                    (new_num,))
-        if cur.fetchone() is None:
-            close_db(conn)
-            return new_num
-    # (цикл практично завжди завершується за 1-2 ітерації)
+    return next_card_number()
+
 
 # ──────────────── CREATE ─────────────────────────────────────
 def create_card(card_number: str,
@@ -30,18 +22,19 @@ def create_card(card_number: str,
                 zip_code: str | None,
                 percent: int) -> None:
     """
-    Створює картку з указаним card_number.
+    Створює картку з указаним card_number. Прізвище зберігається як
+    введене, для пошуку поруч пишеться cust_surname_key.
     """
     conn = get_db()
     cur  = conn.cursor()
     cur.execute(
         """
         INSERT INTO Customer_Card
-               (card_number, cust_surname, cust_name, cust_patronymic,
-                phone_number, city, street, zip_code, percent)
-        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
+               (card_number, cust_surname, cust_surname_key, cust_name,
+                cust_patronymic, phone_number, city, street, zip_code, percent)
+        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
         """,
-        (card_number, surname, name, patronymic,
+        (card_number, surname, search_key(surname), name, patronymic,
          phone, city, street, zip_code, percent)
     )
     conn.commit()
@@ -66,6 +59,46 @@ def get_all_cards() -> list[dict]:
         for r in rows
     ]
 
+
+def lookup_cards(term: str, limit: int = 10) -> list[dict]:
+    """
+    Префіксний пошук карток для автодоповнення.
+    'C…' (зокрема сама 'C') або цифри — префікс card_number (первинний ключ),
+    інакше — префікс прізвища без урахування регістру (cust_surname_key,
+    індекс ix_card_surname_key).
+    Повертає не більше limit записів [{'number', 'name', 'percent'}].
+    """
+    term = (term or '').strip()
+    if not term:
+        return []
+    if term.isdigit():
+        term = 'C' + term
+    if term[0] in 'Cc' and (term[1:] == '' or term[1:].isdigit()):
+        where, params = prefix_range("card_number", 'C' + term[1:])
+        order = "card_number"
+    else:
+        where, params = prefix_range("cust_surname_key", search_key(term))
+        order = "cust_surname_key, card_number"
+
+    conn = get_db()
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT card_number, cust_surname, cust_name, percent
+          FROM Customer_Card
+         WHERE {" AND ".join(where)}
+         ORDER BY {order}
+         LIMIT %s
+        """,
+        (*params, limit)
+    )
+    rows = cur.fetchall()
+    close_db(conn)
+    return [
+        {'number': r[0], 'name': f"{r[1]} {r[2]}", 'percent': r[3]}
+        for r in rows
+    ]
+
 # (інші методи create/update/delete залишаються без змін)
 
 
@@ -88,6 +121,7 @@ def update_card(card_number: str,
         """
         UPDATE Customer_Card
            SET cust_surname=%s,
+               cust_surname_key=%s,
                cust_name=%s,
                cust_patronymic=%s,
                phone_number=%s,
@@ -97,7 +131,7 @@ def update_card(card_number: str,
                percent=%s
          WHERE card_number=%s
         """,
-        (surname, name, patronymic, phone,
+        (surname, search_key(surname), name, patronymic, phone,
          city, street, zip_code, percent, card_number)
     )
     conn.commit()
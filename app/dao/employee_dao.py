@@ -8,6 +8,7 @@ from typing import List, Dict, Any
 from datetime import date
 
 from app.utils.db import get_db, close_db
+from app.utils import identity, report_cache
 
 
 def _to_date_string(value):
@@ -67,6 +68,7 @@ def create_employee(empl_surname: str,
          empl_role, salary, date_of_birth, date_of_start,
          phone_number, city, street, zip_code)
     )
+    report_cache.bump(cur, 'employee')
     conn.commit()
     close_db(conn)
 
@@ -205,9 +207,13 @@ def update_employee(emp_id: str,
         (surname, name, patronymic, role, salary,
          dob, start_date, phone, city, street, zip_code, emp_id)
     )
-    conn.commit()
     updated = cur.rowcount > 0
+    if updated:
+        report_cache.bump(cur, 'employee')
+    conn.commit()
     close_db(conn)
+    # ПІБ/роль у кеші поточних користувачів могли змінитися
+    identity.invalidate(employee_id=emp_id)
     return updated
 
 
@@ -224,7 +230,10 @@ def delete_employee_by_id(emp_id: str) -> bool:
     # тепер сам працівник
     cur.execute("DELETE FROM Employee WHERE id_employee = %s", (emp_id,))
     affected = cur.rowcount
+    if affected:
+        report_cache.bump(cur, 'employee')
 
     conn.commit()
     close_db(conn)
+    identity.invalidate(employee_id=emp_id)
     return affected > 0
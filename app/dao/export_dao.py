@@ -0,0 +1,92 @@
+"""
+DAO-рівень для вивантаження звітних таблиць (CSV).
+
+На відміну від get_all_* тут нічого не збирається у список: iter_export
+повертає генератор, що читає курсор порціями fetchmany (у PostgreSQL —
+серверний курсор), тож пам'ять не залежить від розміру таблиці.
+"""
+
+from datetime import date
+from typing import Iterator
+
+from app.utils.db import get_db
+from app.utils.sql import date_range
+
+
+# таблиця → (заголовки колонок, SELECT без WHERE/ORDER, ORDER BY)
+EXPORTS: dict[str, tuple[tuple[str, ...], str, str]] = {
+    'employees': (
+        ('ID', 'Прізвище', "Ім'я", 'Роль', 'Зарплата', 'Працює з'),
+        """SELECT id_employee, empl_surname, empl_name, empl_role,
+                  salary, date_of_start
+             FROM Employee""",
+        "empl_surname, empl_name"
+    ),
+    'customers': (
+        ('№ картки', 'Прізвище', "Ім'я", 'Телефон', 'Знижка %'),
+        """SELECT card_number, cust_surname, cust_name, phone_number, percent
+             FROM Customer_Card""",
+        "cust_surname, card_number"
+    ),
+    'categories': (
+        ('ID', 'Назва'),
+        "SELECT category_number, category_name FROM Category",
+        "category_name"
+    ),
+    'product_types': (
+        ('ID', 'Назва', 'Опис', 'Виробник', 'Категорія'),
+        """SELECT p.id_product, p.product_name, p.characteristics,
+                  p.manufacturer, c.category_name
+             FROM Product AS p
+             JOIN Category AS c ON c.category_number = p.category_number""",
+        "p.product_name"
+    ),
+    'store_products': (
+        ('UPC', 'Назва', 'Категорія', 'Ціна', 'Кількість', 'Акція'),
+        """SELECT sp.UPC, p.product_name, c.category_name,
+                  sp.selling_price, sp.products_number,
+                  CASE WHEN sp.promotional_product THEN 'Так' ELSE 'Ні' END
+             FROM Store_Product AS sp
+             JOIN Product  AS p ON p.id_product = sp.id_product
+             JOIN Category AS c ON c.category_number = p.category_number""",
+        "sp.products_number DESC, sp.UPC"
+    ),
+    'checks': (
+        ('Номер', 'Дата', 'ID касира', '№ картки', 'Сума, ₴', 'ПДВ, ₴'),
+        """SELECT c.check_number, c.print_date, c.id_employee,
+                  c.card_number, c.sum_total, c.vat
+             FROM "check" AS c""",
+        "c.print_date, c.check_number"
+    ),
+}
+
+
+def iter_export(table: str,
+                date_from: date | None = None,
+                date_to:   date | None = None,
+                batch: int = 1000) -> Iterator[tuple]:
+    """
+    Генератор рядків таблиці `table`: перший елемент — заголовки,
+    далі — кортежі значень. date_from / date_to обмежують лише 'checks'.
+    KeyError — невідома таблиця.
+    """
+    headers, select, order = EXPORTS[table]
+    sql, params = [select], []
+    if table == 'checks':
+        where, params = date_range('c.print_date', date_from, date_to)
+        if where:
+            sql.append("WHERE " + " AND ".join(where))
+    sql.append("ORDER BY " + order)
+
+    # з'єднання запиту; повернеться в пул у teardown після відповіді
+    cur = get_db().cursor(name=f"export_{table}")
+    yield headers
+    cur.execute(" ".join(sql), params)
+    try:
+        while True:
+            rows = cur.fetchmany(batch)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cur.close()
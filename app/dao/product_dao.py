@@ -1,15 +1,20 @@
+import base64
+import json
 from typing import List, Dict, Any
-from app.utils.db import get_db, close_db
+from app.utils.db import get_db, close_db, backend
+from app.utils import report_cache
+from app.utils.sql import fts_query, ts_query, prefix_range, kopecks
+from app.services.id_allocator import next_product_id
+from app.services.money import to_db
 
 # ─────────────── CREATE PRODUCT ───────────────
 def create_product(category_number: int, name: str, characteristics: str) -> int:
     """
     Створює новий товар (Product) й повертає його id_product.
     """
+    new_id = next_product_id()
     conn = get_db()
     cur = conn.cursor()
-    cur.execute("SELECT COALESCE(MAX(id_product), 0) + 1 FROM Product")
-    new_id = cur.fetchone()[0]
     cur.execute(
         """
         INSERT INTO Product (
@@ -21,41 +26,62 @@ def create_product(category_number: int, name: str, characteristics: str) -> int
         """,
         (new_id, category_number, name, characteristics)
     )
+    report_cache.bump(cur, 'product')
     conn.commit()
     close_db(conn)
     return new_id
 
 # ─────────────── READ PRODUCTS & TYPES ───────────────
-def get_all_products(
-    sort_by: str = 'name',
-    order: str   = 'asc',
-    category: str | None = None,
-    promotional: bool | None = None,
-    search: str | None = None,
-    search_field: str = 'name'
-) -> List[Dict[str, Any]]:
+_PRODUCT_COLS = {
+    'upc':  'sp.UPC',
+    'name': 'p.product_name',
+    'characteristics': 'p.characteristics',
+    'category': 'c.category_name',
+    'price': 'sp.selling_price',
+    'quantity': 'sp.products_number',
+    'promotional': 'sp.promotional_product'
+}
+
+
+# search_field → (колонка індексу product_fts, колонка для PostgreSQL)
+_FTS_COLS = {
+    'name':            ('product_name',    'p.product_name'),
+    'characteristics': ('characteristics', 'p.characteristics'),
+    'category':        ('category_name',   'c.category_name')
+}
+
+
+def _text_match(search, search_field):
     """
-    Повертає список товарів у магазині (Store_Product JOIN Product JOIN Category).
-    Підтримує фільтри й сортування.
+    Повнотекстова умова пошуку за префіксами слів.
+    SQLite — індекс FTS5 product_fts, PostgreSQL — to_tsvector @@ to_tsquery
+    (GIN-індекси з міграції 0003).
+    Повертає (JOIN або None, умова WHERE, параметр, ключ ORDER BY за релевантністю).
     """
-    cols = {
-        'upc':  'sp.UPC',
-        'name': 'p.product_name',
-        'characteristics': 'p.characteristics',
-        'category': 'c.category_name',
-        'price': 'sp.selling_price',
-        'quantity': 'sp.products_number',
-        'promotional': 'sp.promotional_product'
-    }
-    sort_col   = cols.get(sort_by, cols['name'])
-    sort_order = 'ASC' if order.lower() == 'asc' else 'DESC'
+    fts_col, column = _FTS_COLS.get(search_field, _FTS_COLS['name'])
+    if backend() == 'postgres':
+        # рангу без повтору параметра в ORDER BY немає — впорядковуємо за колонкою
+        return (None,
+                f"to_tsvector('simple', {column}) @@ to_tsquery('simple', %s)",
+                ts_query(search) or '',
+                column)
+    return ("JOIN product_fts ON product_fts.rowid = p.id_product",
+            "product_fts MATCH %s",
+            fts_query(search, fts_col) or '""',
+            "product_fts.rank")
 
+
+def _products_query(category, promotional, search, search_field):
+    """
+    Спільна частина get_all_products / get_products_page:
+    SELECT … FROM … JOIN … та список умов WHERE з параметрами.
+    """
     sql = [
         "SELECT sp.UPC,",
         "       p.product_name,",
         "       p.characteristics,",
         "       c.category_name,",
-        "       sp.selling_price,",
+        f"       {kopecks('sp.selling_price')},",
         "       sp.products_number,",
         "       sp.promotional_product",
         "  FROM Store_Product AS sp",
@@ -72,19 +98,202 @@ def get_all_products(
         where.append("sp.promotional_product = %s")
         params.append(promotional)
     if search:
-        field_map = {
-            'name':  "p.product_name ILIKE %s",
-            'upc':   "sp.UPC = %s",
-            'category': "c.category_name ILIKE %s",
-            'characteristics': "p.characteristics ILIKE %s"
-        }
-        cond = field_map.get(search_field, field_map['name'])
-        where.append(cond)
-        params.append(f"%{search}%" if 'ILIKE' in cond else search)
+        if search_field == 'upc':
+            where.append("sp.UPC = %s")
+            params.append(search)
+        else:
+            # назва / характеристики / категорія — через повнотекстовий індекс
+            join, cond, match, _ = _text_match(search, search_field)
+            if join:
+                sql.append("  " + join)
+            where.append(cond)
+            params.append(match)
+
+    return sql, where, params
+
+
+def _product_row(r) -> Dict[str, Any]:
+    return {
+        'upc':            r[0],
+        'name':           r[1],
+        'characteristics':r[2],
+        'category':       r[3],
+        'price':          r[4],              # копійки
+        'quantity':       r[5],
+        'promotional':    r[6]
+    }
+
 
+def get_all_products(
+    sort_by: str = 'name',
+    order: str   = 'asc',
+    category: str | None = None,
+    promotional: bool | None = None,
+    search: str | None = None,
+    search_field: str = 'name'
+) -> List[Dict[str, Any]]:
+    """
+    Повертає список товарів у магазині (Store_Product JOIN Product JOIN Category).
+    Підтримує фільтри й сортування; sort_by='relevance' разом із текстовим
+    пошуком впорядковує за рангом FTS5.
+    """
+    sort_col   = _PRODUCT_COLS.get(sort_by, _PRODUCT_COLS['name'])
+    sort_order = 'ASC' if order.lower() == 'asc' else 'DESC'
+
+    sql, where, params = _products_query(category, promotional,
+                                         search, search_field)
     if where:
         sql.append(" WHERE " + " AND ".join(where))
-    sql.append(f" ORDER BY {sort_col} {sort_order}")
+    if sort_by == 'relevance' and search and search_field != 'upc':
+        rank = _text_match(search, search_field)[3]
+        sql.append(f" ORDER BY {rank}, {_PRODUCT_COLS['name']}")
+    else:
+        sql.append(f" ORDER BY {sort_col} {sort_order}")
+
+    conn = get_db()
+    cur  = conn.cursor()
+    cur.execute("\n".join(sql), params)
+    rows = cur.fetchall()
+    close_db(conn)
+
+    return [_product_row(r) for r in rows]
+
+
+# ─────────────── KEYSET-ПАГІНАЦІЯ ───────────────
+def encode_cursor(value, upc: str) -> str:
+    """
+    Курсор сторінки: (значення колонки сортування, UPC) → рядок для URL.
+    Ціна в рядках сторінки — ціле число копійок, тож JSON-сумісна.
+    """
+    raw = json.dumps([value, upc], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str | None, sort_by: str = 'name'):
+    """
+    Зворотне до encode_cursor для сортування sort_by (копійки ціни —
+    назад у Decimal для порівняння з selling_price); None, якщо курсор
+    відсутній чи зіпсований.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, upc = json.loads(raw.decode('utf-8'))
+        if sort_by == 'price':
+            value = to_db(int(value))
+        return value, upc
+    except (ValueError, TypeError):
+        return None
+
+
+def get_products_page(
+    sort_by: str = 'name',
+    order: str   = 'asc',
+    category: str | None = None,
+    promotional: bool | None = None,
+    search: str | None = None,
+    search_field: str = 'name',
+    after: str | None = None,
+    before: str | None = None,
+    limit: int = 50
+) -> Dict[str, Any]:
+    """
+    Одна сторінка товарів у магазині з keyset-пагінацією.
+
+    Ті самі фільтри й сортування, що й get_all_products; UPC — стабільний
+    другий ключ сортування. after/before — курсори з попередньої сторінки.
+    Повертає {'items': [...], 'next': курсор|None, 'prev': курсор|None}.
+    """
+    if sort_by not in _PRODUCT_COLS:
+        sort_by = 'name'
+    sort_col  = _PRODUCT_COLS[sort_by]
+    ascending = order.lower() == 'asc'
+
+    after_key  = decode_cursor(after, sort_by)
+    before_key = decode_cursor(before, sort_by) if after_key is None else None
+    backwards  = before_key is not None
+
+    sql, where, params = _products_query(category, promotional,
+                                         search, search_field)
+    key = after_key or before_key
+    if key is not None:
+        # напрямок порівняння залежить від порядку та від того, куди гортаємо
+        op = '>' if ascending != backwards else '<'
+        where.append(f"({sort_col}, sp.UPC) {op} (%s, %s)")
+        params += list(key)
+    if where:
+        sql.append(" WHERE " + " AND ".join(where))
+
+    direction = 'ASC' if ascending != backwards else 'DESC'
+    sql.append(f" ORDER BY {sort_col} {direction}, sp.UPC {direction}")
+    sql.append(" LIMIT %s")
+    params.append(limit + 1)
+
+    conn = get_db()
+    cur  = conn.cursor()
+    cur.execute("\n".join(sql), params)
+    rows = cur.fetchall()
+    close_db(conn)
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    items = [_product_row(r) for r in rows]
+    column = list(_PRODUCT_COLS).index(sort_by)
+
+    def _cursor(r):
+        return encode_cursor(r[column], r[0])
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if backwards:
+            next_cursor = _cursor(rows[-1])
+            prev_cursor = _cursor(rows[0]) if has_more else None
+        else:
+            next_cursor = _cursor(rows[-1]) if has_more else None
+            prev_cursor = _cursor(rows[0]) if after_key is not None else None
+
+    return {'items': items, 'next': next_cursor, 'prev': prev_cursor}
+
+
+# ─────────────── АВТОДОПОВНЕННЯ ───────────────
+def lookup_products(term: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Префіксний пошук товарів у магазині для автодоповнення.
+
+    Рядок із самих цифр — префікс UPC (діапазон по первинному ключу),
+    інакше — префікси слів назви через повнотекстовий індекс.
+    Повертає не більше limit записів [{'upc', 'name', 'price', 'quantity'}]
+    (price — у копійках).
+    """
+    term = (term or '').strip()
+    if not term:
+        return []
+
+    sql = [
+        f"SELECT sp.UPC, p.product_name, {kopecks('sp.selling_price')}, "
+        "sp.products_number",
+        "  FROM Store_Product AS sp",
+        "  JOIN Product        AS p ON sp.id_product = p.id_product"
+    ]
+    if term.isdigit():
+        where, params = prefix_range("sp.UPC", term)
+        order = "sp.UPC"
+    else:
+        if fts_query(term) is None:
+            return []
+        join, cond, match, rank = _text_match(term, 'name')
+        if join:
+            sql.append("  " + join)
+        where, params = [cond], [match]
+        order = f"{rank}, p.product_name, sp.UPC"
+    sql.append(" WHERE " + " AND ".join(where))
+    sql.append(f" ORDER BY {order}")
+    sql.append(" LIMIT %s")
+    params.append(limit)
 
     conn = get_db()
     cur  = conn.cursor()
@@ -93,17 +302,11 @@ def get_all_products(
     close_db(conn)
 
     return [
-        {
-            'upc':            r[0],
-            'name':           r[1],
-            'characteristics':r[2],
-            'category':       r[3],
-            'price':          float(r[4]),
-            'quantity':       r[5],
-            'promotional':    r[6]
-        } for r in rows
+        {'upc': r[0], 'name': r[1], 'price': r[2], 'quantity': r[3]}
+        for r in rows
     ]
 
+
 def get_all_product_types(
     sort_by: str = 'name',
     order: str = 'asc',
@@ -112,7 +315,7 @@ def get_all_product_types(
 ) -> List[Dict[str, Any]]:
     """
     Повертає список типів товарів (Product JOIN Category).
-    Сортування, фільтр за категорією, пошук по назві.
+    Сортування, фільтр за категорією, пошук по назві (повнотекстовий індекс).
     """
     cols = {
         'id':              'p.id_product',
@@ -141,8 +344,11 @@ def get_all_product_types(
         where.append("c.category_name = %s")
         params.append(category)
     if search:
-        where.append("p.product_name ILIKE %s")
-        params.append(f"%{search}%")
+        join, cond, match, _ = _text_match(search, 'name')
+        if join:
+            sql.append(join)
+        where.append(cond)
+        params.append(match)
 
     if where:
         sql.append("WHERE " + " AND ".join(where))
@@ -164,6 +370,26 @@ def get_all_product_types(
         } for r in rows
     ]
 
+# ─────────────── ЛІЧИЛЬНИКИ ДЛЯ ДАШБОРДІВ ───────────────
+def count_store_products() -> int:
+    """Кількість товарів у магазині — один COUNT(*) замість усього каталогу."""
+    conn = get_db()
+    cur  = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM Store_Product")
+    count = cur.fetchone()[0]
+    close_db(conn)
+    return count
+
+
+def count_product_types() -> int:
+    """Кількість типів товарів (Product)."""
+    conn = get_db()
+    cur  = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM Product")
+    count = cur.fetchone()[0]
+    close_db(conn)
+    return count
+
 # ─────────────── UPDATE & DELETE PRODUCT ───────────────
 def update_product(prod_id: int, category_number: int, name: str, characteristics: str) -> bool:
     conn = get_db()
@@ -178,8 +404,10 @@ def update_product(prod_id: int, category_number: int, name: str, characteristic
         """,
         (category_number, name, characteristics, prod_id)
     )
-    conn.commit()
     updated = cur.rowcount > 0
+    if updated:
+        report_cache.bump(cur, 'product')
+    conn.commit()
     close_db(conn)
     return updated
 
@@ -203,8 +431,10 @@ def delete_product(prod_id: int) -> bool:
 
     # 2) якщо магазин порожній — видаляємо
     cur.execute("DELETE FROM Product WHERE id_product = %s", (prod_id,))
-    conn.commit()
     deleted = cur.rowcount > 0
+    if deleted:
+        report_cache.bump(cur, 'product')
+    conn.commit()
     close_db(conn)
     return deleted
 
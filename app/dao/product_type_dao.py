@@ -2,6 +2,8 @@
 
 from typing import List, Dict, Any
 from app.utils.db import get_db, close_db
+from app.utils import report_cache
+from app.services.id_allocator import next_product_id
 
 # ─────────────────── CREATE ───────────────────
 def create_product_type(name: str, category_name: str) -> int:
@@ -10,9 +12,13 @@ def create_product_type(name: str, category_name: str) -> int:
     Знаходить category_number за category_name,
     створює запис і повертає новий id_product.
     """
+    # 1) Новий id_product — з послідовності, без MAX()+1; як і в
+    #    create_category, до роботи з g.db_conn (див. id_allocator)
+    new_id = next_product_id()
+
     conn = get_db()
     cur = conn.cursor()
-    # 1) Отримати номер категорії
+    # 2) Отримати номер категорії
     cur.execute(
         "SELECT category_number FROM Category WHERE category_name=%s",
         (category_name,)
@@ -23,10 +29,6 @@ def create_product_type(name: str, category_name: str) -> int:
         raise ValueError(f"Категорія «{category_name}» не знайдена")
     cat_num = row[0]
 
-    # 2) Згенерувати новий id_product
-    cur.execute("SELECT COALESCE(MAX(id_product),0)+1 FROM Product")
-    new_id = cur.fetchone()[0]
-
     # 3) Вставити запис
     cur.execute(
         """
@@ -36,6 +38,7 @@ def create_product_type(name: str, category_name: str) -> int:
         """,
         (new_id, cat_num, name, "")
     )
+    report_cache.bump(cur, 'product')
     conn.commit()
     close_db(conn)
     return new_id
@@ -103,6 +106,7 @@ def update_product_type(pt_id: int, name: str, category_name: str) -> None:
         """,
         (name, cat_num, pt_id)
     )
+    report_cache.bump(cur, 'product')
     conn.commit()
     close_db(conn)
 
@@ -112,7 +116,9 @@ def delete_product_type(pt_id: int) -> bool:
     conn = get_db()
     cur = conn.cursor()
     cur.execute("DELETE FROM Product WHERE id_product=%s", (pt_id,))
-    conn.commit()
     deleted = cur.rowcount > 0
+    if deleted:
+        report_cache.bump(cur, 'product')
+    conn.commit()
     close_db(conn)
     return deleted
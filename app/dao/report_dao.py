@@ -1,7 +1,10 @@
 # ⬇︎ ДОДАЙТЕ У КІНЕЦЬ ФАЙЛУ
 from app.utils.db import get_db
+from app.utils.sql import date_range
+from app.utils.report_cache import cached_report
 
 
+@cached_report('employee', 'check', 'sale', 'store_product', 'product', 'category')
 def categories_sold_by_cashier():
     """
     Повертає для кожного касира:
@@ -44,6 +47,7 @@ def categories_sold_by_cashier():
     ]
 
 
+@cached_report('category', 'product', 'store_product')
 def category_price_stats(min_units: int):
     """② Min/Avg/Max ціни у категоріях, де stock > min_units."""
     sql = """
@@ -56,7 +60,7 @@ def category_price_stats(min_units: int):
         JOIN Product       p  ON p.category_number = c.category_number
         JOIN Store_Product sp ON sp.id_product     = p.id_product
         GROUP BY c.category_name
-        HAVING SUM(sp.products_number) > ?
+        HAVING SUM(sp.products_number) > %s
         ORDER BY avg_price DESC
     """
     cur = get_db().cursor()
@@ -76,28 +80,48 @@ def category_price_stats(min_units: int):
     ]
 
 
+@cached_report('employee', 'check', 'sale', 'store_product', 'product', 'category')
 def cashiers_every_check_has_category(cat_name: str):
-    """③ Касири, у кожному чеку яких є товар заданої категорії."""
+    """
+    ③ Касири, у кожному чеку яких є товар заданої категорії.
+
+    Ділення відношень через групування, а не подвійний NOT EXISTS:
+    чеки з товаром категорії знаходяться один раз — лише по її рядках Sale
+    (первинний ключ Sale починається з UPC), далі кожен чек касира дає
+    прапорець 0/1, і касир проходить, якщо прапорців стільки ж, скільки чеків.
+    Як і раніше, касир без чеків проходить, а чек без рядків — ні.
+    """
     sql = """
+        WITH cat_checks AS (
+            SELECT DISTINCT s.check_number
+            FROM Sale s
+            WHERE s.UPC IN (
+                SELECT sp.UPC
+                FROM Store_Product sp
+                JOIN Product       p   ON p.id_product        = sp.id_product
+                JOIN Category      cat ON cat.category_number = p.category_number
+                WHERE cat.category_name = %s
+            )
+        ),
+        all_checks AS (
+            SELECT id_employee, COUNT(*) AS checks
+            FROM "check"
+            GROUP BY id_employee
+        ),
+        flagged AS (
+            SELECT c.id_employee, COUNT(*) AS with_cat
+            FROM cat_checks cc
+            JOIN "check"    c ON c.check_number = cc.check_number
+            GROUP BY c.id_employee
+        )
         SELECT e.id_employee,
                e.empl_surname,
                e.empl_name
         FROM Employee e
+        LEFT JOIN all_checks a ON a.id_employee = e.id_employee
+        LEFT JOIN flagged    f ON f.id_employee = e.id_employee
         WHERE e.empl_role = 'cashier'
-          AND NOT EXISTS (
-                SELECT *      
-                FROM "check" c
-                WHERE c.id_employee = e.id_employee
-                  AND NOT EXISTS (
-                        SELECT *
-                        FROM   Sale          s
-                        JOIN   Store_Product sp ON sp.UPC        = s.UPC
-                        JOIN   Product       p  ON p.id_product  = sp.id_product
-                        JOIN   Category      cat ON cat.category_number = p.category_number
-                        WHERE  s.check_number   = c.check_number
-                          AND  cat.category_name = ?
-                  )
-          )
+          AND COALESCE(a.checks, 0) = COALESCE(f.with_cat, 0)
         ORDER BY e.empl_surname
     """
     cur = get_db().cursor()
@@ -115,6 +139,7 @@ def cashiers_every_check_has_category(cat_name: str):
     ]
 
 
+@cached_report('category', 'product', 'store_product')
 def categories_without_promos(big_stock: int):
     """④ Категорії без акційних товарів і без stock > big_stock."""
     sql = """
@@ -125,14 +150,14 @@ def categories_without_promos(big_stock: int):
               FROM   Product p
               JOIN   Store_Product sp ON sp.id_product = p.id_product
               WHERE  p.category_number = c.category_number
-                AND  sp.promotional_product = 1
+                AND  sp.promotional_product = TRUE
         )
           AND NOT EXISTS (
               SELECT *
               FROM   Product p
               JOIN   Store_Product sp ON sp.id_product = p.id_product
               WHERE  p.category_number = c.category_number
-                AND  sp.products_number > ?
+                AND  sp.products_number > %s
         )
         ORDER BY c.category_name
     """
@@ -147,3 +172,59 @@ def categories_without_promos(big_stock: int):
         }
         for r in rows
     ]
+
+
+def top_products_period(date_from, date_to, limit: int = 5):
+    """
+    ТОП-N товарів за період [date_from; date_to] одним запитом до денних
+    агрегатів (sales_daily_upc): за кількістю одиниць і за виручкою.
+    Повертає {'by_units': [...], 'by_revenue': [...]},
+    елементи — {'upc', 'name', 'units', 'revenue'}.
+    """
+    where, params = date_range('sale_day', date_from, date_to)
+
+    sql = f"""
+        WITH totals AS (
+            SELECT UPC,
+                   SUM(units)   AS units,
+                   SUM(revenue) AS revenue
+            FROM sales_daily_upc
+            {"WHERE " + " AND ".join(where) if where else ""}
+            GROUP BY UPC
+            HAVING SUM(units) > 0
+        ),
+        ranked AS (
+            SELECT UPC, units, revenue,
+                   ROW_NUMBER() OVER (ORDER BY units   DESC, UPC) AS rn_units,
+                   ROW_NUMBER() OVER (ORDER BY revenue DESC, UPC) AS rn_revenue
+            FROM totals
+        )
+        SELECT r.UPC, p.product_name, r.units, r.revenue,
+               r.rn_units, r.rn_revenue
+        FROM ranked        r
+        JOIN Store_Product sp ON sp.UPC       = r.UPC
+        JOIN Product       p  ON p.id_product = sp.id_product
+        WHERE r.rn_units <= %s OR r.rn_revenue <= %s
+    """
+    cur = get_db().cursor()
+    cur.execute(sql, (*params, limit, limit))
+    rows = cur.fetchall()
+
+    items = [
+        (
+            {
+                'upc':     r[0],
+                'name':    r[1],
+                'units':   int(r[2]),
+                'revenue': float(r[3])
+            },
+            r[4], r[5]
+        )
+        for r in rows
+    ]
+    return {
+        'by_units':   [i for i, rn, _ in sorted(items, key=lambda x: x[1])
+                       if rn <= limit],
+        'by_revenue': [i for i, _, rn in sorted(items, key=lambda x: x[2])
+                       if rn <= limit]
+    }
@@ -0,0 +1,137 @@
+"""
+DAO-рівень для денних агрегатів продажів:
+sales_daily_cashier (день × касир) та sales_daily_upc (день × UPC).
+
+Функції *_rollups(cur, …) викликаються з check_dao / sale_dao у тій самій
+транзакції, що й зміна "check" / Sale, тому агрегати завжди узгоджені.
+"""
+
+from app.utils.db import get_db, close_db
+
+
+# ─────────────────────── інкрементальні оновлення ───────────────────────
+_UPSERT_CASHIER = """
+    INSERT INTO sales_daily_cashier (sale_day, id_employee, checks, sum_total)
+    SELECT DATE(print_date), id_employee, {checks}, {sign} sum_total
+      FROM "check"
+     WHERE check_number = %s
+    ON CONFLICT (sale_day, id_employee) DO UPDATE
+       SET checks    = sales_daily_cashier.checks    + excluded.checks,
+           sum_total = sales_daily_cashier.sum_total + excluded.sum_total
+"""
+
+_UPSERT_UPC = """
+    INSERT INTO sales_daily_upc (sale_day, UPC, units, revenue)
+    SELECT DATE(c.print_date), s.UPC,
+           {sign} s.product_number, {sign} s.product_number * s.selling_price
+      FROM Sale    s
+      JOIN "check" c ON c.check_number = s.check_number
+     WHERE s.check_number = %s {extra}
+    ON CONFLICT (UPC, sale_day) DO UPDATE
+       SET units   = sales_daily_upc.units   + excluded.units,
+           revenue = sales_daily_upc.revenue + excluded.revenue
+"""
+
+
+def add_check_to_rollups(cur, check_number: str) -> None:
+    """Додає щойно вставлений чек (шапку й рядки Sale) до агрегатів."""
+    cur.execute(_UPSERT_CASHIER.format(checks='1', sign=''), (check_number,))
+    cur.execute(_UPSERT_UPC.format(sign='', extra=''), (check_number,))
+
+
+def remove_check_from_rollups(cur, check_number: str) -> None:
+    """Віднімає чек від агрегатів (викликати ДО видалення чека)."""
+    cur.execute(_UPSERT_CASHIER.format(checks='-1', sign='-'), (check_number,))
+    cur.execute(_UPSERT_UPC.format(sign='-', extra=''), (check_number,))
+
+
+def remove_sale_from_rollups(cur, upc: str, check_number: str) -> None:
+    """
+    Віднімає один рядок Sale і поточний sum_total чека (викликати ДО
+    видалення рядка). Після перерахунку sum_total (store_check_totals
+    з with_total=True) новий підсумок повертає add_check_total_to_rollups.
+    """
+    cur.execute(_UPSERT_CASHIER.format(checks='0', sign='-'), (check_number,))
+    cur.execute(_UPSERT_UPC.format(sign='-', extra='AND s.UPC = %s'),
+                (check_number, upc))
+
+
+def add_check_total_to_rollups(cur, check_number: str) -> None:
+    """Додає sum_total чека до дня × касира, не змінюючи кількості чеків."""
+    cur.execute(_UPSERT_CASHIER.format(checks='0', sign=''), (check_number,))
+
+
+# ─────────────────────── перебудова та перевірка ───────────────────────
+_RAW_CASHIER = """
+    SELECT DATE(print_date), id_employee, COUNT(*), ROUND(SUM(sum_total), 2)
+      FROM "check"
+     GROUP BY DATE(print_date), id_employee
+"""
+
+_RAW_UPC = """
+    SELECT DATE(c.print_date), s.UPC,
+           SUM(s.product_number), ROUND(SUM(s.product_number * s.selling_price), 2)
+      FROM Sale    s
+      JOIN "check" c ON c.check_number = s.check_number
+     GROUP BY DATE(c.print_date), s.UPC
+"""
+
+_ROLLUP_CASHIER = """
+    SELECT sale_day, id_employee, checks, ROUND(sum_total, 2)
+      FROM sales_daily_cashier
+     WHERE checks <> 0
+"""
+
+_ROLLUP_UPC = """
+    SELECT sale_day, UPC, units, ROUND(revenue, 2)
+      FROM sales_daily_upc
+     WHERE units <> 0
+"""
+
+
+def rebuild_rollups() -> dict:
+    """
+    Повністю перераховує агрегати з "check" / Sale.
+    Повертає кількість рядків у кожній таблиці.
+    """
+    conn = get_db()
+    cur  = conn.cursor()
+    cur.execute("DELETE FROM sales_daily_cashier")
+    cur.execute("DELETE FROM sales_daily_upc")
+    cur.execute("INSERT INTO sales_daily_cashier (sale_day, id_employee, checks, sum_total) "
+                + _RAW_CASHIER)
+    cur.execute("INSERT INTO sales_daily_upc (sale_day, UPC, units, revenue) "
+                + _RAW_UPC)
+    conn.commit()
+
+    cur.execute("SELECT COUNT(*) FROM sales_daily_cashier")
+    cashier_rows = cur.fetchone()[0]
+    cur.execute("SELECT COUNT(*) FROM sales_daily_upc")
+    upc_rows = cur.fetchone()[0]
+    close_db(conn)
+    return {'sales_daily_cashier': cashier_rows, 'sales_daily_upc': upc_rows}
+
+
+def verify_rollups() -> dict:
+    """
+    Порівнює агрегати з «сирими» даними.
+    Повертає кількість розбіжних рядків для кожної таблиці (0 — усе гаразд).
+    """
+    conn = get_db()
+    cur  = conn.cursor()
+    result = {}
+    for table, raw, rolled in (
+        ('sales_daily_cashier', _RAW_CASHIER, _ROLLUP_CASHIER),
+        ('sales_daily_upc',     _RAW_UPC,     _ROLLUP_UPC),
+    ):
+        cur.execute(
+            f"SELECT COUNT(*) FROM ({raw} EXCEPT {rolled}) AS a"
+        )
+        missing = cur.fetchone()[0]
+        cur.execute(
+            f"SELECT COUNT(*) FROM ({rolled} EXCEPT {raw}) AS b"
+        )
+        extra = cur.fetchone()[0]
+        result[table] = missing + extra
+    close_db(conn)
+    return result
@@ -1,17 +1,31 @@
 from app.utils.db import get_db, close_db
+from app.utils import report_cache
+from app.dao.rollup_dao import remove_sale_from_rollups, add_check_total_to_rollups
+from app.dao.check_dao  import store_check_totals
 
 def delete_sale(upc: str, check_number: str) -> bool:
     """
     Видаляє один рядок продажу (комбінація UPC + check_number).
+    Підсумки чека (sum_total, subtotal, discount, vat) перераховуються
+    за рядками, що лишилися, а денні агрегати — на різницю.
     Повертає True, якщо було видалено, і False — якщо такий рядок відсутній.
     """
     conn = get_db()
     cur = conn.cursor()
+    remove_sale_from_rollups(cur, upc, check_number)
     cur.execute(
         "DELETE FROM Sale WHERE UPC=%s AND check_number=%s",
         (upc, check_number)
     )
-    conn.commit()
     deleted = cur.rowcount > 0
+    if not deleted:
+        conn.rollback()
+        close_db(conn)
+        return False
+    # збережені підсумки й sum_total — за рядками, що лишилися
+    store_check_totals(cur, [check_number], with_total=True)
+    add_check_total_to_rollups(cur, check_number)
+    report_cache.bump(cur, 'sale', 'check')
+    conn.commit()
     close_db(conn)
-    return deleted
+    return True
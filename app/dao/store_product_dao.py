@@ -1,15 +1,12 @@
-import random
 from app.utils.db import get_db, close_db
+from app.utils import report_cache
+from app.services.promo_service import refresh_promotions
+from app.services.money import to_kop, to_db
+from app.services.id_allocator import next_upc
 
 def generate_upc() -> str:
-    conn = get_db()
-    cur = conn.cursor()
-    while True:
-        candidate = ''.join(random.choices('0123456789', k=12))
-        cur.execute("SELECT 1 FROM Store_Product WHERE UPC=%s", (candidate,))
-        if cur.fetchone() is None:
-            close_db(conn)
-            return candidate
+    """Новий UPC-A з контрольною цифрою (послідовність id_sequence)."""
+    return next_upc()
 
 def create_store_product(
     product_id: int,
@@ -38,19 +35,21 @@ def create_store_product(
             (upc,     # головний код
              None,    # UPC_prom = NULL
              product_id,
-             price,
+             to_db(to_kop(price)),   # ціна — завжди цілі копійки
              qty,
              False,       # неакційний
              expiry_date,
              0)           # поріг
         )
+        refresh_promotions(cur, [upc])
+        report_cache.bump(cur, 'store_product')
         conn.commit()
-        return True, upc
     except Exception:
         conn.rollback()
         return False, ''
     finally:
         close_db(conn)
+    return True, upc
 
 
 def update_store_product(
@@ -74,10 +73,14 @@ def update_store_product(
                expiry_date=%s
          WHERE UPC=%s
         """,
-        (product_id, price, qty, expiry_date, upc)
+        (product_id, to_db(to_kop(price)), qty, expiry_date, upc)
     )
-    conn.commit()
     ok = cur.rowcount > 0
+    # залишок чи термін придатності могли змінити акційність
+    refresh_promotions(cur, [upc])
+    if ok:
+        report_cache.bump(cur, 'store_product')
+    conn.commit()
     close_db(conn)
     return ok
 
@@ -87,7 +90,7 @@ def get_store_product_by_upc(upc: str) -> dict | None:
     Читає товар і повертає словник:
     {'upc','upc_prom','product_id','price','quantity',
      'promotional','expiry_date','promo_threshold'}
-    expiry_date як рядок 'YYYY-MM-DD' (SQL::TEXT).
+    expiry_date як рядок 'YYYY-MM-DD' (CAST … AS TEXT).
     """
     conn = get_db()
     cur = conn.cursor()
@@ -99,7 +102,7 @@ def get_store_product_by_upc(upc: str) -> dict | None:
           selling_price,
           products_number,
           promotional_product,
-          expiry_date::TEXT,
+          CAST(expiry_date AS TEXT),
           promo_threshold
         FROM Store_Product
         WHERE UPC = %s
@@ -128,15 +131,17 @@ def delete_store_product(upc: str) -> bool:
     conn = get_db()
     cur = conn.cursor()
     cur.execute("DELETE FROM Store_Product WHERE UPC = %s", (upc,))
-    conn.commit()
     deleted = cur.rowcount > 0
+    if deleted:
+        report_cache.bump(cur, 'store_product')
+    conn.commit()
     close_db(conn)
     return deleted
 
 def get_all_store_products() -> list[dict]:
     conn = get_db()
     cur = conn.cursor()
-    cur.execute("SELECT UPC, UPC_prom, id_product, selling_price, products_number, promotional_product, expiry_date::TEXT, promo_threshold FROM Store_Product")
+    cur.execute("SELECT UPC, UPC_prom, id_product, selling_price, products_number, promotional_product, CAST(expiry_date AS TEXT), promo_threshold FROM Store_Product")
     rows = cur.fetchall()
     close_db(conn)
     return [
@@ -0,0 +1,12 @@
+# app/services/auto_promotions.py
+from app.extensions import scheduler
+from app.services.promo_service import apply_promotions
+
+
+def run_promotion():
+    """
+    Задача APScheduler (Config.SCHEDULER_JOBS): застосовує акції
+    поза запитом, тому відкриваємо власний контекст застосунку.
+    """
+    with scheduler.app.app_context():
+        apply_promotions()
@@ -0,0 +1,242 @@
+# app/services/checkout_queue.py
+"""
+Черга оформлення чеків із груповим комітом.
+
+У години пік кожна каса, що сама робить create_check → commit, змагається
+за блокування запису SQLite. Тут усі чеки процесу пише один потік:
+він забирає з обмеженої черги до CHECKOUT_BATCH_MAX замовлень, проводить
+їх однією транзакцією (кожен чек — у власному SAVEPOINT, тож помилка
+залишку відкочує лише його) і після коміту віддає кожному викликачу
+результат через Future: номер чека або ValueError з описом помилки.
+
+Якщо каса не дочекалася результату (CHECKOUT_TIMEOUT), замовлення
+скасовується; письменник пропускає скасовані. Замовлення, яке вже
+проводиться, скасувати не можна — тоді каса отримує CheckoutStatusUnknown
+і має перевірити свої чеки, а не повторювати оформлення наосліп.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from flask import current_app
+
+from app.dao.check_dao import create_check, write_check, CHECK_TABLES
+from app.services.id_allocator import next_check_number
+from app.utils.db import get_db, close_db, backend
+from app.utils import report_cache
+
+log = logging.getLogger(__name__)
+
+
+class CheckoutBusy(RuntimeError):
+    """Черга оформлення переповнена — каса має повторити спробу."""
+
+
+class CheckoutStatusUnknown(RuntimeError):
+    """
+    Чек уже проводився, коли минув CHECKOUT_TIMEOUT: він міг бути
+    закомічений, тож повтор без перевірки може створити дублікат.
+    """
+
+
+class _Job:
+    __slots__ = ('employee_id', 'card_number', 'sales', 'future')
+
+    def __init__(self, employee_id, card_number, sales):
+        self.employee_id = employee_id
+        self.card_number = card_number
+        self.sales       = sales
+        self.future      = Future()
+
+
+class CheckoutWriter:
+    """Один потік-письменник з обмеженою чергою замовлень."""
+
+    def __init__(self, app, size=256, batch_max=32, batch_wait_ms=5.0):
+        self.app        = app
+        self.batch_max  = batch_max
+        self.batch_wait = batch_wait_ms / 1000
+        self._queue     = queue.Queue(maxsize=size)
+        self._lock      = threading.Lock()
+        self._stats     = {
+            'submitted': 0,      # прийнято в чергу
+            'rejected':  0,      # черга була повна
+            'completed': 0,      # чеків закомічено
+            'failed':    0,      # відхилено (залишок, помилка БД)
+            'cancelled': 0,      # каса перестала чекати ще до запису
+            'batches':   0,      # транзакцій
+            'batch_last': 0,
+            'batch_max':  0
+        }
+        self._thread = threading.Thread(
+            target=self._run, name='checkout-writer', daemon=True
+        )
+        self._thread.start()
+
+    # ── для викликачів ───────────────────────────────────────────────
+    def submit(self, employee_id, card_number, sales, timeout=1.0) -> Future:
+        """Ставить чек у чергу; CheckoutBusy, якщо місця не звільнилося за timeout."""
+        job = _Job(employee_id, card_number, sales)
+        try:
+            self._queue.put(job, timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self._stats['rejected'] += 1
+            raise CheckoutBusy("Черга оформлення чеків переповнена, "
+                               "спробуйте ще раз") from None
+        with self._lock:
+            self._stats['submitted'] += 1
+        return job.future
+
+    def stats(self) -> dict:
+        with self._lock:
+            st = dict(self._stats)
+        st['queue_depth'] = self._queue.qsize()
+        st['queue_size']  = self._queue.maxsize
+        st['batch_avg']   = (round(st['completed'] / st['batches'], 2)
+                             if st['batches'] else 0)
+        return st
+
+    # ── потік-письменник ─────────────────────────────────────────────
+    def _next_batch(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_max:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=max(remaining, 0)))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            # скасовані (каса не дочекалася) — пропускаємо; решта з цього
+            # моменту RUNNING і скасувати їх уже не можна
+            live = [job for job in batch
+                    if job.future.set_running_or_notify_cancel()]
+            if len(live) < len(batch):
+                with self._lock:
+                    self._stats['cancelled'] += len(batch) - len(live)
+            batch = live
+            if not batch:
+                continue
+            try:
+                with self.app.app_context():
+                    self._write_batch(batch)
+            except Exception as e:                       # pragma: no cover
+                log.exception("Пакет чеків не записано")
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+
+    def _write_batch(self, batch):
+        # номери — до BEGIN IMMEDIATE: резерв нового блоку пише в id_sequence
+        # окремим з'єднанням і чекав би на наше ж блокування запису
+        numbers = [next_check_number() for _ in batch]
+
+        conn = get_db()
+        if conn is None:
+            raise RuntimeError("База даних недоступна")
+        cur = conn.cursor()
+        if backend() == 'sqlite':
+            # блокування запису — одразу й один раз на весь пакет
+            cur.execute("BEGIN IMMEDIATE")
+
+        written, failed = [], 0
+        for job, number in zip(batch, numbers):
+            cur.execute("SAVEPOINT checkout")
+            try:
+                write_check(cur, number, job.employee_id,
+                            job.card_number, job.sales)
+            except Exception as e:
+                cur.execute("ROLLBACK TO SAVEPOINT checkout")
+                cur.execute("RELEASE SAVEPOINT checkout")
+                job.future.set_exception(e)
+                failed += 1
+                continue
+            cur.execute("RELEASE SAVEPOINT checkout")
+            written.append((job, number))
+
+        try:
+            # одне нове покоління звітів на весь пакет, а не на кожен рядок
+            if written:
+                report_cache.bump(cur, *CHECK_TABLES)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            for job, _ in written:
+                job.future.set_exception(e)
+            failed += len(written)
+            written = []
+        finally:
+            close_db()
+
+        # результат віддаємо лише після коміту
+        for job, number in written:
+            job.future.set_result(number)
+
+        with self._lock:
+            st = self._stats
+            st['completed']  += len(written)
+            st['failed']     += failed
+            st['batches']    += 1
+            st['batch_last']  = len(batch)
+            st['batch_max']   = max(st['batch_max'], len(batch))
+
+
+_writer: CheckoutWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> CheckoutWriter:
+    """Письменник процесу; потік стартує при першому чеку."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                cfg = current_app.config
+                _writer = CheckoutWriter(
+                    current_app._get_current_object(),
+                    size=cfg['CHECKOUT_QUEUE_SIZE'],
+                    batch_max=cfg['CHECKOUT_BATCH_MAX'],
+                    batch_wait_ms=cfg['CHECKOUT_BATCH_WAIT_MS']
+                )
+    return _writer
+
+
+def writer_stats() -> dict | None:
+    """Метрики черги (або None, якщо жодного чека ще не оформлено)."""
+    return _writer.stats() if _writer is not None else None
+
+
+def place_check(employee_id, card_number, sales) -> str:
+    """
+    Оформлює чек: через чергу з груповим комітом (CHECKOUT_QUEUE_ENABLED)
+    або напряму create_check. Повертає номер чека; ValueError — помилка залишку.
+
+    Якщо за CHECKOUT_TIMEOUT результату немає: замовлення, яке ще чекає
+    в черзі, скасовується (CheckoutBusy — можна повторити), а те, що вже
+    проводиться, — ні (CheckoutStatusUnknown — спершу перевірити чеки).
+    """
+    cfg = current_app.config
+    if not cfg.get('CHECKOUT_QUEUE_ENABLED'):
+        return create_check(None, employee_id, card_number, sales)
+    future = get_writer().submit(employee_id, card_number, sales)
+    try:
+        return future.result(timeout=cfg['CHECKOUT_TIMEOUT'])
+    except FutureTimeout:
+        if future.cancel():
+            raise CheckoutBusy("Чек не встигли провести, його не створено — "
+                               "спробуйте ще раз") from None
+        if future.done():
+            # результат з'явився між тайм-аутом і скасуванням
+            return future.result()
+        raise CheckoutStatusUnknown(
+            "Чек проводиться, але результат не надійшов вчасно. "
+            "Перевірте «Мої чеки», перш ніж оформлювати його повторно."
+        ) from None
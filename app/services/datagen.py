@@ -0,0 +1,303 @@
+# app/services/datagen.py
+"""
+Синтетичні дані магазину для навантажувальних тестів і бенчмарків.
+
+Усе визначається зерном (seed) і параметрами, тож та сама команда на
+порожній базі дає той самий набір даних:
+
+* популярність товарів — закон Ципфа (кілька хітів і довгий хвіст);
+* розмір кошика — логнормальний (медіана 2–3 позиції, рідко 20+);
+* кількість у позиції — переважно 1;
+* чеки розподілені по днях з урахуванням дня тижня, усередині дня —
+  за годинною кривою з піками в обід і ввечері;
+* частка акційних партій (promo_ratio) і чеків з карткою (card_ratio).
+
+Терміни придатності відраховуються від сьогодні (щоб акційність партій
+відповідала правилам promo_service), решта — від `end`.
+
+ID беруться діапазонами з id_sequence (app/services/id_allocator.py),
+тож дані дописуються до наявних без колізій. Запис — executemany
+порціями по `batch` чеків, одна транзакція на порцію. Наприкінці
+перераховуються денні агрегати (rebuild_rollups).
+"""
+
+import random
+from datetime import date, datetime, timedelta
+from itertools import accumulate, islice
+from typing import Callable, Iterator
+
+from app.utils.db import get_db
+from app.utils import report_cache
+from app.utils.sql import search_key
+from app.services.money import to_db, to_kop, basket_totals
+from app.services.pricing import price_promo
+from app.services.id_allocator import (
+    reserve_range, format_upc, format_card_number, format_check_number
+)
+from app.services.promo_service import PROMO_DAYS_BEFORE
+from app.dao.rollup_dao import rebuild_rollups
+
+
+CATEGORY_NAMES = (
+    'Молочні продукти', 'Хліб і випічка', "М'ясо", 'Риба', 'Овочі', 'Фрукти',
+    'Бакалія', 'Кондитерські вироби', 'Напої', 'Соки', 'Кава і чай',
+    'Заморожені продукти', 'Консерви', 'Снеки', 'Сири', 'Ковбаси',
+    'Побутова хімія', 'Гігієна', 'Дитяче харчування', 'Товари для тварин',
+)
+PRODUCT_WORDS = (
+    'Класичний', 'Домашній', 'Фермерський', 'Преміум', 'Еко', 'Легкий',
+    'Традиційний', 'Святковий', 'Пікантний', 'Ніжний', 'Свіжий', 'Відбірний',
+)
+MANUFACTURERS = (
+    'Галичина', 'Яготинське', 'Київхліб', 'Рошен', 'Наша Ряба', 'Моршинська',
+    'Оболонь', 'Верес', 'Чумак', 'Люкс', 'Біло', None,
+)
+SURNAMES = (
+    'Коваленко', 'Бондаренко', 'Ткаченко', 'Шевченко', 'Кравченко', 'Мельник',
+    'Бойко', 'Олійник', 'Лисенко', 'Мороз', 'Поліщук', 'Савченко', 'Руденко',
+)
+NAMES = (
+    'Олена', 'Ірина', 'Наталія', 'Оксана', 'Марія', 'Андрій', 'Олександр',
+    'Сергій', 'Дмитро', 'Віктор', 'Тетяна', 'Юлія', 'Богдан', 'Максим',
+)
+CITIES = ('Київ', 'Львів', 'Одеса', 'Дніпро', 'Харків', 'Вінниця')
+
+ZIPF_S = 0.9                        # показник Ципфа для популярності товарів
+BASKET_MU, BASKET_SIGMA = 0.9, 0.8  # логнормальний розмір кошика
+BASKET_MAX = 40
+QTY        = (1, 2, 3, 4, 6)
+QTY_WEIGHTS = (70, 18, 7, 3, 2)
+# відносне навантаження по годинах (магазин працює 8:00–22:59)
+HOUR_WEIGHTS = {
+    8: 3, 9: 5, 10: 6, 11: 7, 12: 10, 13: 10, 14: 7, 15: 6,
+    16: 7, 17: 10, 18: 12, 19: 11, 20: 8, 21: 5, 22: 2,
+}
+WEEKDAY_WEIGHTS = (0.9, 0.9, 0.95, 1.0, 1.15, 1.3, 1.1)   # пн … нд
+CARD_PERCENTS = ((1, 3, 5, 7, 10, 15), (10, 25, 30, 15, 15, 5))
+
+
+def _phone(rnd) -> str:
+    return f"+380{rnd.randrange(10**9):09d}"
+
+
+def _insert(cur, sql: str, rows: list) -> None:
+    if rows:
+        cur.executemany(sql, rows)
+
+
+# ───────────────────────── довідники ─────────────────────────
+def _categories(cur, ids):
+    rows = []
+    for n, cid in enumerate(ids):
+        base = CATEGORY_NAMES[n % len(CATEGORY_NAMES)]
+        rows.append((cid, base if n < len(CATEGORY_NAMES)
+                     else f"{base} {n // len(CATEGORY_NAMES) + 1}"))
+    _insert(cur, "INSERT INTO Category (category_number, category_name) "
+                 "VALUES (%s, %s)", rows)
+    return list(ids)
+
+
+def _products(cur, rnd, ids, categories):
+    rows = []
+    for pid in ids:
+        cat = rnd.choice(categories)
+        rows.append((pid, cat, f"{rnd.choice(PRODUCT_WORDS)} товар {pid}",
+                     f"{rnd.randint(100, 2000)} г", rnd.choice(MANUFACTURERS)))
+    _insert(cur, "INSERT INTO Product (id_product, category_number, "
+                 "product_name, characteristics, manufacturer) "
+                 "VALUES (%s, %s, %s, %s, %s)", rows)
+    return list(ids)
+
+
+def _store_products(cur, rnd, ids, products, promo_ratio):
+    """Партії товарів; повертає [(UPC, ціна в копійках)] у порядку популярності."""
+    today = date.today()
+    rows, catalog = [], []
+    for n, value in enumerate(ids):
+        upc   = format_upc(value)
+        # кожен товар має хоча б одну партію, далі — випадкові
+        pid   = products[n] if n < len(products) else rnd.choice(products)
+        price = to_kop(round(rnd.lognormvariate(4.0, 0.8), 2))
+        promo = rnd.random() < promo_ratio
+        if promo:
+            price = price_promo(price)
+            expiry = today + timedelta(days=rnd.randint(0, PROMO_DAYS_BEFORE))
+        else:
+            expiry = today + timedelta(days=rnd.randint(PROMO_DAYS_BEFORE + 7, 365))
+        rows.append((upc, None, pid, to_db(price), rnd.randint(0, 500),
+                     promo, expiry.isoformat(), 0))
+        catalog.append((upc, price))
+    _insert(cur, "INSERT INTO Store_Product (UPC, UPC_prom, id_product, "
+                 "selling_price, products_number, promotional_product, "
+                 "expiry_date, promo_threshold) "
+                 "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)", rows)
+    rnd.shuffle(catalog)        # ранг популярності не залежить від UPC
+    return catalog
+
+
+def _employees(cur, rnd, count, end):
+    rows, cashiers = [], []
+    ids = set()
+    while len(ids) < count:
+        ids.add(f"{rnd.getrandbits(40):010x}")
+    for n, emp_id in enumerate(sorted(ids)):
+        role = 'manager' if n % 10 == 0 else 'cashier'
+        born = end - timedelta(days=rnd.randint(18 * 365 + 5, 60 * 365))
+        start = end - timedelta(days=rnd.randint(30, 10 * 365))
+        rows.append((emp_id, rnd.choice(SURNAMES), rnd.choice(NAMES), None,
+                     role, rnd.choice((12000, 15000, 18000, 25000)),
+                     born.isoformat(), start.isoformat(), _phone(rnd),
+                     rnd.choice(CITIES), f"вул. Садова, {rnd.randint(1, 120)}",
+                     f"{rnd.randint(1000, 99999):05d}"))
+        if role == 'cashier':
+            cashiers.append(emp_id)
+    _insert(cur, "INSERT INTO Employee (id_employee, empl_surname, empl_name, "
+                 "empl_patronymic, empl_role, salary, date_of_birth, "
+                 "date_of_start, phone_number, city, street, zip_code) "
+                 "VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)", rows)
+    return cashiers
+
+
+def _cards(cur, rnd, ids):
+    rows, cards = [], []
+    for value in ids:
+        number = format_card_number(value)
+        pct    = rnd.choices(*CARD_PERCENTS)[0]
+        surname = rnd.choice(SURNAMES)
+        rows.append((number, surname, search_key(surname), rnd.choice(NAMES),
+                     None, _phone(rnd), rnd.choice(CITIES), None, None, pct))
+        cards.append((number, pct))
+    _insert(cur, "INSERT INTO Customer_Card (card_number, cust_surname, "
+                 "cust_surname_key, cust_name, cust_patronymic, phone_number, "
+                 "city, street, zip_code, percent) "
+                 "VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)", rows)
+    return cards
+
+
+# ───────────────────────── чеки ─────────────────────────
+def _baskets(rnd, lines, days, end, catalog, cashiers, cards, card_ratio
+             ) -> Iterator[tuple]:
+    """
+    Чеки в хронологічному порядку: (print_date, касир, (картка, %) | None,
+    [(UPC, ціна), …], [кількість, …]) — доки не набереться `lines` позицій.
+    """
+    sp_idx  = range(len(catalog))
+    sp_cum  = list(accumulate(1 / (rank + 1) ** ZIPF_S for rank in sp_idx))
+    hours   = list(HOUR_WEIGHTS)
+    hr_cum  = list(accumulate(HOUR_WEIGHTS.values()))
+    qty_cum = list(accumulate(QTY_WEIGHTS))
+    choices, lognorm, rand = rnd.choices, rnd.lognormvariate, rnd.random
+
+    first = end - timedelta(days=days - 1)
+    day_w = [WEEKDAY_WEIGHTS[(first + timedelta(d)).weekday()] for d in range(days)]
+    day_cum, total_w = list(accumulate(day_w)), sum(day_w)
+
+    produced = 0
+    for d in range(days):
+        target = round(lines * day_cum[d] / total_w)
+        day    = datetime.combine(first + timedelta(d), datetime.min.time())
+        checks = []
+        while produced < target:
+            size = 1 + min(int(lognorm(BASKET_MU, BASKET_SIGMA)), BASKET_MAX - 1)
+            # повтор товару в кошику — одна позиція (PK Sale = UPC + чек)
+            items = list(dict.fromkeys(
+                catalog[i] for i in choices(sp_idx, cum_weights=sp_cum, k=size)
+            ))
+            qtys  = choices(QTY, cum_weights=qty_cum, k=len(items))
+            moment = day + timedelta(
+                hours=choices(hours, cum_weights=hr_cum)[0],
+                seconds=rnd.randrange(3600)
+            )
+            card = rnd.choice(cards) if cards and rand() < card_ratio else None
+            checks.append((moment, rnd.choice(cashiers), card, items, qtys))
+            produced += len(items)
+        checks.sort(key=lambda c: c[0])
+        yield from checks
+
+
+def generate(categories: int = 20,
+             products: int = 2000,
+             store_products: int | None = None,
+             employees: int = 40,
+             cards: int = 5000,
+             lines: int = 100_000,
+             days: int = 365,
+             end: date | None = None,
+             promo_ratio: float = 0.1,
+             card_ratio: float = 0.35,
+             seed: int = 42,
+             batch: int = 20_000,
+             progress: Callable[[int], None] | None = None) -> dict:
+    """
+    Дописує в БД синтетичний магазин і історію продажів з ≈`lines`
+    рядками Sale за `days` днів до `end` (включно; за замовчуванням сьогодні).
+    Повертає кількість доданих рядків по таблицях.
+    """
+    if employees < 2:
+        raise ValueError("Потрібен хоча б один касир (employees ≥ 2)")
+    rnd  = random.Random(seed)
+    end  = end or date.today()
+    conn = get_db()
+    cur  = conn.cursor()
+
+    # ── довідники — одна транзакція; діапазони ID резервуються до неї:
+    #    reserve_range пише окремим з'єднанням, і на SQLite чекав би
+    #    на блокування запису нашої ж транзакції ──────────────────────
+    cat_ids  = reserve_range('category', categories)
+    prod_ids = reserve_range('product',  products)
+    upc_ids  = reserve_range('upc',      store_products or products)
+    card_ids = reserve_range('card',     cards)
+
+    cat_ids  = _categories(cur, cat_ids)
+    prod_ids = _products(cur, rnd, prod_ids, cat_ids)
+    catalog  = _store_products(cur, rnd, upc_ids, prod_ids, promo_ratio)
+    cashiers = _employees(cur, rnd, employees, end)
+    card_lst = _cards(cur, rnd, card_ids)
+    conn.commit()
+
+    # ── чеки й рядки Sale — порціями ──────────────────────────────────
+    price_db = {upc: to_db(price) for upc, price in catalog}
+    baskets  = _baskets(rnd, lines, days, end, catalog, cashiers,
+                        card_lst, card_ratio)
+    n_checks = n_lines = 0
+    while True:
+        chunk = list(islice(baskets, batch))
+        if not chunk:
+            break
+        numbers = reserve_range('check', len(chunk))    # між транзакціями
+        check_rows, sale_rows = [], []
+        for value, (moment, cashier, card, items, qtys) in zip(numbers, chunk):
+            number = format_check_number(value)
+            t = basket_totals([price for _, price in items], qtys,
+                              card[1] if card else 0)
+            check_rows.append((number, cashier, card[0] if card else None,
+                               moment, to_db(t.total), to_db(t.subtotal),
+                               to_db(t.discount), to_db(t.vat), t.lines))
+            sale_rows.extend((upc, number, qty, price_db[upc])
+                             for (upc, _), qty in zip(items, qtys))
+        _insert(cur, 'INSERT INTO "check" (check_number, id_employee, '
+                     'card_number, print_date, sum_total, subtotal, '
+                     'discount, vat, line_count) '
+                     'VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)', check_rows)
+        _insert(cur, "INSERT INTO Sale (UPC, check_number, product_number, "
+                     "selling_price) VALUES (%s, %s, %s, %s)", sale_rows)
+        conn.commit()
+        n_checks += len(check_rows)
+        n_lines  += len(sale_rows)
+        if progress:
+            progress(n_lines)
+
+    rebuild_rollups()
+    # усі звіти зачеплено — нове покоління один раз, а не на кожну порцію
+    report_cache.bump(cur, 'category', 'product', 'store_product', 'employee',
+                      'check', 'sale')
+    conn.commit()
+    return {
+        'Category':      len(cat_ids),
+        'Product':       len(prod_ids),
+        'Store_Product': len(catalog),
+        'Employee':      employees,
+        'Customer_Card': len(card_lst),
+        'check':         n_checks,
+        'Sale':          n_lines,
+    }
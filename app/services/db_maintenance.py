@@ -0,0 +1,21 @@
+# app/services/db_maintenance.py
+import logging
+
+from app.extensions import scheduler
+from app.utils.db import wal_checkpoint, backend
+
+log = logging.getLogger(__name__)
+
+
+def run_wal_checkpoint():
+    """
+    Задача APScheduler (Config.SCHEDULER_JOBS): періодичний checkpoint
+    WAL-журналу, щоб він не ріс між автоматичними checkpoint-ами SQLite.
+    """
+    with scheduler.app.app_context():
+        if backend() != 'sqlite':
+            return
+        result = wal_checkpoint(scheduler.app.config['WAL_CHECKPOINT_MODE'])
+        if result['checkpointed'] < result['log']:
+            # хтось ще читає старі сторінки — доперенесемо наступного разу
+            log.info("WAL checkpoint неповний: %s", result)
@@ -0,0 +1,124 @@
+# app/services/id_allocator.py
+"""
+Ідентифікатори з таблиці id_sequence блоками.
+
+Для кожного виду ID (category, product, upc, card, check) у id_sequence
+лежить наступне вільне значення. Процес резервує собі одразу блок
+(Config.ID_BLOCK_SIZES) одним UPDATE … RETURNING і далі видає номери
+з пам'яті — вставка не потребує ні MAX(id)+1, ні перевірки «чи зайнято».
+Блок, не вичерпаний до перезапуску, просто лишає пропуск у нумерації.
+
+Резерв іде з'єднанням службового пулу (get_dedicated_db), а не пулу
+запитів, і одразу комітиться — транзакцію викликача (g.db_conn) він не
+комітить і не відкочує, а вичерпаний пул запитів його не блокує. На
+SQLite next_* однаково слід викликати ДО того, як власна транзакція
+візьме блокування запису: інакше резерв чекатиме на нього до
+busy_timeout (див. create_check і чергу чеків).
+
+Числа, що не вміщаються у формат ID (UPC — 11 цифр, картка — 12,
+чек — 9), не видаються: format_* кидає ValueError.
+"""
+
+import threading
+
+from flask import current_app
+
+from app.utils.db import get_dedicated_db
+
+_blocks: dict[str, list[int]] = {}      # вид → [наступне, межа)
+_lock = threading.Lock()
+
+
+def upc_check_digit(body: str) -> str:
+    """Контрольна цифра UPC-A для 11 цифр: непарні позиції ×3, парні ×1."""
+    odd  = sum(int(d) for d in body[0::2])
+    even = sum(int(d) for d in body[1::2])
+    return str((10 - (odd * 3 + even) % 10) % 10)
+
+
+def _reserve(kind: str, size: int) -> list[int]:
+    # з'єднання службового пулу: коміт резерву не зачіпає транзакцію запиту
+    with get_dedicated_db() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "UPDATE id_sequence SET next_value = next_value + %s "
+            "WHERE name = %s RETURNING next_value",
+            (size, kind)
+        )
+        row = cur.fetchone()
+        if row is None:
+            raise KeyError(f"Невідома послідовність id_sequence: {kind}")
+        conn.commit()
+    end = int(row[0])
+    return [end - size, end]
+
+
+def next_value(kind: str) -> int:
+    """Наступне число послідовності kind (при потребі резервує новий блок)."""
+    with _lock:
+        block = _blocks.get(kind)
+        if block is None or block[0] >= block[1]:
+            size = current_app.config['ID_BLOCK_SIZES'].get(kind, 1)
+            block = _blocks[kind] = _reserve(kind, size)
+        value = block[0]
+        block[0] += 1
+    return value
+
+
+def reserve_range(kind: str, size: int) -> range:
+    """
+    Окремий діапазон із size значень (напр. для масового завантаження);
+    блоки next_value він не зачіпає.
+    """
+    start, end = _reserve(kind, size)
+    return range(start, end)
+
+
+# ───────────────────────── формати ID ─────────────────────────
+def _digits(kind: str, value: int, width: int) -> str:
+    """value рівно з width цифр; більше — послідовність kind вичерпано."""
+    if not 0 <= value < 10 ** width:
+        raise ValueError(
+            f"Послідовність id_sequence '{kind}' вичерпано: {value} не "
+            f"вміщається в {width} цифр"
+        )
+    return f"{value:0{width}d}"
+
+
+def format_upc(value: int) -> str:
+    """12-значний UPC-A (VARCHAR(12)): 11 цифр послідовності + контрольна."""
+    body = _digits('upc', value, 11)
+    return body + upc_check_digit(body)
+
+
+def format_card_number(value: int) -> str:
+    """'C' + 12 цифр (VARCHAR(13))."""
+    return 'C' + _digits('card', value, 12)
+
+
+def format_check_number(value: int) -> str:
+    """
+    'K' + 9 цифр (VARCHAR(10)). Літера не зустрічається в старих номерах
+    (uuid hex), тож нові номери з ними не перетинаються.
+    """
+    return 'K' + _digits('check', value, 9)
+
+
+def next_category_number() -> int:
+    return next_value('category')
+
+
+def next_product_id() -> int:
+    return next_value('product')
+
+
+def next_upc() -> str:
+    return format_upc(next_value('upc'))
+
+
+def next_card_number() -> str:
+    return format_card_number(next_value('card'))
+
+
+def next_check_number() -> str:
+    return format_check_number(next_value('check'))
@@ -0,0 +1,75 @@
+# app/services/money.py
+"""
+Гроші як ціле число копійок.
+
+Колонки цін і сум у БД лишаються десятковими (NUMERIC у PostgreSQL,
+REAL у SQLite), але DAO переводить кожне значення в копійки одразу
+після читання (to_kop) і назад лише при записі (to_db). Уся арифметика
+чека — цілочисельна, тож створення чека й його перегляд дають ті самі
+суми до копійки.
+
+Правило округлення одне: половина копійки — від нуля (ROUND_HALF_UP).
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+from operator import mul
+from typing import Iterable, NamedTuple
+
+VAT_PERCENT   = 20      # ПДВ, %
+PROMO_PERCENT = 20      # знижка акційного товару, %
+
+_HUNDRED = Decimal(100)
+_ONE     = Decimal(1)
+
+
+def to_kop(value) -> int:
+    """Гривні (Decimal / str / float / int з БД чи форми) → копійки."""
+    if isinstance(value, int):
+        return value * 100
+    # float переводимо через str, щоб 0.1 + 0.2 не перетворилося на 30.000000000000004
+    return int((Decimal(str(value)) * _HUNDRED).quantize(_ONE, ROUND_HALF_UP))
+
+
+def to_db(kop: int) -> Decimal:
+    """Копійки → Decimal з двома знаками для запису в БД."""
+    return Decimal(kop).scaleb(-2)
+
+
+def fmt(kop: int | None) -> str:
+    """Копійки → '1234.50' (фільтр шаблонів |money)."""
+    if kop is None:
+        return ''
+    sign = '-' if kop < 0 else ''
+    hrn, k = divmod(abs(kop), 100)
+    return f"{sign}{hrn}.{k:02d}"
+
+
+def percent(kop: int, pct: int) -> int:
+    """pct відсотків від суми в копійках, округлено до копійки (half-up)."""
+    q, r = divmod(abs(kop) * pct, 100)
+    if r * 2 >= 100:
+        q += 1
+    return q if kop >= 0 else -q
+
+
+class CheckTotals(NamedTuple):
+    lines:    int       # кількість позицій
+    subtotal: int       # сума позицій
+    discount: int       # знижка за карткою
+    vat:      int       # ПДВ від суми після знижки
+    total:    int       # до сплати
+
+
+def basket_totals(prices: Iterable[int],
+                  qtys: Iterable[int],
+                  discount_percent: int = 0) -> CheckTotals:
+    """
+    Підсумки кошика: ціни позицій у копійках і кількості — паралельними
+    послідовностями; сума рахується одним проходом sum(map(mul, …)).
+    """
+    prices = list(prices)
+    subtotal = sum(map(mul, prices, qtys))
+    discount = percent(subtotal, discount_percent)
+    taxable  = subtotal - discount
+    vat      = percent(taxable, VAT_PERCENT)
+    return CheckTotals(len(prices), subtotal, discount, vat, taxable + vat)
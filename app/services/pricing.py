@@ -1,14 +1,7 @@
 # app/services/pricing.py
-from decimal import Decimal, ROUND_HALF_UP
+from app.services.money import PROMO_PERCENT, percent
 
-VAT_RATE         = Decimal('0.20')   # 20 %
-PROMO_DISCOUNT   = Decimal('0.20')   # 20 %
 
-def price_gross(net: Decimal) -> Decimal:
-    """Нетто → з ПДВ, округлено до копійок."""
-    return (net * (1 + VAT_RATE)).quantize(Decimal('0.01'), ROUND_HALF_UP)
-
-def price_promo(gross_regular: Decimal) -> Decimal:
-    """Акційна (з ПДВ) = gross_regular × 0.8."""
-    return (gross_regular * (1 - PROMO_DISCOUNT)).quantize(Decimal('0.01'),
-                                                           ROUND_HALF_UP)
+def price_promo(gross_regular: int) -> int:
+    """Акційна (з ПДВ) = gross_regular × 0.8; копійки → копійки."""
+    return gross_regular - percent(gross_regular, PROMO_PERCENT)
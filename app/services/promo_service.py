@@ -1,47 +1,113 @@
+import threading
 from datetime import date, timedelta
 from app.utils.db import get_db, close_db
+from app.utils import report_cache
+from app.services.money import to_kop, to_db
+from app.services.pricing import price_promo
 
 # за скільки днів до expiry_date включати акцію
 PROMO_DAYS_BEFORE = 3
 
+# Товари, для яких треба ввімкнути акцію
+_ENABLE_SQL = """
+    SELECT UPC, selling_price
+      FROM Store_Product
+     WHERE expiry_date <= %s
+       AND products_number >= promo_threshold
+       AND promotional_product = FALSE
+"""
+
+# Вмикаємо акцію з ціною, порахованою pricing.price_promo; ціну змінено
+# після SELECT — рядок пропускаємо (його перерахує refresh_promotions
+# того запису)
+_PROMO_SQL = """
+    UPDATE Store_Product
+       SET promotional_product = TRUE,
+           selling_price       = %s
+     WHERE UPC = %s
+       AND selling_price = %s
+       AND promotional_product = FALSE
+"""
+
+# Вимикаємо акцію для тих, що більше не відповідають
+_DISABLE_SQL = """
+    UPDATE Store_Product
+       SET promotional_product = FALSE
+     WHERE (expiry_date > %s OR products_number < promo_threshold)
+       AND promotional_product = TRUE
+"""
+
+# межа expiry_date, до якої акції вже застосовано в цьому процесі
+_last_cutoff: date | None = None
+_cutoff_lock = threading.Lock()
+
+
+def _cutoff() -> date:
+    return date.today() + timedelta(days=PROMO_DAYS_BEFORE)
+
+
+def _enable(cur, sql: str, params) -> int:
+    """Вмикає акцію для товарів із запиту sql; повертає кількість увімкнених."""
+    cur.execute(sql, params)
+    enabled = 0
+    for upc, price in cur.fetchall():
+        cur.execute(_PROMO_SQL,
+                    (to_db(price_promo(to_kop(price))), upc, price))
+        enabled += cur.rowcount
+    return enabled
+
+
+def refresh_promotions(cur, upcs) -> None:
+    """
+    Перераховує акційність лише для вказаних UPC у поточній транзакції.
+    Викликається з DAO після зміни залишку чи терміну придатності.
+    """
+    upcs = list(upcs)
+    if not upcs:
+        return
+    cutoff  = _cutoff().isoformat()
+    in_list = ", ".join(["%s"] * len(upcs))
+    _enable(cur, _ENABLE_SQL + f" AND UPC IN ({in_list})", (cutoff, *upcs))
+    cur.execute(_DISABLE_SQL + f" AND UPC IN ({in_list})", (cutoff, *upcs))
+
+
 def apply_promotions():
     """
-    Автоматично вмикає/вимикає акційність:
-     - Вмикає акцію та робить знижку *0.8, якщо expiry_date <= today+3d
+    Планове вмикання/вимикання акційності (див. auto_promotions.run_promotion):
+     - Вмикає акцію та знижує ціну (pricing.price_promo), якщо expiry_date <= today+3d
        і qty >= promo_threshold і зараз не в акції.
      - Вимикає прапорець, якщо товар більше не відповідає умовам.
+
+    Перший запуск у процесі — повний прохід по Store_Product. Далі межа
+    cutoff лише зростає, тож увімкнутися можуть тільки товари з
+    expiry_date у (попередня межа; нова межа], а вимкнення за датою
+    неможливе. Зміни залишку обробляє refresh_promotions з DAO.
     """
+    global _last_cutoff
+
     conn = get_db()
     if not conn:
         # БД недоступна, пропускаємо
         return
-    
-    try:
-        cur = conn.cursor()
-
-        today       = date.today()
-        cutoff_date = today + timedelta(days=PROMO_DAYS_BEFORE)
-
-        # 1) Вмикаємо акцію та знижуємо ціну для тих, що відповідають
-        cur.execute("""
-            UPDATE Store_Product
-               SET promotional_product = 1,
-                   selling_price       = ROUND(selling_price * 0.8, 4)
-             WHERE expiry_date <= %s
-               AND products_number >= promo_threshold
-               AND promotional_product = 0
-        """, (cutoff_date,))
-
-        # 2) Вимикаємо акцію для тих, що більше не відповідають
-        cur.execute("""
-            UPDATE Store_Product
-               SET promotional_product = 0
-             WHERE (expiry_date > %s OR products_number < promo_threshold)
-               AND promotional_product = 1
-        """, (cutoff_date,))
-
-        conn.commit()
-    except Exception as e:
-        print(f"[WARNING] Error applying promotions: {e}")
-    finally:
-        close_db(conn)
+
+    with _cutoff_lock:
+        cutoff = _cutoff()
+        try:
+            cur = conn.cursor()
+            changed = 0
+            if _last_cutoff is None or cutoff < _last_cutoff:
+                changed += _enable(cur, _ENABLE_SQL, (cutoff.isoformat(),))
+                cur.execute(_DISABLE_SQL, (cutoff.isoformat(),))
+                changed += cur.rowcount
+            elif cutoff > _last_cutoff:
+                changed += _enable(cur, _ENABLE_SQL + " AND expiry_date > %s",
+                                   (cutoff.isoformat(),
+                                    _last_cutoff.isoformat()))
+            if changed > 0:
+                report_cache.bump(cur, 'store_product')
+            conn.commit()
+            _last_cutoff = cutoff
+        except Exception as e:
+            print(f"[WARNING] Error applying promotions: {e}")
+        finally:
+            close_db(conn)
@@ -0,0 +1,29 @@
+"""
+Потокове формування CSV для Response-генераторів.
+"""
+
+import csv
+import io
+from typing import Iterable, Iterator
+
+_CHUNK = 64 * 1024      # байт у одній порції відповіді
+
+
+def iter_csv(rows: Iterable[tuple]) -> Iterator[bytes]:
+    """
+    Рядки → порції CSV у UTF-8 з BOM (щоб Excel відкривав кирилицю).
+    Перша порція (BOM і заголовок) віддається одразу, далі — по ~_CHUNK байт.
+    """
+    buf    = io.StringIO()
+    writer = csv.writer(buf)
+    first  = True
+    buf.write('\ufeff')
+    for row in rows:
+        writer.writerow(row)
+        if first or buf.tell() >= _CHUNK:
+            first = False
+            yield buf.getvalue().encode('utf-8')
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode('utf-8')
@@ -1,16 +1,102 @@
+import ast
 import sqlite3
 import os
 import re
+import threading
+import time
+from collections import deque
+from decimal import Decimal
+from functools import lru_cache
 from flask import current_app, g
 
+from app.utils import query_log
+
+try:
+    import psycopg                      # лише для DB_BACKEND = 'postgres'
+except ImportError:                     # pragma: no cover
+    psycopg = None
+
+
+# DAO передають суми як Decimal (як для PostgreSQL) — SQLite зберігає REAL
+sqlite3.register_adapter(Decimal, float)
+
+# порушення UNIQUE / FK незалежно від бекенду: `except IntegrityError:`
+IntegrityError = (sqlite3.IntegrityError,) + (
+    (psycopg.IntegrityError,) if psycopg is not None else ()
+)
+
+
+# ─────────────────── трансляція PostgreSQL → SQLite ───────────────────
+_ILIKE_RE = re.compile(r'\bILIKE\b', re.IGNORECASE)
+_SQL_START_RE = re.compile(r'^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b',
+                           re.IGNORECASE)
+
+# заздалегідь перекладені літерали з app/dao (див. pretranslate_dao_modules)
+_PRETRANSLATED: dict[str, str] = {}
+
+
+@lru_cache(maxsize=512)
+def _translate_cached(sql):
+    # Конвертуємо %s плейсхолдери в ?
+    # і ILIKE в LIKE (SQLite не підтримує ILIKE)
+    return _ILIKE_RE.sub('LIKE', sql.replace('%s', '?'))
+
+
+def translate_sql(sql):
+    """
+    Перекладає PostgreSQL-діалект DAO у SQLite.
+    Спершу шукаємо у заздалегідь перекладених літералах,
+    далі — в обмеженому LRU-кеші (динамічно зібрані запити).
+    """
+    try:
+        return _PRETRANSLATED[sql]
+    except KeyError:
+        return _translate_cached(sql)
+
+
+def pretranslate_dao_modules(dao_dir=None):
+    """
+    Обходить усі модулі app/dao/, знаходить рядкові літерали з SQL
+    і кладе їх переклад у _PRETRANSLATED. Повертає кількість запитів.
+    """
+    if dao_dir is None:
+        dao_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'dao')
+
+    for fname in sorted(os.listdir(dao_dir)):
+        if not fname.endswith('.py'):
+            continue
+        with open(os.path.join(dao_dir, fname), encoding='utf-8') as fh:
+            tree = ast.parse(fh.read(), filename=fname)
+        for node in ast.walk(tree):
+            if (isinstance(node, ast.Constant)
+                    and isinstance(node.value, str)
+                    and _SQL_START_RE.match(node.value)):
+                _PRETRANSLATED[node.value] = _translate_cached.__wrapped__(node.value)
+    return len(_PRETRANSLATED)
+
+
+def translation_stats():
+    """Лічильники кешу трансляції SQL."""
+    info = _translate_cached.cache_info()
+    return {
+        'hits':          info.hits,
+        'misses':        info.misses,
+        'size':          info.currsize,
+        'maxsize':       info.maxsize,
+        'pretranslated': len(_PRETRANSLATED)
+    }
+
 
 class SQLiteConnectionWrapper:
     """Обгортка для sqlite3.Connection, яка конвертує PostgreSQL SQL у SQLite"""
     
-    def __init__(self, conn):
+    def __init__(self, conn, pool=None):
         self._conn = conn
+        self._pool = pool
     
-    def cursor(self):
+    def cursor(self, name=None):
+        # name — серверний курсор PostgreSQL; sqlite3 і так віддає рядки
+        # покроково, тож для SQLite він не потрібен
         return SQLiteCursorWrapper(self._conn.cursor())
     
     def commit(self):
@@ -20,6 +106,10 @@ class SQLiteConnectionWrapper:
         return self._conn.rollback()
     
     def close(self):
+        # З'єднання з пулу не закриваємо, а повертаємо назад (лише один раз)
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            return pool.release(self._conn)
         return self._conn.close()
     
     def __enter__(self):
@@ -33,29 +123,38 @@ class SQLiteConnectionWrapper:
 
 class SQLiteCursorWrapper:
     """Обгортка для sqlite3.Cursor, яка конвертує PostgreSQL синтаксис у SQLite"""
+
+    _translate = staticmethod(translate_sql)
     
     def __init__(self, cursor):
         self._cursor = cursor
+        self._entry  = None     # запис журналу останньої інструкції
     
     def execute(self, sql, params=None):
-        # Конвертуємо %s плейсхолдери в ?
+        # Конвертуємо PostgreSQL-синтаксис (%s, ILIKE) через кеш трансляції
         if isinstance(sql, str):
-            sql = sql.replace('%s', '?')
-            # Конвертуємо ILIKE в LIKE (SQLite не підтримує ILIKE)
-            sql = re.sub(r'\bILIKE\b', 'LIKE', sql, flags=re.IGNORECASE)
-            # Видаляємо COALESCE MAX конструкції, які не працюють в деяких місцях
-            # SQLite підтримує COALESCE, тому залишаємо як є
+            sql = self._translate(sql)
         
+        started = time.perf_counter()
         if params is None:
-            return self._cursor.execute(sql)
-        return self._cursor.execute(sql, params)
+            result = self._cursor.execute(sql)
+        else:
+            result = self._cursor.execute(sql, params)
+        self._entry = query_log.record(sql, params, started, self._cursor)
+        return result
     
     def executemany(self, sql, params):
-        sql = sql.replace('%s', '?')
-        return self._cursor.executemany(sql, params)
+        sql = self._translate(sql)
+        started = time.perf_counter()
+        result = self._cursor.executemany(sql, params)
+        self._entry = query_log.record(sql, None, started, self._cursor)
+        return result
     
     def fetchone(self):
+        started = time.perf_counter()
         row = self._cursor.fetchone()
+        if self._entry is not None:
+            query_log.add_fetch(self._entry, started, 0 if row is None else 1)
         if row is None:
             return None
         # Конвертуємо sqlite3.Row у tuple для сумісності
@@ -64,12 +163,24 @@ class SQLiteCursorWrapper:
         return row
     
     def fetchall(self):
+        started = time.perf_counter()
         rows = self._cursor.fetchall()
+        if self._entry is not None:
+            query_log.add_fetch(self._entry, started, len(rows))
         # Конвертуємо sqlite3.Row у tuple
         if rows and isinstance(rows[0], sqlite3.Row):
             return [tuple(row) for row in rows]
         return rows
     
+    def fetchmany(self, size):
+        started = time.perf_counter()
+        rows = self._cursor.fetchmany(size)
+        if self._entry is not None:
+            query_log.add_fetch(self._entry, started, len(rows))
+        if rows and isinstance(rows[0], sqlite3.Row):
+            return [tuple(row) for row in rows]
+        return rows
+    
     def close(self):
         return self._cursor.close()
     
@@ -78,44 +189,382 @@ class SQLiteCursorWrapper:
         return self._cursor.rowcount
 
 
+class PoolTimeout(Exception):
+    """Не вдалося отримати з'єднання з пулу за відведений час."""
+
+
+class SQLiteConnectionPool:
+    """
+    Обмежений потокобезпечний пул з'єднань SQLite (один на процес).
+
+    * не більше `size` відкритих з'єднань; якщо всі зайняті — чекаємо
+      до `timeout` секунд, після чого кидаємо PoolTimeout;
+    * PRAGMA-налаштування виконуються один раз при створенні з'єднання;
+    * з'єднання, що простояло довше `healthcheck_idle` секунд,
+      перевіряється `SELECT 1` перед видачею;
+    * при поверненні незавершена транзакція відкочується.
+    """
+
+    def __init__(self, db_path, size=8, timeout=5.0,
+                 pragmas=None, healthcheck_idle=30.0):
+        self.db_path          = db_path
+        self.size             = size
+        self.timeout          = timeout
+        self.pragmas          = dict(pragmas or {})
+        self.healthcheck_idle = healthcheck_idle
+
+        self._cond    = threading.Condition()
+        self._idle    = deque()          # (conn, момент повернення)
+        self._created = 0
+        self._stats   = {
+            'checkouts': 0,              # видано з'єднань
+            'waits':     0,              # скільки разів довелося чекати
+            'timeouts':  0,              # скільки разів не дочекалися
+            'created':   0,              # відкрито з'єднань за весь час
+            'discarded': 0               # відкинуто «битих» з'єднань
+        }
+
+    # ── службові ─────────────────────────────────────────────────────
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Для доступу до колонок за іменем
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    @staticmethod
+    def _healthy(conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _forget(self, conn):
+        """Закриває з'єднання і звільняє місце в пулі."""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._cond:
+            self._created -= 1
+            self._stats['discarded'] += 1
+            self._cond.notify()
+
+    # ── публічний інтерфейс ──────────────────────────────────────────
+    def acquire(self):
+        """Видає вільне з'єднання (або відкриває нове, якщо є місце)."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn = last_used = None
+            with self._cond:
+                waited = False
+                while not self._idle and self._created >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeout(
+                            f"Усі {self.size} з'єднань зайняті "
+                            f"понад {self.timeout} с"
+                        )
+                    if not waited:
+                        self._stats['waits'] += 1
+                        waited = True
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                else:
+                    self._created += 1
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._created -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._stats['created'] += 1
+            elif (time.monotonic() - last_used > self.healthcheck_idle
+                  and not self._healthy(conn)):
+                self._forget(conn)
+                continue
+
+            with self._cond:
+                self._stats['checkouts'] += 1
+            return conn
+
+    def release(self, conn):
+        """Повертає з'єднання в пул (відкочуючи незавершену транзакцію)."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._forget(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self):
+        """Закриває всі вільні з'єднання (зайняті закриються при поверненні)."""
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._created -= 1
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+
+    def stats(self):
+        with self._cond:
+            return {
+                **self._stats,
+                'size':   self.size,
+                'open':   self._created,
+                'idle':   len(self._idle),
+                'in_use': self._created - len(self._idle)
+            }
+
+
+# ─────────────────── PostgreSQL (psycopg_pool) ───────────────────
+class PostgresCursorWrapper(SQLiteCursorWrapper):
+    """Курсор psycopg: DAO вже пишуть діалектом PostgreSQL, SQL іде без змін."""
+
+    @staticmethod
+    def _translate(sql):
+        return sql
+
+
+class PostgresConnectionWrapper(SQLiteConnectionWrapper):
+    """З'єднання psycopg з тим самим інтерфейсом, що й SQLiteConnectionWrapper."""
+
+    def cursor(self, name=None):
+        # з name — серверний курсор (DECLARE … CURSOR): рядки приходять
+        # порціями fetchmany, а не всім результатом одразу
+        if name:
+            return PostgresCursorWrapper(self._conn.cursor(name=name))
+        return PostgresCursorWrapper(self._conn.cursor())
+
+
+class PostgresConnectionPool:
+    """
+    psycopg_pool.ConnectionPool з інтерфейсом SQLiteConnectionPool
+    (acquire / release / close_all / stats).
+    """
+
+    def __init__(self, conninfo, size=8, timeout=5.0, healthcheck_idle=30.0):
+        if psycopg is None:
+            raise RuntimeError(
+                "DB_BACKEND='postgres' потребує пакетів psycopg і psycopg_pool"
+            )
+        from psycopg_pool import ConnectionPool
+
+        self.size    = size
+        self.timeout = timeout
+        self._pool   = ConnectionPool(
+            conninfo,
+            min_size=1,
+            max_size=size,
+            timeout=timeout,
+            # з'єднання, що простояли довше, закриваються самим пулом
+            max_idle=max(healthcheck_idle, 60.0),
+            open=True
+        )
+
+    def acquire(self):
+        from psycopg_pool import PoolTimeout as _PgPoolTimeout
+        try:
+            return self._pool.getconn()
+        except _PgPoolTimeout as e:
+            raise PoolTimeout(str(e)) from e
+
+    def release(self, conn):
+        # як і для SQLite: незавершену (зокрема лише читальну) транзакцію
+        # відкочуємо тут, щоб пул не попереджав про «брудне» з'єднання
+        try:
+            if (conn.info.transaction_status
+                    != psycopg.pq.TransactionStatus.IDLE):
+                conn.rollback()
+        except psycopg.Error:
+            pass
+        self._pool.putconn(conn)
+
+    def close_all(self):
+        self._pool.close()
+
+    def stats(self):
+        st = self._pool.get_stats()
+        size, idle = st.get('pool_size', 0), st.get('pool_available', 0)
+        return {
+            'checkouts': st.get('requests_num', 0),
+            'waits':     st.get('requests_queued', 0),
+            'timeouts':  st.get('requests_errors', 0),
+            'created':   st.get('connections_num', 0),
+            'discarded': st.get('connections_lost', 0),
+            'size':      self.size,
+            'open':      size,
+            'idle':      idle,
+            'in_use':    size - idle
+        }
+
+
+_WRAPPERS = {
+    'sqlite':   SQLiteConnectionWrapper,
+    'postgres': PostgresConnectionWrapper
+}
+
+
+def backend() -> str:
+    """Активний бекенд БД: 'sqlite' або 'postgres' (Config.DB_BACKEND)."""
+    return current_app.config.get('DB_BACKEND', 'sqlite')
+
+
+_pool = None
+_aux_pool = None        # службовий пул get_dedicated_db (не для запитів)
+_pool_lock = threading.Lock()
+
+
+def _new_pool(size: int):
+    """Пул активного бекенду на size з'єднань (решта — з Config.DB_POOL_*)."""
+    cfg = current_app.config
+    if backend() == 'postgres':
+        return PostgresConnectionPool(
+            cfg['DB_URL'],
+            size=size,
+            timeout=cfg['DB_POOL_TIMEOUT'],
+            healthcheck_idle=cfg['DB_POOL_HEALTHCHECK_IDLE']
+        )
+    return SQLiteConnectionPool(
+        cfg['SQLITE_PATH'],
+        size=size,
+        timeout=cfg['DB_POOL_TIMEOUT'],
+        pragmas=cfg['DB_PRAGMAS'],
+        healthcheck_idle=cfg['DB_POOL_HEALTHCHECK_IDLE']
+    )
+
+
+def get_pool():
+    """
+    Повертає пул з'єднань процесу, створюючи його при першому виклику.
+    Перевірка наявності файлу БД і міграції теж виконуються лише тут, один раз.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                if backend() == 'sqlite':
+                    db_path = current_app.config['SQLITE_PATH']
+
+                    # Якщо БД не існує, створюємо її
+                    if not os.path.exists(db_path):
+                        print(f"[INFO] Database not found, creating new one at {db_path}")
+                        from app.init_db import init_database
+                        init_database()
+
+                pool = _new_pool(current_app.config['DB_POOL_SIZE'])
+
+                # доповнення схеми (агрегати, індекси) — теж один раз
+                from app.utils.migrations import apply_migrations
+                conn = pool.acquire()
+                try:
+                    apply_migrations(conn, backend())
+                finally:
+                    pool.release(conn)
+                _pool = pool
+    return _pool
+
+
+_CHECKPOINT_MODES = ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE')
+
+
+def wal_checkpoint(mode: str = 'PASSIVE') -> dict:
+    """
+    Переносить сторінки з WAL-журналу в основний файл БД.
+
+    PASSIVE не блокує нікого й переносить лише те, що можна зараз;
+    TRUNCATE чекає на письменників і обрізає журнал до нуля
+    (для ручного обслуговування).
+    Повертає {'mode', 'busy', 'log', 'checkpointed'} — як PRAGMA wal_checkpoint.
+    """
+    if backend() != 'sqlite':
+        raise ValueError("Checkpoint WAL-журналу є лише в SQLite")
+    mode = mode.upper()
+    if mode not in _CHECKPOINT_MODES:
+        raise ValueError(f"Невідомий режим checkpoint: {mode}")
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        busy, log, checkpointed = conn.execute(
+            f"PRAGMA wal_checkpoint({mode})"
+        ).fetchone()
+    finally:
+        pool.release(conn)
+    return {'mode': mode, 'busy': busy, 'log': log,
+            'checkpointed': checkpointed}
+
+
+def pool_stats():
+    """Статистика пулу (або None, якщо пул ще не створено)."""
+    return _pool.stats() if _pool is not None else None
+
+
 def get_db():
     """
-    Повертає з'єднання з SQLite базою даних.
+    Повертає з'єднання з базою даних (SQLite або PostgreSQL — Config.DB_BACKEND).
+    З'єднання береться з пулу процесу і закріплюється за поточним запитом.
     """
     if 'db_conn' not in g:
         try:
-            # Шлях до SQLite бази
-            db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'zlagoda.db')
-            
-            # Якщо БД не існує, створюємо її
-            if not os.path.exists(db_path):
-                print(f"[INFO] Database not found, creating new one at {db_path}")
-                from app.init_db import init_database
-                init_database()
-            
-            conn = sqlite3.connect(db_path)
-            conn.row_factory = sqlite3.Row  # Для доступу до колонок за іменем
-            g.db_conn = SQLiteConnectionWrapper(conn)
-            
+            pool = get_pool()
+            g.db_conn = _WRAPPERS[backend()](pool.acquire(), pool)
         except Exception as e:
             print(f"[WARNING] Failed to connect to database: {e}")
             g.db_conn = None
     
     return g.db_conn
 
+def get_dedicated_db():
+    """
+    Окреме з'єднання, НЕ закріплене за запитом (g.db_conn) — для коротких
+    незалежних транзакцій, що не мають комітити чи відкочувати транзакцію
+    викликача (резерв блоків id_allocator):
+
+        with get_dedicated_db() as conn:
+            ...
+            conn.commit()
+
+    Береться зі службового пулу (Config.DB_AUX_POOL_SIZE), а не з пулу
+    запитів: викликач зазвичай уже тримає з'єднання запиту, і при
+    вичерпаному пулі друге з'єднання з нього не дочекалося б PoolTimeout.
+    На виході з with (зокрема після винятку — з rollback) з'єднання
+    повертається в службовий пул.
+    """
+    global _aux_pool
+    if _aux_pool is None:
+        get_pool()                  # файл БД і міграції
+        with _pool_lock:
+            if _aux_pool is None:
+                _aux_pool = _new_pool(current_app.config['DB_AUX_POOL_SIZE'])
+    return _WRAPPERS[backend()](_aux_pool.acquire(), _aux_pool)
+
+
 def close_db(conn=None):
     """
-    Закриває з'єднання, якщо було відкрите.
+    Повертає з'єднання в пул, якщо було відкрите.
     Викликається автоматично після кожного контексту запиту.
     
     Якщо conn передано явно - ігноруємо (для сумісності зі старим кодом),
-    оскільки з'єднання закриється автоматично через teardown.
+    оскільки з'єднання повернеться в пул автоматично через teardown.
     """
     if conn is not None:
         # Якщо передано conn - не закриваємо, це викликано всередині запиту
         return
     
-    # Закриваємо тільки коли викликано без параметрів (з teardown)
+    # Повертаємо тільки коли викликано без параметрів (з teardown)
     conn = g.pop('db_conn', None)
     if conn:
         try:
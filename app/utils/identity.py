@@ -0,0 +1,60 @@
+# app/utils/identity.py
+"""
+Кеш ідентичності автентифікованого користувача (g.current_user).
+
+Запис живе Config.IDENTITY_TTL секунд і явно скидається з DAO
+при зміні/видаленні працівника чи створенні облікового запису.
+Кеш — у межах процесу.
+"""
+
+import threading
+import time
+from typing import NamedTuple
+
+
+class CurrentUser(NamedTuple):
+    """Незмінний запис про користувача, доступний у шаблонах як current_user."""
+    id:          int
+    username:    str
+    name:        str              # «Прізвище Ім'я» або username
+    role:        str
+    employee_id: str | None
+
+
+_cache: dict[int, tuple[float, CurrentUser]] = {}
+_lock = threading.Lock()
+
+
+def get(user_id: int) -> CurrentUser | None:
+    """Повертає користувача з кешу або None, якщо запису немає чи він застарів."""
+    item = _cache.get(user_id)
+    if item is None:
+        return None
+    expires, user = item
+    if expires < time.monotonic():
+        with _lock:
+            _cache.pop(user_id, None)
+        return None
+    return user
+
+
+def put(user: CurrentUser, ttl: float) -> None:
+    with _lock:
+        _cache[user.id] = (time.monotonic() + ttl, user)
+
+
+def invalidate(user_id: int | None = None,
+               employee_id: str | None = None,
+               username: str | None = None) -> None:
+    """Скидає записи, що відповідають будь-якому з переданих ключів."""
+    with _lock:
+        for uid, (_, user) in list(_cache.items()):
+            if (uid == user_id
+                    or (employee_id is not None and user.employee_id == employee_id)
+                    or (username is not None and user.username == username)):
+                del _cache[uid]
+
+
+def clear() -> None:
+    with _lock:
+        _cache.clear()
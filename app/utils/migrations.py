@@ -0,0 +1,332 @@
+"""
+Ідемпотентні доповнення схеми БД (таблиці-агрегати, індекси тощо).
+
+Кожна міграція — ім'я та список SQL-інструкцій; виконується один раз
+в окремій транзакції й записується в таблицю schema_migrations.
+Якщо SQL залежить від бекенду, замість списку — словник
+{'sqlite': (...), 'postgres': (...)}. Крок, якого не виразити SQL,
+задається функцією (conn, pg).
+Застосовуються при створенні пулу з'єднань (див. app/utils/db.py).
+"""
+
+from typing import Any, Callable
+
+from app.utils.sql import search_key
+
+# початкове наповнення агрегатів з наявної історії (однакове для обох БД)
+_ROLLUP_BACKFILL = (
+    """
+    INSERT INTO sales_daily_cashier (sale_day, id_employee, checks, sum_total)
+    SELECT DATE(print_date), id_employee, COUNT(*), SUM(sum_total)
+      FROM "check"
+     GROUP BY DATE(print_date), id_employee
+    """,
+    """
+    INSERT INTO sales_daily_upc (sale_day, UPC, units, revenue)
+    SELECT DATE(c.print_date), s.UPC,
+           SUM(s.product_number), SUM(s.product_number * s.selling_price)
+      FROM Sale    s
+      JOIN "check" c ON c.check_number = s.check_number
+     GROUP BY DATE(c.print_date), s.UPC
+    """,
+)
+
+_ROLLUP_INDEXES = (
+    """
+    CREATE INDEX IF NOT EXISTS ix_sales_daily_cashier_empl
+        ON sales_daily_cashier (id_employee, sale_day)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_sales_daily_upc_day
+        ON sales_daily_upc (sale_day)
+    """,
+)
+
+# лічильники поколінь для кешу звітів (app/utils/report_cache.py):
+# gen таблиці збільшує report_cache.bump() раз на транзакцію запису (DAO,
+# черга чеків, datagen); ручний SQL повз DAO кеш не скидає
+_GEN_TABLES = ('sale', 'check', 'store_product', 'product', 'category',
+               'employee')
+
+_GEN_TABLE = (
+    """
+    CREATE TABLE IF NOT EXISTS report_generation (
+        name VARCHAR(20) PRIMARY KEY,
+        gen  BIGINT      NOT NULL DEFAULT 0
+    )
+    """,
+    *(f"INSERT INTO report_generation (name, gen) VALUES ('{name}', 0)"
+      for name in _GEN_TABLES),
+)
+
+
+def _fill_surname_keys(conn, pg: bool) -> None:
+    """Ключ пошуку для карток, створених до міграції 0004."""
+    rows = conn.execute(
+        "SELECT card_number, cust_surname FROM Customer_Card"
+    ).fetchall()
+    mark = '%s' if pg else '?'
+    conn.cursor().executemany(
+        f"UPDATE Customer_Card SET cust_surname_key = {mark} "
+        f"WHERE card_number = {mark}",
+        [(search_key(surname), number) for number, surname in rows]
+    )
+
+
+_SURNAME_KEY_INDEX = """
+    CREATE INDEX IF NOT EXISTS ix_card_surname_key
+        ON Customer_Card (cust_surname_key, card_number)
+"""
+
+# крок міграції — SQL або функція (conn, pg) для того, чого не вміє SQL
+# обох діалектів (напр. lower() SQLite не знає кирилиці)
+Step = str | Callable[[Any, bool], None]
+
+MIGRATIONS: list[tuple[str, tuple[Step, ...] | dict[str, tuple[Step, ...]]]] = [
+    # денні агрегати продажів: день × касир і день × UPC
+    ('0001_sales_rollups', {
+        'sqlite': (
+            """
+            CREATE TABLE IF NOT EXISTS sales_daily_cashier (
+                sale_day    TEXT    NOT NULL,
+                id_employee TEXT    NOT NULL,
+                checks      INTEGER NOT NULL DEFAULT 0,
+                sum_total   REAL    NOT NULL DEFAULT 0,
+                PRIMARY KEY (sale_day, id_employee)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS sales_daily_upc (
+                sale_day TEXT    NOT NULL,
+                UPC      TEXT    NOT NULL,
+                units    INTEGER NOT NULL DEFAULT 0,
+                revenue  REAL    NOT NULL DEFAULT 0,
+                PRIMARY KEY (UPC, sale_day)
+            )
+            """,
+            *_ROLLUP_INDEXES,
+            *_ROLLUP_BACKFILL,
+        ),
+        'postgres': (
+            """
+            CREATE TABLE IF NOT EXISTS sales_daily_cashier (
+                sale_day    DATE          NOT NULL,
+                id_employee VARCHAR(10)   NOT NULL,
+                checks      INTEGER       NOT NULL DEFAULT 0,
+                sum_total   NUMERIC(13,4) NOT NULL DEFAULT 0,
+                PRIMARY KEY (sale_day, id_employee)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS sales_daily_upc (
+                sale_day DATE          NOT NULL,
+                UPC      VARCHAR(12)   NOT NULL,
+                units    INTEGER       NOT NULL DEFAULT 0,
+                revenue  NUMERIC(13,4) NOT NULL DEFAULT 0,
+                PRIMARY KEY (UPC, sale_day)
+            )
+            """,
+            *_ROLLUP_INDEXES,
+            *_ROLLUP_BACKFILL,
+        ),
+    }),
+
+    # індекси під фільтри періоду та вибірку рядків чека
+    ('0002_check_sale_indexes', (
+        """
+        CREATE INDEX IF NOT EXISTS ix_check_print_date
+            ON "check" (print_date)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_check_employee_print_date
+            ON "check" (id_employee, print_date)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_sale_check_number
+            ON Sale (check_number)
+        """,
+    )),
+
+    # повнотекстовий індекс товарів (назва, характеристики, категорія);
+    # SQLite: FTS5, rowid = Product.id_product, синхронізується тригерами
+    ('0003_product_fts', {
+        'sqlite': (
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS product_fts USING fts5(
+                product_name, characteristics, category_name,
+                tokenize = 'unicode61'
+            )
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_product_fts_ins
+            AFTER INSERT ON Product BEGIN
+                INSERT INTO product_fts (rowid, product_name, characteristics, category_name)
+                SELECT NEW.id_product, NEW.product_name, NEW.characteristics,
+                       (SELECT category_name FROM Category
+                         WHERE category_number = NEW.category_number);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_product_fts_upd
+            AFTER UPDATE ON Product BEGIN
+                DELETE FROM product_fts WHERE rowid = OLD.id_product;
+                INSERT INTO product_fts (rowid, product_name, characteristics, category_name)
+                SELECT NEW.id_product, NEW.product_name, NEW.characteristics,
+                       (SELECT category_name FROM Category
+                         WHERE category_number = NEW.category_number);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_product_fts_del
+            AFTER DELETE ON Product BEGIN
+                DELETE FROM product_fts WHERE rowid = OLD.id_product;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_category_fts_upd
+            AFTER UPDATE OF category_name ON Category BEGIN
+                UPDATE product_fts
+                   SET category_name = NEW.category_name
+                 WHERE rowid IN (SELECT id_product FROM Product
+                                  WHERE category_number = NEW.category_number);
+            END
+            """,
+            """
+            INSERT INTO product_fts (rowid, product_name, characteristics, category_name)
+            SELECT p.id_product, p.product_name, p.characteristics, c.category_name
+              FROM Product  p
+              JOIN Category c ON c.category_number = p.category_number
+            """,
+        ),
+        # PostgreSQL: вбудований повнотекстовий пошук по виразах
+        # to_tsvector('simple', …), див. app/utils/sql.ts_query
+        'postgres': (
+            """
+            CREATE INDEX IF NOT EXISTS ix_product_name_tsv
+                ON Product USING gin (to_tsvector('simple', product_name))
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS ix_product_characteristics_tsv
+                ON Product USING gin (to_tsvector('simple', characteristics))
+            """,
+        ),
+    }),
+
+    # префіксний пошук карток за прізвищем (автодоповнення) незалежно від
+    # регістру: прізвище зберігається як введене, поруч — ключ пошуку
+    # (app/utils/sql.search_key); наявні картки заповнює _fill_surname_keys
+    ('0004_card_surname_key', {
+        'sqlite': (
+            'ALTER TABLE Customer_Card ADD COLUMN cust_surname_key TEXT',
+            _fill_surname_keys,
+            _SURNAME_KEY_INDEX,
+        ),
+        'postgres': (
+            'ALTER TABLE Customer_Card ADD COLUMN IF NOT EXISTS cust_surname_key TEXT',
+            _fill_surname_keys,
+            _SURNAME_KEY_INDEX,
+        ),
+    }),
+
+    # підсумки чека, пораховані create_check (vat уже є в схемі);
+    # старі чеки заповнює `flask checks backfill-totals`
+    ('0005_check_totals', {
+        'sqlite': (
+            'ALTER TABLE "check" ADD COLUMN subtotal   REAL',
+            'ALTER TABLE "check" ADD COLUMN discount   REAL',
+            'ALTER TABLE "check" ADD COLUMN line_count INTEGER',
+        ),
+        'postgres': (
+            'ALTER TABLE "check" ADD COLUMN IF NOT EXISTS subtotal   NUMERIC(13,4)',
+            'ALTER TABLE "check" ADD COLUMN IF NOT EXISTS discount   NUMERIC(13,4)',
+            'ALTER TABLE "check" ADD COLUMN IF NOT EXISTS line_count INTEGER',
+        ),
+    }),
+
+    # послідовності ID для app/services/id_allocator.py; стартують
+    # за наявним максимумом, тож нові ID не перетнуться зі старими.
+    # Старі UPC і номери карток випадкові, тож максимум буває близько
+    # межі формату — тоді id_allocator.format_* кидає ValueError, а не
+    # видає 13-значний UPC
+    ('0006_id_sequence', (
+        """
+        CREATE TABLE IF NOT EXISTS id_sequence (
+            name       VARCHAR(20) PRIMARY KEY,
+            next_value BIGINT      NOT NULL
+        )
+        """,
+        """
+        INSERT INTO id_sequence (name, next_value)
+        SELECT 'category', COALESCE(MAX(category_number), 0) + 1 FROM Category
+        """,
+        """
+        INSERT INTO id_sequence (name, next_value)
+        SELECT 'product', COALESCE(MAX(id_product), 0) + 1 FROM Product
+        """,
+        """
+        INSERT INTO id_sequence (name, next_value)
+        SELECT 'upc', COALESCE(MAX(CAST(SUBSTR(UPC, 1, 11) AS BIGINT)), 0) + 1
+          FROM Store_Product
+        """,
+        """
+        INSERT INTO id_sequence (name, next_value)
+        SELECT 'card', COALESCE(MAX(CAST(SUBSTR(card_number, 2) AS BIGINT)), 0) + 1
+          FROM Customer_Card
+        """,
+        "INSERT INTO id_sequence (name, next_value) VALUES ('check', 1)",
+    )),
+
+    # покоління таблиць для кешу звітів (збільшує report_cache.bump())
+    ('0007_report_generation', _GEN_TABLE),
+]
+
+
+def apply_migrations(conn, dialect: str = 'sqlite') -> list[str]:
+    """
+    Застосовує ще не виконані міграції до «сирого» з'єднання
+    (sqlite3 або psycopg — dialect 'sqlite' / 'postgres').
+    Повертає імена застосованих міграцій.
+    """
+    pg = dialect == 'postgres'
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name       TEXT PRIMARY KEY,
+            applied_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.commit()
+
+    applied = []
+    for name, statements in MIGRATIONS:
+        if isinstance(statements, dict):
+            statements = statements[dialect]
+        # блокування — щоб два процеси не виконали ту саму міграцію двічі
+        if pg:
+            conn.execute("LOCK TABLE schema_migrations IN EXCLUSIVE MODE")
+        else:
+            conn.execute("BEGIN IMMEDIATE")
+        try:
+            done = conn.execute(
+                "SELECT 1 FROM schema_migrations WHERE name = "
+                + ('%s' if pg else '?'),
+                (name,)
+            ).fetchone()
+            if not done:
+                for step in statements:
+                    if callable(step):
+                        step(conn, pg)
+                    else:
+                        conn.execute(step)
+                conn.execute(
+                    "INSERT INTO schema_migrations (name, applied_at) "
+                    "VALUES (" + ('%s' if pg else '?') + ", CURRENT_TIMESTAMP)",
+                    (name,)
+                )
+                applied.append(name)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return applied
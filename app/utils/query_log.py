@@ -0,0 +1,206 @@
+"""
+Інструментування запитів до БД.
+
+* кожна інструкція курсора з app/utils/db.py записується в g.query_log
+  (SQL, тривалість, кількість рядків, DAO-функція, що її викликала);
+  тривалість — execute разом із вибіркою рядків (fetch*). Лічильники
+  рахують усі інструкції, а в самому журналі лишаються не більше
+  Config.QUERY_LOG_KEEP найповільніших — довгий експорт його не роздуває;
+* після запиту підсумок (кількість запитів і час у БД) додається
+  в заголовки відповіді X-DB-Queries / X-DB-Time-ms / Server-Timing
+  (у потокової відповіді заголовки йдуть до тіла, тож вибірка під час
+  стрімінгу видна лише в лозі повільних запитів);
+* повільні запити (Config.SLOW_QUERY_MS) пишуться в лог разом
+  із EXPLAIN QUERY PLAN (лише SELECT / INSERT / UPDATE / DELETE; на
+  PostgreSQL — у SAVEPOINT, щоб невдалий EXPLAIN не перервав транзакцію
+  викликача), а надто балакучі запити — з переліком викликів.
+"""
+
+import logging
+import re
+import sys
+import time
+from collections import Counter
+
+from flask import current_app, g, has_app_context, request
+
+
+slow_log = logging.getLogger('zlagoda.slow_query')
+
+# EXPLAIN має сенс (і гарантовано розбирається) лише для DML-інструкцій
+_EXPLAINABLE_RE = re.compile(r'^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b',
+                             re.IGNORECASE)
+
+
+def _caller() -> str:
+    """
+    Перша функція з app.dao / app.services у стеку викликів
+    (або, якщо таких немає, перша з коду застосунку поза app.utils).
+    """
+    fallback = '?'
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith(('app.dao.', 'app.services.')):
+            return f"{module}.{frame.f_code.co_name}"
+        if (fallback == '?' and module.startswith('app')
+                and not module.startswith('app.utils')):
+            fallback = f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return fallback
+
+
+def _state() -> dict:
+    """
+    Журнал поточного контексту: лічильники по всіх інструкціях
+    (кількість, сумарний час, виклики за DAO-функціями) і g.query_log —
+    не більше QUERY_LOG_KEEP найповільніших записів.
+    """
+    st = g.get('query_stats')
+    if st is None:
+        st = g.query_stats = {'count': 0, 'ms': 0.0, 'callers': Counter()}
+        g.query_log = []
+    return st
+
+
+def reset() -> None:
+    """Очищає журнал поточного контексту (напр. перед заміром у бенчмарку)."""
+    g.pop('query_stats', None)
+    g.pop('query_log', None)
+
+
+def record(sql, params, started: float, raw_cursor) -> dict | None:
+    """
+    Записує виконану інструкцію. Викликається з SQLiteCursorWrapper
+    одразу після execute; started — time.perf_counter() до виконання.
+    Час подальшої вибірки рядків додає add_fetch.
+    """
+    elapsed = (time.perf_counter() - started) * 1000
+    if not has_app_context() or not current_app.config.get('QUERY_LOG_ENABLED'):
+        return None
+
+    entry = {
+        'sql':      sql,
+        'ms':       elapsed,
+        'fetch_ms': 0.0,
+        'rows':     raw_cursor.rowcount,
+        'caller':   _caller(),
+        'slow':     False,
+        # для EXPLAIN, якщо запит стане повільним уже під час вибірки
+        '_explain': (raw_cursor.connection, params)
+    }
+    st = _state()
+    st['count'] += 1
+    st['ms']    += elapsed
+    st['callers'][entry['caller']] += 1
+
+    log  = g.query_log
+    keep = current_app.config.get('QUERY_LOG_KEEP', 50)
+    log.append(entry)
+    if len(log) > 2 * keep:
+        # лишаємо найповільніші; останній запис — завжди, йому ще може
+        # додатися час вибірки
+        slowest = sorted(log[:-1], key=lambda e: e['ms'], reverse=True)
+        log[:] = slowest[:keep - 1] + [entry]
+
+    _check_slow(entry)
+    return entry
+
+
+def add_fetch(entry: dict, started: float, rows: int) -> None:
+    """
+    Додає до запису час і кількість рядків вибірки (fetchone / fetchall /
+    fetchmany): для потокових і великих результатів саме тут більша
+    частина часу в БД.
+    """
+    elapsed = (time.perf_counter() - started) * 1000
+    entry['ms']       += elapsed
+    entry['fetch_ms'] += elapsed
+    entry['rows']      = max(entry['rows'], 0) + rows
+    st = g.get('query_stats')
+    if st is not None:
+        st['ms'] += elapsed
+    _check_slow(entry)
+
+
+def _check_slow(entry: dict) -> None:
+    if (not entry['slow']
+            and entry['ms'] >= current_app.config.get('SLOW_QUERY_MS', 100)):
+        entry['slow'] = True
+        _log_slow(entry)
+
+
+def _plan(conn, sql: str, params) -> list:
+    """
+    План інструкції на з'єднанні викликача. На PostgreSQL — у SAVEPOINT:
+    помилка EXPLAIN інакше перервала б усю транзакцію викликача.
+    """
+    if current_app.config.get('DB_BACKEND') != 'postgres':
+        return conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    conn.execute("SAVEPOINT query_log_explain")
+    try:
+        return conn.execute("EXPLAIN " + sql, params).fetchall()
+    except Exception:
+        conn.execute("ROLLBACK TO SAVEPOINT query_log_explain")
+        raise
+    finally:
+        conn.execute("RELEASE SAVEPOINT query_log_explain")
+
+
+def _log_slow(entry: dict) -> None:
+    conn, params = entry['_explain']
+    if not _EXPLAINABLE_RE.match(entry['sql']):
+        plan_text = "    (EXPLAIN лише для SELECT / INSERT / UPDATE / DELETE)"
+    else:
+        try:
+            plan = _plan(conn, entry['sql'], params or ())
+            plan_text = "\n".join(f"    {row[-1]}" for row in plan)
+        except Exception as e:
+            plan_text = f"    (план недоступний: {type(e).__name__}: {e})"
+    slow_log.warning(
+        "%.1f ms (вибірка %.1f ms) у %s:\n%s\n  план:\n%s",
+        entry['ms'], entry['fetch_ms'], entry['caller'],
+        " ".join(entry['sql'].split()), plan_text
+    )
+
+
+def summary() -> dict:
+    """
+    Кількість запитів і сумарний час у БД (execute + вибірка рядків)
+    для поточного контексту — по всіх інструкціях, а не лише збережених.
+    """
+    st = g.get('query_stats')
+    if st is None:
+        return {'count': 0, 'ms': 0.0}
+    return {'count': st['count'], 'ms': st['ms']}
+
+
+def init_app(app) -> None:
+    if not slow_log.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(
+            logging.Formatter('[%(asctime)s] SLOW QUERY %(message)s')
+        )
+        slow_log.addHandler(handler)
+        slow_log.setLevel(logging.WARNING)
+
+    @app.after_request
+    def _db_summary_headers(response):
+        if not app.config.get('QUERY_LOG_ENABLED'):
+            return response
+        s = summary()
+        response.headers['X-DB-Queries'] = str(s['count'])
+        response.headers['X-DB-Time-ms'] = f"{s['ms']:.2f}"
+        response.headers['Server-Timing'] = (
+            f'db;dur={s["ms"]:.2f};desc="{s["count"]} queries"'
+        )
+
+        # N+1: надто багато запитів за один HTTP-запит
+        if s['count'] >= app.config.get('QUERY_COUNT_WARN', 50):
+            top = g.query_stats['callers'].most_common(3)
+            slow_log.warning(
+                "%s %s: %d запитів (%.1f ms); найчастіше: %s",
+                request.method, request.path, s['count'], s['ms'],
+                ", ".join(f"{c}×{n}" for c, n in top)
+            )
+        return response
@@ -0,0 +1,96 @@
+# app/utils/report_cache.py
+"""
+Кеш результатів важких звітів менеджера (app/dao/report_dao.py).
+
+Ключ — функція й аргументи; поруч із результатом зберігаються покоління
+таблиць, з яких звіт читає (report_generation). Поки покоління ті самі,
+результат віддається з пам'яті — ціна перевірки один SELECT до крихітної
+таблиці лічильників, а не JOIN по всій історії продажів.
+
+Покоління збільшує bump() у тій самій транзакції, що й запис, перед
+комітом: DAO — один раз на свою транзакцію, черга чеків — один раз на
+пакет. Не тригерами: рядок лічильника не переписується на кожен рядок
+Sale, а в PostgreSQL блокується лише на коміт, а не на весь запис.
+
+Лічильники живуть у БД, тож записи з інших процесів теж скидають кеш.
+Кеш — у межах процесу; закешовані списки не можна змінювати.
+"""
+
+import functools
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+
+from app.utils.db import get_db
+
+_cache: OrderedDict = OrderedDict()     # ключ → (покоління, результат)
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def generations(tables: tuple[str, ...]) -> tuple:
+    """Поточні покоління таблиць (у порядку tables)."""
+    cur = get_db().cursor()
+    cur.execute(
+        "SELECT name, gen FROM report_generation WHERE name IN ("
+        + ", ".join(["%s"] * len(tables)) + ")",
+        tables
+    )
+    gens = dict(cur.fetchall())
+    return tuple(gens.get(t) for t in tables)
+
+
+def bump(cur, *tables: str) -> None:
+    """
+    Нове покоління таблиць `tables` у транзакції запису (курсор cur) —
+    останньою інструкцією перед її комітом: покоління зміниться разом
+    із даними або не зміниться зовсім, а друге з'єднання не потрібне.
+    """
+    if not tables:
+        return
+    cur.execute(
+        "UPDATE report_generation SET gen = gen + 1 WHERE name IN ("
+        + ", ".join(["%s"] * len(tables)) + ")",
+        tables
+    )
+
+
+def cached_report(*tables: str):
+    """
+    Декоратор звіту, що залежить від таблиць `tables`
+    (імена з report_generation: 'sale', 'check', 'store_product', …).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cfg = current_app.config
+            if not cfg.get('REPORT_CACHE_ENABLED'):
+                return func(*args, **kwargs)
+
+            key  = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+            # покоління читаємо ДО звіту: запис, що встигне між ними,
+            # лише змусить наступний виклик перерахувати
+            gens = generations(tables)
+            with _lock:
+                item = _cache.get(key)
+                if item is not None and item[0] == gens:
+                    _cache.move_to_end(key)
+                    _stats['hits'] += 1
+                    return item[1]
+                _stats['misses'] += 1
+
+            result = func(*args, **kwargs)
+            with _lock:
+                _cache[key] = (gens, result)
+                _cache.move_to_end(key)
+                while len(_cache) > cfg['REPORT_CACHE_SIZE']:
+                    _cache.popitem(last=False)
+            return result
+        return wrapper
+    return decorator
+
+
+def stats() -> dict:
+    with _lock:
+        return {**_stats, 'size': len(_cache)}
@@ -0,0 +1,92 @@
+"""
+Спільні будівельники фрагментів SQL для DAO.
+"""
+
+import re
+from datetime import date, datetime, timedelta
+
+
+def date_range(column: str,
+               date_from: date | None,
+               date_to:   date | None) -> tuple[list[str], list]:
+    """
+    Умови для періоду [date_from; date_to] (обидві дати включно) у вигляді
+    напіввідкритого інтервалу: column >= date_from AND column < date_to + 1 день.
+
+    Колонка не обгортається у функцію (DATE(...)), тому працює індекс по ній.
+    Підходить і для дат-часу ("check".print_date), і для днів-рядків
+    'YYYY-MM-DD' (sale_day агрегатів).
+
+    Повертає (список умов, список параметрів).
+    """
+    where, params = [], []
+    if date_from:
+        where.append(f"{column} >= %s")
+        params.append(_day(date_from).isoformat())
+    if date_to:
+        where.append(f"{column} < %s")
+        params.append((_day(date_to) + timedelta(days=1)).isoformat())
+    return where, params
+
+
+def _day(value: date) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def fts_query(term: str, column: str | None = None) -> str | None:
+    """
+    Перетворює рядок пошуку користувача на запит FTS5 з префіксним
+    збігом кожного слова: 'мол гал' → '"мол"* "гал"*'.
+    column — обмежити пошук однією колонкою індексу.
+    Повертає None, якщо в рядку немає жодного слова.
+    """
+    words = _WORD_RE.findall(term or '')
+    if not words:
+        return None
+    query = " ".join('"' + w.replace('"', '""') + '"*' for w in words)
+    return f"{{{column}}} : ({query})" if column else query
+
+
+def ts_query(term: str) -> str | None:
+    """
+    Те саме для PostgreSQL (to_tsquery): 'мол гал' → 'мол:* & гал:*'.
+    Слова — лише \\w-символи, тож операторів tsquery у них немає.
+    """
+    words = _WORD_RE.findall(term or '')
+    if not words:
+        return None
+    return " & ".join(f"{w}:*" for w in words)
+
+
+def prefix_range(column: str, prefix: str) -> tuple[list[str], list]:
+    """
+    Умова «column починається з prefix» у вигляді діапазону
+    column >= prefix AND column < prefix з наступним останнім символом.
+
+    На відміну від LIKE 'prefix%', такий діапазон завжди йде по індексу
+    (B-дерево первинного ключа чи звичайний індекс на колонці).
+    Повертає (список умов, список параметрів).
+    """
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return [f"{column} >= %s", f"{column} < %s"], [prefix, upper]
+
+
+def kopecks(column: str) -> str:
+    """
+    Вираз «сума в column (гривні, NUMERIC / REAL) у цілих копійках» для
+    довгих списків — замість money.to_kop на кожен рядок у Python.
+    Записи йдуть через money.to_db, тож у БД лише цілі копійки
+    й округлення ROUND збігається з to_kop.
+    """
+    return f"CAST(ROUND({column} * 100) AS BIGINT)"
+
+
+def search_key(text: str) -> str:
+    """
+    Ключ регістронезалежного пошуку: 'McDonald' і 'MCDONALD' → 'mcdonald'.
+    Рахується в Python, бо lower() SQLite змінює лише латиницю.
+    """
+    return text.strip().casefold()
@@ -4,9 +4,8 @@ from flask import (
     render_template, request, redirect,
     url_for, flash, session
 )
-from app.dao.check_dao       import create_check, get_check_details
-from app.dao.product_dao     import get_all_products
-from app.dao.customer_card_dao import get_all_cards
+from app.dao.check_dao       import get_check_details
+from app.services.checkout_queue import place_check, CheckoutStatusUnknown
 from .routes                 import cashier_bp
 
 # ───────────────────── Деталі чека ─────────────────────
@@ -21,10 +20,8 @@ def receipt_detail(check_number):
 # ──────────────── Створення нового чека ────────────────
 @cashier_bp.route('/create_receipt', methods=('GET', 'POST'))
 def create_receipt():
-    # Завжди підтягуємо список товарів та карток
-    products = get_all_products(sort_by='name', order='asc')
-    cards    = get_all_cards()
-
+    # Товари й картки форма підтягує сама через /api/lookup/…,
+    # тож сторінка не залежить від розміру каталогу
     employee_id = session.get('employee_id')
     if not employee_id:
         flash('Увійдіть заново, щоб створити чек.', 'error')
@@ -54,14 +51,12 @@ def create_receipt():
             flash('Додайте хоча б один коректний товар.', 'error')
             return render_template(
                 'cashier/create_receipt.html',
-                products=products, cards=cards,
                 form_data=form_data, indices=indices
             )
 
         try:
-            # Створюємо чек і отримуємо його номер
-            chk_no = create_check(
-                None,               # номер генерується всередині DAO
+            # Створюємо чек (через чергу групового коміту) і отримуємо номер
+            chk_no = place_check(
                 employee_id,
                 form_data.get('card_number') or None,
                 sales
@@ -73,6 +68,13 @@ def create_receipt():
             ), 'message')
             return redirect(url_for('cashier.my_receipts'))
 
+        except CheckoutStatusUnknown as e:
+            # чек міг бути закомічений — не повертаємо заповнену форму
+            flash(Markup(
+                f'<div class="alert alert-warning">{e}</div>'
+            ), 'message')
+            return redirect(url_for('cashier.my_receipts'))
+
         except ValueError as e:
             # Помилка перевірки (наприклад, недостатньо товару)
             flash(Markup(
@@ -80,7 +82,6 @@ def create_receipt():
             ), 'message')
             return render_template(
                 'cashier/create_receipt.html',
-                products=products, cards=cards,
                 form_data=form_data, indices=indices
             )
 
@@ -92,13 +93,11 @@ def create_receipt():
             ), 'message')
             return render_template(
                 'cashier/create_receipt.html',
-                products=products, cards=cards,
                 form_data=form_data, indices=indices
             )
 
     # GET: просто виводимо порожню форму з одним рядком
     return render_template(
         'cashier/create_receipt.html',
-        products=products, cards=cards,
         form_data=form_data, indices=indices
     )
@@ -5,11 +5,11 @@
 from datetime   import date, datetime, timedelta
 from flask      import (
     Blueprint, render_template, session,
-    redirect, url_for, flash, request
+    redirect, url_for, flash, request, current_app
 )
 from app.utils.auth            import ensure_role
 from app.dao.product_dao       import (
-    get_all_products, get_all_product_types
+    get_all_product_types, get_products_page, count_store_products
 )
 from app.dao.category_dao      import get_all_categories
 from app.dao.check_dao         import (
@@ -42,9 +42,8 @@ def dashboard():
     # дані працівника
     emp = get_employee_by_id(emp_id)
 
-    # всі товари в магазині
-    items = get_all_products()
-    available_count = len(items)
+    # скільки товарів у магазині (COUNT(*), а не весь каталог)
+    available_count = count_store_products()
 
     return render_template(
         'cashier/dashboard.html',
@@ -68,16 +67,20 @@ def products():
 
     promotional = {'1': True, '0': False}.get(promo, None)
 
-    store_products = get_all_products(
+    page = get_products_page(
         sort_by, order,
         category, promotional,
-        search, field
+        search, field,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        limit=current_app.config['PRODUCTS_PAGE_SIZE']
     )
     categories = get_all_categories()
 
     return render_template(
         'cashier/products.html',
-        store_products=store_products,
+        store_products=page['items'],
+        page=page,
         sort_by=sort_by, order=order,
         category=category, promo=promo,
         search=search, field=field,
@@ -9,9 +9,11 @@
 • /store_products               – товари у магазині + CRUD
 • /reports                      – сторінка звітів
 • /reports/preview/<table>      – HTML-фрагмент для попереднього перегляду
+• /reports/export/<table>.csv   – потокове вивантаження таблиці (чеки — за період)
 • /receipts                     – список чеків з фільтром за періодом
 • /receipt/<check_number>       – деталі одного чека
 • /statistics                   – загальна статистика продажів
+• /db/checkpoint (POST)         – ручний checkpoint WAL-журналу SQLite
 """
 
 from datetime import date, datetime, timedelta
@@ -19,14 +21,17 @@ from decimal import Decimal
 
 from flask import (
     Blueprint, render_template, request,
-    redirect, url_for, flash, abort
+    redirect, url_for, flash, abort, current_app, jsonify,
+    Response, stream_with_context
 )
-import sqlite3
 
 from app.dao.report_dao import categories_sold_by_cashier, category_price_stats, cashiers_every_check_has_category, \
-    categories_without_promos
+    categories_without_promos, top_products_period
 from app.dao.sale_dao import delete_sale
 from app.utils.auth import ensure_role
+from app.utils.db import wal_checkpoint, IntegrityError
+from app.utils.csv_stream import iter_csv
+from app.dao.export_dao import EXPORTS, iter_export
 from app.dao.category_dao import get_all_categories
 from app.dao.product_dao import get_all_product_types
 
@@ -55,7 +60,11 @@ from app.dao.product_dao import (
     create_product_type,
     update_product_type,
     delete_product_type,
-    get_all_products               # for listings in dashboard/statistics
+    get_all_products,              # for listings in dashboard/statistics
+    get_products_page,
+    count_store_products,
+    count_product_types,
+    lookup_products
 )
 # товари у магазині (CRUD by UPC)
 from app.dao.store_product_dao import (
@@ -94,22 +103,16 @@ def dashboard():
     num_cashier = len([e for e in employees if e['role']=='cashier'])
     num_mgr     = len([e for e in employees if e['role']=='manager'])
 
-    products      = get_all_products()          # товари в магазині
-    prod_in_store = len(products)
-
-    prod_types = len(get_all_product_types())
+    prod_in_store = count_store_products()      # товари в магазині
+    prod_types    = count_product_types()
 
     today    = date.today()
     last_30  = today - timedelta(days=29)
     sales_30 = get_total_sales_all_period(last_30, today) or Decimal('0')
 
-    # TOP-5 за 30 днів
-    top = []
-    for p in products:
-        qty = get_quantity_sold_period(p['upc'], last_30, today)
-        if qty:
-            top.append((qty, p))
-    top = sorted(top, reverse=True)[:5]
+    # TOP-5 за 30 днів (один груповий запит)
+    top = [(p['units'], p)
+           for p in top_products_period(last_30, today, 5)['by_units']]
 
     return render_template(
         'manager/dashboard.html',
@@ -365,7 +368,7 @@ def delete_customer(card_number):
     try:
         ok = delete_card(card_number)
         flash('Клієнта видалено', 'success' if ok else 'warning')
-    except sqlite3.IntegrityError:
+    except IntegrityError:
         flash('Неможливо видалити — на клієнта є записи в чеках', 'danger')
     except Exception as e:
         flash(f'Помилка БД: {e}', 'danger')
@@ -427,7 +430,7 @@ def delete_category_route(cat_id):
             flash('Категорію видалено.', 'success')
         else:
             flash('Не вдалося видалити категорію.', 'danger')
-    except sqlite3.IntegrityError:
+    except IntegrityError:
         flash(
             'Неможливо видалити категорію — у базі є товари цієї категорії.',
             'danger'
@@ -544,15 +547,19 @@ def store_products():
     field      = request.args.get('field','name')
     search     = request.args.get('search','').strip() or None
 
-    items = get_all_products(
+    page = get_products_page(
         sort_by, order,
         category, promotional,
-        search, field
+        search, field,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        limit=current_app.config['PRODUCTS_PAGE_SIZE']
     )
     cats = get_all_categories()
     return render_template(
         'manager/store_products.html',
-        store_products=items,
+        store_products=page['items'],
+        page=page,
         categories=cats,
         sort_by=sort_by, order=order,
         category=category, promo=promo,
@@ -669,6 +676,35 @@ def reports_preview(table):
     )
 
 
+# ═══════════════ 7a. ЕКСПОРТ CSV ═══════════════
+@manager_bp.route('/reports/export/<table>.csv')
+def reports_export(table):
+    """
+    Таблицю звіту віддаємо генератором: рядки читаються з курсора порціями
+    й одразу йдуть клієнту, тож навіть чеки за рік не збираються в пам'яті.
+    Для 'checks' — ?from=YYYY-MM-DD&to=YYYY-MM-DD (як на сторінці чеків).
+    """
+    if table not in EXPORTS:
+        abort(404)
+    try: d_from = datetime.strptime(request.args.get('from',''),"%Y-%m-%d").date()
+    except ValueError: d_from = None
+    try: d_to   = datetime.strptime(request.args.get('to',''),  "%Y-%m-%d").date()
+    except ValueError: d_to   = None
+
+    rows = iter_export(table, d_from, d_to,
+                       batch=current_app.config['EXPORT_FETCH_SIZE'])
+    filename = f"{table}_{date.today().isoformat()}.csv"
+    return Response(
+        stream_with_context(iter_csv(rows)),
+        mimetype='text/csv',
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            # nginx не повинен буферизувати потік
+            'X-Accel-Buffering':   'no'
+        }
+    )
+
+
 # ═══════════════ 8. Сторінка звітів ═══════════════
 @manager_bp.route('/reports')
 def reports():
@@ -830,17 +866,15 @@ def statistics():
     chosen_product = None
     qty_sold       = None
     if upc_or_name:
-        lst = get_all_products(search=upc_or_name, search_field='upc')
-        if not lst:
-            lst = get_all_products(search=upc_or_name, search_field='name')
+        # перший збіг (префікс UPC або слова назви) — запит з LIMIT 1,
+        # а не весь відфільтрований каталог
+        lst = lookup_products(upc_or_name, limit=1)
         if lst:
             chosen_product = lst[0]
             qty_sold = get_quantity_sold_period(
                 chosen_product['upc'], d_from, d_to
             )
 
-    products_for_js = get_all_products(sort_by='name', order='asc')
-
     rows = categories_sold_by_cashier()
 
 
@@ -861,7 +895,6 @@ def statistics():
         total_by_cashier=total_by_cashier,
         qty_sold=qty_sold,
         chosen_product=chosen_product,
-        products=products_for_js,
         # ↓↓↓ передаємо у шаблон нові таблиці
         price_table=price_table[:5],
         loyal_cashiers=loyal_cashiers[:5],
@@ -870,3 +903,15 @@ def statistics():
     )
 
 
+# ═══════════════ 11. ОБСЛУГОВУВАННЯ БД ═══════════════
+@manager_bp.route('/db/checkpoint', methods=('POST',))
+def db_checkpoint():
+    # ?mode= з WAL_CHECKPOINT_HTTP_MODES (за замовчуванням — режим планувальника)
+    cfg  = current_app.config
+    mode = request.values.get('mode', cfg['WAL_CHECKPOINT_MODE']).upper()
+    if mode not in cfg['WAL_CHECKPOINT_HTTP_MODES']:
+        return jsonify(error=f"Режим checkpoint {mode} недоступний через HTTP"), 400
+    try:
+        return jsonify(wal_checkpoint(mode))
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
@@ -0,0 +1,7 @@
+"""
+Бенчмарки DAO-рівня та наскрізне HTTP-навантаження (loadtest).
+
+Кожен модуль запускається окремо, напр.:
+    python -m benchmarks.bench_create_check
+    python -m benchmarks.loadtest --cashiers 16 --managers 4
+"""
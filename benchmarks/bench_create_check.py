@@ -0,0 +1,154 @@
+"""
+Порівняння двох шляхів створення чека:
+
+* legacy  — попередня реалізація: SELECT на кожен UPC, INSERT Sale з
+            підзапитом і окремий UPDATE залишку на кожен рядок;
+* batched — поточна check_dao.create_check: один SELECT … IN (…),
+            executemany для Sale та одне UPDATE … CASE.
+
+    python -m benchmarks.bench_create_check [--rounds 200]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from app.dao.check_dao import create_check
+from app.utils.db import get_db, close_db
+
+from .fixtures import make_database, make_app, upc
+
+
+BASKET_SIZES = (1, 5, 10, 20, 40, 80)
+
+
+def legacy_create_check(check_number, employee_id, card_number, sales):
+    """Рядок-за-рядком, як було до переходу на пакетні запити."""
+    if not check_number:
+        check_number = uuid.uuid4().hex[:10]
+
+    aggregated = defaultdict(int)
+    for item in sales:
+        aggregated[item['upc']] += int(item['qty'])
+    sales_agg = [{'upc': u, 'qty': q} for u, q in aggregated.items()]
+
+    conn = get_db()
+    cur  = conn.cursor()
+
+    discount_percent = Decimal('0')
+    if card_number:
+        cur.execute("SELECT percent FROM Customer_Card WHERE card_number=%s",
+                    (card_number,))
+        row = cur.fetchone()
+        if row:
+            discount_percent = Decimal(row[0]).quantize(Decimal('1'))
+
+    errors   = []
+    subtotal = Decimal('0.00')
+    for item in sales_agg:
+        cur.execute(
+            "SELECT selling_price, products_number "
+            "FROM Store_Product WHERE UPC=%s",
+            (item['upc'],)
+        )
+        row = cur.fetchone()
+        if row is None:
+            errors.append(f"Товар <strong>{item['upc']}</strong> не існує.")
+            continue
+        price, stock = row
+        if item['qty'] > stock:
+            errors.append(
+                f"Для <strong>{item['upc']}</strong> доступно {stock}, "
+                f"запитано {item['qty']}."
+            )
+        subtotal += (Decimal(str(price)) * item['qty']).quantize(Decimal('0.01'))
+
+    if errors:
+        conn.rollback()
+        close_db(conn)
+        raise ValueError("<br>".join(errors))
+
+    discount = (subtotal * discount_percent / 100).quantize(Decimal('0.01'))
+    taxable  = subtotal - discount
+    vat      = (taxable * Decimal('0.20')).quantize(Decimal('0.01'))
+    payable  = (taxable + vat).quantize(Decimal('0.01'), ROUND_HALF_UP)
+
+    cur.execute(
+        """
+        INSERT INTO "check"
+              (check_number, id_employee, card_number, print_date, sum_total)
+        VALUES (%s,%s,%s,%s,%s)
+        """,
+        (check_number, employee_id, card_number, datetime.now(), payable)
+    )
+    for item in sales_agg:
+        cur.execute(
+            """
+            INSERT INTO Sale
+                  (UPC, check_number, product_number, selling_price)
+            VALUES (
+                %s, %s, %s,
+                (SELECT selling_price FROM Store_Product WHERE UPC=%s)
+            )
+            """,
+            (item['upc'], check_number, item['qty'], item['upc'])
+        )
+        cur.execute(
+            "UPDATE Store_Product "
+            "SET products_number = products_number - %s "
+            "WHERE UPC=%s",
+            (item['qty'], item['upc'])
+        )
+
+    conn.commit()
+    close_db(conn)
+    return check_number
+
+
+def _baskets(rnd, size, rounds, products):
+    return [
+        [{'upc': upc(i), 'qty': rnd.randint(1, 3)}
+         for i in rnd.sample(range(1, products + 1), size)]
+        for _ in range(rounds)
+    ]
+
+
+def _run(app, fn, baskets):
+    timings = []
+    for basket in baskets:
+        with app.app_context():
+            t0 = time.perf_counter()
+            fn(None, 'e1', 'C000000000001', basket)
+            timings.append((time.perf_counter() - t0) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rounds',   type=int, default=200)
+    parser.add_argument('--products', type=int, default=2000)
+    args = parser.parse_args()
+
+    db_path = make_database(products=args.products)
+    app     = make_app(db_path)
+    rnd     = random.Random(7)
+
+    print(f"{'кошик':>6} {'legacy, мс':>12} {'batched, мс':>12} {'прискорення':>12}")
+    try:
+        for size in BASKET_SIZES:
+            baskets = _baskets(rnd, size, args.rounds, args.products)
+            old = statistics.median(_run(app, legacy_create_check, baskets))
+            new = statistics.median(_run(app, create_check, baskets))
+            print(f"{size:>6} {old:>12.3f} {new:>12.3f} {old / new:>11.2f}×")
+    finally:
+        os.unlink(db_path)
+
+
+if __name__ == '__main__':
+    main()
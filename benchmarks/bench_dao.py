@@ -0,0 +1,326 @@
+"""
+Набір бенчмарків DAO-рівня з порогами регресії.
+
+Для кожного масштабу (рядків Sale) окремий процес будує базу генератором
+app.services.datagen з фіксованим зерном, проганяє всі випадки CASES
+і віддає p50 / p95 (мс) та кількість SQL-інструкцій на виклик
+(з журналу app/utils/query_log.py). Результат порівнюється з
+benchmarks/baseline.json: регресія — більше запитів, ніж в еталоні, або
+p95 гірший за еталонний більш ніж на --threshold (і на MIN_DELTA_MS),
+причому медіана теж погіршилась на стільки ж — щоб один викид не валив
+перевірку.
+Код виходу 1, якщо є регресії.
+
+    python -m benchmarks.bench_dao [--scales 10000,100000,1000000]
+    python -m benchmarks.bench_dao --update-baseline     # новий еталон
+
+Еталонні часи залежать від машини — оновлюйте baseline.json на тій,
+де запускається перевірка.
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from functools import partial
+
+from app.dao import (
+    auth_dao, category_dao, check_dao, customer_card_dao, employee_dao,
+    export_dao, product_dao, product_type_dao, report_dao, rollup_dao,
+    store_product_dao
+)
+from app.services import datagen
+from app.utils import query_log
+from app.utils.db import get_db
+
+from .fixtures import make_schema, make_app, drop_database
+
+
+BASELINE     = os.path.join(os.path.dirname(__file__), 'baseline.json')
+SCALES       = (10_000, 100_000, 1_000_000)
+SEED         = 42
+END          = date(2025, 12, 31)          # останній день синтетичної історії
+MIN_DELTA_MS = 0.5                         # різниця, меншу за яку не рахуємо
+
+
+# ───────────────────────── вибірка параметрів ─────────────────────────
+def _sample() -> dict:
+    """Реальні ID з бази, на яких ганяються випадки."""
+    cur = get_db().cursor()
+    one = lambda sql, *p: (cur.execute(sql, p), cur.fetchone())[1]
+
+    cashier = one('SELECT id_employee FROM "check" GROUP BY id_employee '
+                  'ORDER BY COUNT(*) DESC, id_employee LIMIT 1')[0]
+    hot_upc, hot_category = one(
+        "SELECT s.UPC, c.category_name FROM Sale s "
+        "JOIN Store_Product sp ON sp.UPC = s.UPC "
+        "JOIN Product p ON p.id_product = sp.id_product "
+        "JOIN Category c ON c.category_number = p.category_number "
+        "GROUP BY s.UPC, c.category_name ORDER BY COUNT(*) DESC, s.UPC LIMIT 1"
+    )
+    cur.execute("SELECT UPC FROM Store_Product WHERE products_number > 200 "
+                "ORDER BY UPC LIMIT 3")
+    basket = [{'upc': r[0], 'qty': 1} for r in cur.fetchall()]
+    return {
+        'cashier':  cashier,
+        'check':    one('SELECT check_number FROM "check" '
+                        'WHERE line_count >= 3 ORDER BY check_number LIMIT 1')[0],
+        'upc':      hot_upc,
+        'category': hot_category,
+        'cat_id':   one("SELECT MIN(category_number) FROM Category")[0],
+        'prod_id':  one("SELECT MIN(id_product) FROM Product")[0],
+        'card':     one("SELECT MIN(card_number) FROM Customer_Card")[0],
+        'basket':   basket,
+        'word':     datagen.PRODUCT_WORDS[1],
+        'surname':  datagen.SURNAMES[0][:3],
+        'day':      (END, END),
+        'month':    (END - timedelta(days=29), END),
+        'year':     (END - timedelta(days=364), END),
+    }
+
+
+def _new_check(s) -> str:
+    return check_dao.create_check(None, s['cashier'], s['card'], s['basket'])
+
+
+def _delete_prepared(s):
+    """Чек створюється поза заміром; міряється лише delete_check."""
+    return partial(check_dao.delete_check, _new_check(s))
+
+
+# назва → prepare(s) → функція без аргументів, час якої міряємо
+CASES = {
+    # ── чеки ──────────────────────────────────────────────────────────
+    'check.create_check':        lambda s: partial(_new_check, s),
+    'check.delete_check':        _delete_prepared,
+    'check.get_check_details':   lambda s: partial(check_dao.get_check_details, s['check']),
+    'check.by_employee':         lambda s: partial(check_dao.get_checks_by_employee, s['cashier']),
+    'check.by_employee_month':   lambda s: partial(check_dao.get_checks_by_employee_period,
+                                                   s['cashier'], *s['month']),
+    'check.by_employee_mgr_day': lambda s: partial(check_dao.get_checks_by_employee_period_mgr,
+                                                   s['cashier'], *s['day']),
+    'check.all_period_day':      lambda s: partial(check_dao.get_checks_all_period, *s['day']),
+    'check.all_period_month':    lambda s: partial(check_dao.get_checks_all_period, *s['month']),
+    'check.get_all_checks':      lambda s: check_dao.get_all_checks,
+    'check.total_all_year':      lambda s: partial(check_dao.get_total_sales_all_period, *s['year']),
+    'check.total_all_ever':      lambda s: partial(check_dao.get_total_sales_all_period, None, None),
+    'check.total_cashier_year':  lambda s: partial(check_dao.get_total_sales_by_cashier_period,
+                                                   s['cashier'], *s['year']),
+    'check.qty_sold_year':       lambda s: partial(check_dao.get_quantity_sold_period,
+                                                   s['upc'], *s['year']),
+    # ── товари ────────────────────────────────────────────────────────
+    **{
+        f'product.all_sort_{key}': (lambda key: lambda s: partial(
+            product_dao.get_all_products, sort_by=key))(key)
+        for key in ('upc', 'name', 'characteristics', 'category',
+                    'price', 'quantity', 'promotional')
+    },
+    'product.all_desc_price':    lambda s: partial(product_dao.get_all_products, 'price', 'desc'),
+    'product.all_category':      lambda s: partial(product_dao.get_all_products,
+                                                   category=s['category']),
+    'product.all_promotional':   lambda s: partial(product_dao.get_all_products, promotional=True),
+    'product.all_search_name':   lambda s: partial(product_dao.get_all_products,
+                                                   search=s['word']),
+    'product.all_search_rank':   lambda s: partial(product_dao.get_all_products, 'relevance',
+                                                   search=s['word']),
+    'product.all_search_upc':    lambda s: partial(product_dao.get_all_products,
+                                                   search=s['upc'], search_field='upc'),
+    'product.page_first':        lambda s: product_dao.get_products_page,
+    'product.page_category':     lambda s: partial(product_dao.get_products_page,
+                                                   category=s['category']),
+    'product.lookup_name':       lambda s: partial(product_dao.lookup_products, s['word'][:4]),
+    'product.lookup_upc':        lambda s: partial(product_dao.lookup_products, s['upc'][:6]),
+    'product.types_all':         lambda s: product_dao.get_all_product_types,
+    'product.types_search':      lambda s: partial(product_dao.get_all_product_types,
+                                                   search=s['word']),
+    'product_type.by_id':        lambda s: partial(product_type_dao.get_product_type_by_id,
+                                                   s['prod_id']),
+    'store_product.by_upc':      lambda s: partial(store_product_dao.get_store_product_by_upc,
+                                                   s['upc']),
+    'store_product.all':         lambda s: store_product_dao.get_all_store_products,
+    # ── довідники ─────────────────────────────────────────────────────
+    'category.all':              lambda s: category_dao.get_all_categories,
+    'category.get':              lambda s: partial(category_dao.get_category, s['cat_id']),
+    'card.all':                  lambda s: customer_card_dao.get_all_cards,
+    'card.lookup':               lambda s: partial(customer_card_dao.lookup_cards, s['surname']),
+    'card.customers_sorted':     lambda s: customer_card_dao.get_all_customers_sorted,
+    'card.customers_search':     lambda s: partial(customer_card_dao.get_all_customers,
+                                                   search=s['surname']),
+    'card.customers_m_percent':  lambda s: partial(customer_card_dao.get_all_customers_m,
+                                                   min_percent=5),
+    'employee.all':              lambda s: employee_dao.get_all_employees,
+    'employee.cashiers':         lambda s: partial(employee_dao.get_all_employees, role='cashier'),
+    'employee.by_id':            lambda s: partial(employee_dao.get_employee_by_id, s['cashier']),
+    'auth.user_by_username':     lambda s: partial(auth_dao.get_user_by_username, 'bench'),
+    'auth.user_identity':        lambda s: partial(auth_dao.get_user_identity, 1),
+    # ── звіти ─────────────────────────────────────────────────────────
+    'report.categories_sold_by_cashier': lambda s: report_dao.categories_sold_by_cashier,
+    'report.category_price_stats':       lambda s: partial(report_dao.category_price_stats, 50),
+    'report.every_check_has_category':   lambda s: partial(
+        report_dao.cashiers_every_check_has_category, s['category']),
+    'report.categories_without_promos':  lambda s: partial(report_dao.categories_without_promos, 100),
+    'report.top_products_year':          lambda s: partial(report_dao.top_products_period,
+                                                           *s['year']),
+    'rollup.verify':             lambda s: rollup_dao.verify_rollups,
+    'export.checks_month':       lambda s: lambda: sum(1 for _ in export_dao.iter_export(
+        'checks', *s['month'])),
+}
+
+
+# ───────────────────────── замір одного масштабу ─────────────────────────
+def _measure(app, prepare, sample, repeat, budget) -> dict:
+    timings, queries = [], []
+    started = time.perf_counter()
+    for i in range(repeat + 1):                # перший прогін — прогрів
+        with app.app_context():
+            fn = prepare(sample)
+            query_log.reset()
+            gc.collect()
+            gc.disable()                       # паузи збирача сміття — шум p95
+            try:
+                t0 = time.perf_counter()
+                fn()
+                elapsed = (time.perf_counter() - t0) * 1000
+            finally:
+                gc.enable()
+            n_queries = query_log.summary()['count']
+        if i:
+            timings.append(elapsed)
+            queries.append(n_queries)
+        if i >= 3 and time.perf_counter() - started > budget:
+            break
+    timings.sort()
+    return {
+        'p50':     round(statistics.median(timings), 3),
+        'p95':     round(timings[min(len(timings) - 1,
+                                     int(len(timings) * 0.95))], 3),
+        'queries': max(queries),
+        'runs':    len(timings)
+    }
+
+
+def run_scale(lines, repeat, budget, only=None) -> dict:
+    db_path = make_schema()
+    try:
+        app = make_app(db_path,
+                       REPORT_CACHE_ENABLED=False,     # міряємо самі запити
+                       CHECKOUT_QUEUE_ENABLED=False,
+                       SLOW_QUERY_MS=float('inf'))
+        with app.app_context():
+            datagen.generate(lines=lines, seed=SEED, end=END)
+        with app.app_context():
+            sample = _sample()
+        return {
+            name: _measure(app, prepare, sample, repeat, budget)
+            for name, prepare in CASES.items()
+            if not only or only in name
+        }
+    finally:
+        drop_database(db_path)
+
+
+# ───────────────────────── порівняння з еталоном ─────────────────────────
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Повертає описи регресій (порожній список — усе гаразд)."""
+    problems = []
+    for scale, cases in results.items():
+        base_cases = baseline.get(scale, {})
+        for name, cur in cases.items():
+            base = base_cases.get(name)
+            if base is None:
+                continue
+            if cur['queries'] > base['queries']:
+                problems.append(f"{scale} {name}: запитів {base['queries']} → "
+                                f"{cur['queries']}")
+            # поодинокий викид p95 не рахується, якщо медіана не зсунулась
+            slower = all(
+                cur[k] > base[k] * (1 + threshold) and cur[k] - base[k] > MIN_DELTA_MS
+                for k in ('p95', 'p50')
+            )
+            if slower:
+                problems.append(f"{scale} {name}: p95 {base['p95']:.2f} → "
+                                f"{cur['p95']:.2f} мс "
+                                f"(+{cur['p95'] / base['p95'] * 100 - 100:.0f} %)")
+    return problems
+
+
+def _print(scale, cases, base_cases):
+    print(f"\n── {scale} рядків Sale ──")
+    print(f"{'випадок':<36} {'p50, мс':>9} {'p95, мс':>9} {'запитів':>8} {'еталон p95':>11}")
+    for name, r in cases.items():
+        base = base_cases.get(name)
+        ref  = f"{base['p95']:>11.2f}" if base else f"{'—':>11}"
+        print(f"{name:<36} {r['p50']:>9.2f} {r['p95']:>9.2f} {r['queries']:>8} {ref}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', default=",".join(map(str, SCALES)))
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='прогонів на випадок (максимум)')
+    parser.add_argument('--budget', type=float, default=3.0,
+                        help='секунд на випадок (але не менше 3 прогонів)')
+    parser.add_argument('--only', help='лише випадки, що містять підрядок')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='допустиме погіршення p95 (0.25 = 25 %%)')
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--out', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # один масштаб = окремий процес: пул з'єднань і блоки ID — на процес
+        result = run_scale(args.worker, args.repeat, args.budget, args.only)
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    results = {}
+    for lines in (int(s) for s in args.scales.split(',')):
+        fd, out = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        try:
+            cmd = [sys.executable, '-m', 'benchmarks.bench_dao',
+                   '--worker', str(lines), '--out', out,
+                   '--repeat', str(args.repeat), '--budget', str(args.budget)]
+            if args.only:
+                cmd += ['--only', args.only]
+            subprocess.run(cmd, check=True)
+            with open(out, encoding='utf-8') as f:
+                results[str(lines)] = json.load(f)
+        finally:
+            os.unlink(out)
+        _print(lines, results[str(lines)], baseline.get(str(lines), {}))
+
+    if args.update_baseline:
+        for scale, cases in results.items():
+            baseline.setdefault(scale, {}).update(cases)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nеталон записано: {args.baseline}")
+        return
+
+    problems = compare(results, baseline, args.threshold)
+    if problems:
+        print("\nРЕГРЕСІЇ:")
+        for p in problems:
+            print("  " + p)
+        raise SystemExit(1)
+    print("\nрегресій немає" if baseline else "\nеталону ще немає (--update-baseline)")
+
+
+if __name__ == '__main__':
+    main()
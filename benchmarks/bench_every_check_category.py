@@ -0,0 +1,163 @@
+"""
+Звіт «касири, у кожному чеку яких є товар категорії» — два формулювання:
+
+* nested  — попередній подвійний NOT EXISTS (для кожного касира й кожного
+            чека — окремий JOIN чотирьох таблиць);
+* grouped — поточна report_dao.cashiers_every_check_has_category:
+            чеки з товаром категорії (лише її рядки Sale) проти всіх
+            чеків касира, два GROUP BY.
+
+База нарощується сходинками до 1 000 000 рядків Sale; на кожній сходинці
+обидва запити мають дати однаковий результат.
+
+    python -m benchmarks.bench_every_check_category [--lines 1000000]
+"""
+
+import argparse
+import random
+import sqlite3
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from app.dao.report_dao import cashiers_every_check_has_category
+from app.utils.db import get_db
+
+from .fixtures import make_database, make_app, drop_database, upc
+
+
+CASHIERS = 20           # e1 … e20
+LOYAL    = 3            # перші касири кладуть у кожен чек товар категорії
+CATEGORY = 'Категорія 1'
+
+
+def nested_cashiers_every_check_has_category(cat_name):
+    """Попереднє формулювання — подвійний корельований NOT EXISTS."""
+    cur = get_db().cursor()
+    cur.execute(
+        """
+        SELECT e.id_employee,
+               e.empl_surname,
+               e.empl_name
+        FROM Employee e
+        WHERE e.empl_role = 'cashier'
+          AND NOT EXISTS (
+                SELECT *
+                FROM "check" c
+                WHERE c.id_employee = e.id_employee
+                  AND NOT EXISTS (
+                        SELECT *
+                        FROM   Sale          s
+                        JOIN   Store_Product sp ON sp.UPC        = s.UPC
+                        JOIN   Product       p  ON p.id_product  = sp.id_product
+                        JOIN   Category      cat ON cat.category_number = p.category_number
+                        WHERE  s.check_number   = c.check_number
+                          AND  cat.category_name = %s
+                  )
+          )
+        ORDER BY e.empl_surname
+        """,
+        (cat_name,)
+    )
+    return [
+        {'id_employee': r[0], 'empl_surname': r[1], 'empl_name': r[2]}
+        for r in cur.fetchall()
+    ]
+
+
+def _add_cashiers(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO Employee (id_employee, empl_surname, empl_name, "
+        "empl_role, salary) VALUES (?, ?, 'Касир', 'cashier', 0)",
+        [(f"e{i}", f"Касир {i:02d}") for i in range(2, CASHIERS + 1)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def _grow(db_path, rnd, start_check, lines, loyal):
+    """Дописує чеки (1–9 рядків) до `lines` нових рядків Sale."""
+    conn = sqlite3.connect(db_path)
+    in_cat = [r[0] for r in conn.execute(
+        "SELECT p.id_product FROM Product p JOIN Category c "
+        "ON c.category_number = p.category_number WHERE c.category_name = ?",
+        (CATEGORY,)
+    )]
+    products = conn.execute("SELECT COUNT(*) FROM Product").fetchone()[0]
+    day0 = datetime(2025, 1, 1)
+
+    checks, sales = [], []
+    n, added = start_check, 0
+    while added < lines:
+        number   = f"b{n:09d}"
+        cashier  = n % CASHIERS + 1
+        basket   = set(rnd.sample(range(1, products + 1), rnd.randint(1, 9)))
+        if cashier <= loyal:
+            basket.add(rnd.choice(in_cat))
+        checks.append((number, f"e{cashier}",
+                       (day0 + timedelta(minutes=n)).isoformat(sep=' ')))
+        sales.extend((upc(i), number, 1) for i in basket)
+        added += len(basket)
+        n += 1
+
+    conn.executemany(
+        'INSERT INTO "check" (check_number, id_employee, print_date, sum_total) '
+        "VALUES (?, ?, ?, 0)", checks
+    )
+    conn.executemany(
+        "INSERT INTO Sale (UPC, check_number, product_number, selling_price) "
+        "VALUES (?, ?, ?, 1)", sales
+    )
+    conn.commit()
+    conn.close()
+    return n, added
+
+
+def _time(app, fn, repeat):
+    timings, result = [], None
+    for _ in range(repeat):
+        with app.app_context():
+            t0 = time.perf_counter()
+            result = fn(CATEGORY)
+            timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--lines',  type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--loyal',  type=int, default=LOYAL,
+                        help='скільки касирів проходять звіт (найгірший випадок для nested — усі)')
+    args = parser.parse_args()
+
+    steps = sorted({s for s in (10_000, 100_000, args.lines) if s <= args.lines})
+
+    db_path = make_database(products=2000)
+    _add_cashiers(db_path)
+    app = make_app(db_path)
+    # міряємо сам запит: без кешу звітів і без EXPLAIN повільних запитів
+    app.config.update(REPORT_CACHE_ENABLED=False, QUERY_LOG_ENABLED=False)
+    rnd = random.Random(11)
+
+    print(f"{'рядків Sale':>12} {'nested, мс':>12} {'grouped, мс':>12} {'прискорення':>12}")
+    try:
+        next_check, total = 0, 0
+        for target in steps:
+            next_check, added = _grow(db_path, rnd, next_check,
+                                      target - total, args.loyal)
+            total += added
+
+            old, old_rows = _time(app, nested_cashiers_every_check_has_category,
+                                  args.repeat)
+            new, new_rows = _time(app, cashiers_every_check_has_category,
+                                  args.repeat)
+            assert old_rows == new_rows, (old_rows, new_rows)
+            print(f"{total:>12} {old:>12.1f} {new:>12.1f} {old / new:>11.2f}×")
+    finally:
+        drop_database(db_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+"""
+Спільні заготовки для бенчмарків і тестів: тимчасова SQLite-база з мінімальною
+схемою (лише таблиці й колонки, які використовують DAO) та застосунок,
+що працює з цією базою. PG_SCHEMA — та сама схема для PostgreSQL
+(тимчасова база на наявному сервері — make_pg_database).
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+from datetime import date, timedelta
+
+from app import create_app
+
+
+SCHEMA = """
+CREATE TABLE Category (
+    category_number INTEGER PRIMARY KEY,
+    category_name   TEXT    NOT NULL
+);
+CREATE TABLE Product (
+    id_product      INTEGER PRIMARY KEY,
+    category_number INTEGER NOT NULL REFERENCES Category,
+    product_name    TEXT    NOT NULL,
+    characteristics TEXT    NOT NULL DEFAULT '',
+    manufacturer    TEXT
+);
+CREATE TABLE Store_Product (
+    UPC                 TEXT    PRIMARY KEY,
+    UPC_prom            TEXT,
+    id_product          INTEGER NOT NULL REFERENCES Product,
+    selling_price       REAL    NOT NULL,
+    products_number     INTEGER NOT NULL,
+    promotional_product INTEGER NOT NULL DEFAULT 0,
+    expiry_date         TEXT,
+    promo_threshold     INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE Employee (
+    id_employee     TEXT PRIMARY KEY,
+    empl_surname    TEXT NOT NULL,
+    empl_name       TEXT NOT NULL,
+    empl_patronymic TEXT,
+    empl_role       TEXT NOT NULL,
+    salary          REAL NOT NULL,
+    date_of_birth   TEXT,
+    date_of_start   TEXT,
+    phone_number    TEXT,
+    city            TEXT,
+    street          TEXT,
+    zip_code        TEXT
+);
+CREATE TABLE Customer_Card (
+    card_number     TEXT PRIMARY KEY,
+    cust_surname    TEXT NOT NULL,
+    cust_name       TEXT NOT NULL,
+    cust_patronymic TEXT,
+    phone_number    TEXT,
+    city            TEXT,
+    street          TEXT,
+    zip_code        TEXT,
+    percent         INTEGER NOT NULL
+);
+CREATE TABLE "check" (
+    check_number TEXT PRIMARY KEY,
+    id_employee  TEXT NOT NULL REFERENCES Employee,
+    card_number  TEXT REFERENCES Customer_Card,
+    print_date   TEXT NOT NULL,
+    sum_total    REAL NOT NULL,
+    vat          REAL
+);
+CREATE TABLE Sale (
+    UPC            TEXT    NOT NULL,
+    check_number   TEXT    NOT NULL REFERENCES "check" ON DELETE CASCADE,
+    product_number INTEGER NOT NULL,
+    selling_price  REAL    NOT NULL,
+    PRIMARY KEY (UPC, check_number)
+);
+CREATE TABLE auth_user (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    username      TEXT UNIQUE NOT NULL,
+    password_hash TEXT NOT NULL,
+    role          TEXT NOT NULL,
+    employee_id   TEXT REFERENCES Employee
+);
+"""
+
+PG_SCHEMA = """
+CREATE TABLE Category (
+    category_number INTEGER     PRIMARY KEY,
+    category_name   VARCHAR(50) NOT NULL
+);
+CREATE TABLE Product (
+    id_product      INTEGER      PRIMARY KEY,
+    category_number INTEGER      NOT NULL REFERENCES Category,
+    product_name    VARCHAR(50)  NOT NULL,
+    characteristics VARCHAR(100) NOT NULL DEFAULT '',
+    manufacturer    VARCHAR(50)
+);
+CREATE TABLE Store_Product (
+    UPC                 VARCHAR(12)   PRIMARY KEY,
+    UPC_prom            VARCHAR(12),
+    id_product          INTEGER       NOT NULL REFERENCES Product,
+    selling_price       NUMERIC(13,4) NOT NULL,
+    products_number     INTEGER       NOT NULL,
+    promotional_product BOOLEAN       NOT NULL DEFAULT FALSE,
+    expiry_date         DATE,
+    promo_threshold     INTEGER       NOT NULL DEFAULT 0
+);
+CREATE TABLE Employee (
+    id_employee     VARCHAR(10)   PRIMARY KEY,
+    empl_surname    VARCHAR(50)   NOT NULL,
+    empl_name       VARCHAR(50)   NOT NULL,
+    empl_patronymic VARCHAR(50),
+    empl_role       VARCHAR(10)   NOT NULL,
+    salary          NUMERIC(13,4) NOT NULL,
+    date_of_birth   DATE,
+    date_of_start   DATE,
+    phone_number    VARCHAR(13),
+    city            VARCHAR(50),
+    street          VARCHAR(50),
+    zip_code        VARCHAR(9)
+);
+CREATE TABLE Customer_Card (
+    card_number     VARCHAR(13) PRIMARY KEY,
+    cust_surname    VARCHAR(50) NOT NULL,
+    cust_name       VARCHAR(50) NOT NULL,
+    cust_patronymic VARCHAR(50),
+    phone_number    VARCHAR(13),
+    city            VARCHAR(50),
+    street          VARCHAR(50),
+    zip_code        VARCHAR(9),
+    percent         INTEGER     NOT NULL
+);
+CREATE TABLE "check" (
+    check_number VARCHAR(10)   PRIMARY KEY,
+    id_employee  VARCHAR(10)   NOT NULL REFERENCES Employee,
+    card_number  VARCHAR(13)   REFERENCES Customer_Card,
+    print_date   TIMESTAMP     NOT NULL,
+    sum_total    NUMERIC(13,4) NOT NULL,
+    vat          NUMERIC(13,4)
+);
+CREATE TABLE Sale (
+    UPC            VARCHAR(12)   NOT NULL,
+    check_number   VARCHAR(10)   NOT NULL REFERENCES "check" ON DELETE CASCADE,
+    product_number INTEGER       NOT NULL,
+    selling_price  NUMERIC(13,4) NOT NULL,
+    PRIMARY KEY (UPC, check_number)
+);
+CREATE TABLE auth_user (
+    id            SERIAL      PRIMARY KEY,
+    username      VARCHAR(50) UNIQUE NOT NULL,
+    password_hash TEXT        NOT NULL,
+    role          VARCHAR(10) NOT NULL,
+    employee_id   VARCHAR(10) REFERENCES Employee
+);
+"""
+
+
+def make_schema(path: str | None = None) -> str:
+    """Порожня база з SCHEMA (напр. для app.services.datagen). Повертає шлях."""
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix='zlagoda-bench-', suffix='.db')
+        os.close(fd)
+        os.unlink(path)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.close()
+    return path
+
+
+def drop_database(path: str) -> None:
+    """Видаляє файл бази разом із WAL-журналом."""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
+
+
+def make_pg_database(server_url: str) -> str:
+    """
+    Створює на сервері PostgreSQL (server_url — будь-яка наявна база, напр.
+    postgres) тимчасову базу з PG_SCHEMA. Повертає рядок підключення до неї.
+    """
+    import uuid
+    import psycopg
+    from psycopg.conninfo import make_conninfo
+
+    name = f"zlagoda_test_{uuid.uuid4().hex[:12]}"
+    with psycopg.connect(server_url, autocommit=True) as admin:
+        admin.execute(f'CREATE DATABASE "{name}"')
+    url = make_conninfo(server_url, dbname=name)
+    with psycopg.connect(url) as conn:
+        conn.execute(PG_SCHEMA)
+    return url
+
+
+def drop_pg_database(url: str) -> None:
+    """Видаляє базу, створену make_pg_database (разом з усіма з'єднаннями)."""
+    import psycopg
+    from psycopg.conninfo import conninfo_to_dict, make_conninfo
+
+    name = conninfo_to_dict(url)['dbname']
+    with psycopg.connect(make_conninfo(url, dbname='postgres'),
+                         autocommit=True) as admin:
+        admin.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+
+
+def make_database(path: str | None = None,
+                  products: int = 1000,
+                  stock: int = 1_000_000,
+                  seed: int = 42) -> str:
+    """
+    Створює базу з каталогом на `products` товарів, одним касиром ('e1')
+    і однією карткою клієнта. Повертає шлях до файлу.
+    """
+    path = make_schema(path)
+    rnd  = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO Category VALUES (?, ?)",
+        [(i, f"Категорія {i}") for i in range(1, 21)]
+    )
+    conn.executemany(
+        "INSERT INTO Product VALUES (?, ?, ?, ?, ?)",
+        [(i, rnd.randint(1, 20), f"Товар {i}", '', None)
+         for i in range(1, products + 1)]
+    )
+    expiry = (date.today() + timedelta(days=365)).isoformat()
+    conn.executemany(
+        "INSERT INTO Store_Product VALUES (?, NULL, ?, ?, ?, 0, ?, 0)",
+        [(upc(i), i, round(rnd.uniform(5, 500), 2), stock, expiry)
+         for i in range(1, products + 1)]
+    )
+    conn.execute(
+        "INSERT INTO Employee (id_employee, empl_surname, empl_name, "
+        "empl_role, salary) VALUES ('e1', 'Бенч', 'Касир', 'cashier', 0)"
+    )
+    conn.execute(
+        "INSERT INTO Customer_Card (card_number, cust_surname, cust_name, "
+        "percent) VALUES ('C000000000001', 'Бенч', 'Клієнт', 5)"
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def upc(i: int) -> str:
+    """UPC i-го товару бенчмарк-каталогу."""
+    return f"{i:012d}"
+
+
+def make_app(db_path: str, **config):
+    """Застосунок, налаштований на вказану базу (config — додаткові ключі)."""
+    return create_app({'SQLITE_PATH': db_path, 'SCHEDULER_ENABLED': False,
+                       **config})
@@ -0,0 +1,389 @@
+"""
+Наскрізне HTTP-навантаження: каси й менеджери одночасно.
+
+Окремий процес піднімає застосунок (багатопотоковий сервер werkzeug) на
+синтетичній базі app.services.datagen і заводить облікові записи; цей
+процес відкриває --cashiers + --managers сесій, кожна входить через
+auth.login і в циклі без пауз (або з --think) виконує свою суміш:
+
+* каса     — перегляд товарів, проведення чека (POST create_receipt),
+             «мої чеки»;
+* менеджер — дашборд, статистика, чеки за період.
+
+Після --warmup секунд прогріву --duration секунд збирається статистика
+по кожному endpoint: пропускна здатність, p50 / p95 / p99 (мс), медіана
+часу в БД (X-DB-Time-ms), частка помилок і частка відмов через конкуренцію
+за блокування (зайнятий залишок, переповнена черга чеків, database is
+locked — за текстом відповіді). Відповідь 500 причини не містить, тож
+вичерпання пулу й блокування, що дійшли до 500, рахуються за журналом
+сервера; наприкінці — ще й стан пулу та черги чеків із /db-status.
+
+    python -m benchmarks.loadtest [--cashiers 16 --managers 4 --duration 30]
+    python -m benchmarks.loadtest --set CHECKOUT_QUEUE_ENABLED=false --json before.json
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlencode
+
+from werkzeug.security import generate_password_hash
+
+from app.services import datagen
+from app.utils.db import get_db
+
+from .fixtures import make_schema, make_app, drop_database
+
+
+HOST     = '127.0.0.1'
+PASSWORD = 'loadtest'
+BASKET   = 300                 # скільки UPC з необмеженим залишком у кошиках
+
+# endpoint → вага у суміші ролі
+CASHIER_MIX = {'cashier.products': 6, 'cashier.create_receipt': 3,
+               'cashier.my_receipts': 1}
+MANAGER_MIX = {'manager.dashboard': 2, 'manager.statistics': 2,
+               'manager.receipts': 1}
+
+# підрядки відповіді / журналу сервера, що означають відмову через блокування
+CONTENTION = ('змінюють інші каси', 'переповнена', 'зайняті понад',
+              'database is locked')
+# що шукати в журналі сервера → підпис у звіті
+SERVER_MARKERS = {'Traceback': 'трейсбеків',
+                  'зайняті понад': 'пул вичерпано',
+                  'database is locked': 'database is locked',
+                  'переповнена': 'черга чеків переповнена'}
+
+
+# ───────────────────────── серверний процес ─────────────────────────
+def _prepare(lines, cashiers, managers) -> dict:
+    """Синтетичний магазин + облікові записи; повертає дані для клієнтів."""
+    datagen.generate(lines=lines)
+    conn = get_db()
+    cur  = conn.cursor()
+
+    cur.execute("SELECT UPC FROM Store_Product ORDER BY products_number DESC, UPC "
+                "LIMIT %s", (BASKET,))
+    upcs = [r[0] for r in cur.fetchall()]
+    cur.execute("UPDATE Store_Product SET products_number = 1000000000 "
+                f"WHERE UPC IN ({', '.join(['%s'] * len(upcs))})", upcs)
+    cur.execute("SELECT category_name FROM Category ORDER BY category_name")
+    categories = [r[0] for r in cur.fetchall()]
+
+    pw_hash = generate_password_hash(PASSWORD)
+    users = {}
+    for role, count in (('cashier', cashiers), ('manager', managers)):
+        cur.execute("SELECT id_employee FROM Employee WHERE empl_role = %s "
+                    "ORDER BY id_employee", (role,))
+        employees = [r[0] for r in cur.fetchall()]
+        users[role] = [f"lt_{role}_{i}" for i in range(count)]
+        cur.executemany(
+            "INSERT INTO auth_user (username, password_hash, role, employee_id) "
+            "VALUES (%s, %s, %s, %s)",
+            [(name, pw_hash, role, employees[i % len(employees)])
+             for i, name in enumerate(users[role])]
+        )
+    conn.commit()
+    return {'users': users, 'upcs': upcs, 'categories': categories}
+
+
+def serve(args, overrides):
+    """Готує базу, друкує один рядок JSON для клієнта і обслуговує запити."""
+    from werkzeug.serving import make_server
+
+    db_path = make_schema()
+    try:
+        app = make_app(db_path, **overrides)
+        with app.app_context():
+            info = _prepare(args.lines, args.cashiers, args.managers)
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        server = make_server(HOST, args.port, app, threaded=True)
+        print(json.dumps(info, ensure_ascii=False), flush=True)
+        sys.stdout = sys.stderr         # далі stdout ніхто не читає — лише журнал
+        server.serve_forever()
+    finally:
+        drop_database(db_path)
+
+
+# ───────────────────────── клієнтські сесії ─────────────────────────
+class Session:
+    """Одна каса чи менеджер: власне з'єднання, cookie сесії, свої заміри."""
+
+    def __init__(self, port, username, info, rnd):
+        self.conn     = http.client.HTTPConnection(HOST, port, timeout=30)
+        self.cookie   = None
+        self.username = username
+        self.info     = info
+        self.rnd      = rnd
+        self.samples  = []              # (мітка часу, endpoint, мс, результат, мс БД)
+
+    def request(self, endpoint, method, path, form=None):
+        """Повертає (статус, Location, тіло) або None, якщо з'єднання впало."""
+        headers = {'Cookie': self.cookie} if self.cookie else {}
+        body = None
+        if form is not None:
+            body = urlencode(form)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        t0 = time.perf_counter()
+        try:
+            self.conn.request(method, path, body, headers)
+            resp = self.conn.getresponse()
+            data = resp.read().decode('utf-8', 'replace')
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.samples.append((t0, endpoint, (time.perf_counter() - t0) * 1000,
+                                 'error', None))
+            return None
+        elapsed = (time.perf_counter() - t0) * 1000
+        cookie = resp.getheader('Set-Cookie')
+        if cookie:
+            self.cookie = cookie.split(';', 1)[0]
+        location = resp.getheader('Location', '')
+        db_ms    = resp.getheader('X-DB-Time-ms')
+        self.samples.append((t0, endpoint, elapsed,
+                             _outcome(endpoint, resp.status, location, data),
+                             float(db_ms) if db_ms else None))
+        return resp.status, location, data
+
+    def login(self, role):
+        result = self.request('auth.login', 'POST', '/auth/login',
+                              {'username': self.username, 'password': PASSWORD})
+        return result is not None and result[1].endswith(f'/{role}/dashboard')
+
+    # ── суміші ────────────────────────────────────────────────────────
+    def cashier_step(self, endpoint):
+        rnd = self.rnd
+        if endpoint == 'cashier.products':
+            params = {'sort_by': rnd.choice(('name', 'price', 'quantity'))}
+            if rnd.random() < 0.3:
+                params['category'] = rnd.choice(self.info['categories'])
+            if rnd.random() < 0.2:
+                params['search'] = rnd.choice(datagen.PRODUCT_WORDS)
+            self.request(endpoint, 'GET', '/cashier/products?' + urlencode(params))
+        elif endpoint == 'cashier.create_receipt':
+            items = rnd.sample(self.info['upcs'], rnd.randint(1, 6))
+            form = {}
+            for i, upc in enumerate(items, 1):
+                form[f'upc_{i}'] = upc
+                form[f'qty_{i}'] = rnd.randint(1, 3)
+            self.request(endpoint, 'POST', '/cashier/create_receipt', form)
+        else:
+            self.request(endpoint, 'GET', '/cashier/my_receipts')
+
+    def manager_step(self, endpoint):
+        if endpoint == 'manager.dashboard':
+            self.request(endpoint, 'GET', '/manager/dashboard')
+        elif endpoint == 'manager.statistics':
+            period = self.rnd.choice(('day', '7d', 'month'))
+            self.request(endpoint, 'GET', '/manager/statistics?period=' + period)
+        else:
+            period = self.rnd.choice(('day', '7d'))
+            self.request(endpoint, 'GET', '/manager/receipts?period=' + period)
+
+
+def _outcome(endpoint, status, location, body) -> str:
+    """'ok' | 'contention' | 'error' для однієї відповіді."""
+    if status >= 500:
+        return 'contention' if any(m in body for m in CONTENTION) else 'error'
+    if status >= 400 or '/auth/login' in location:
+        return 'error'                          # сесію втрачено
+    if endpoint == 'auth.login':
+        return 'ok' if status == 302 else 'error'
+    if endpoint == 'cashier.create_receipt':
+        if status == 302:
+            return 'ok'
+        # форма повернулась з повідомленням про відмову
+        return 'contention' if any(m in body for m in CONTENTION) else 'error'
+    return 'ok' if status == 200 else 'error'
+
+
+def _run_session(session, role, stop, think, attempts=3):
+    # вхід теж під навантаженням — кілька спроб, інакше сесія не бере участі
+    for _ in range(attempts):
+        if stop.is_set():
+            return
+        if session.login(role):
+            break
+    else:
+        return
+    mix   = CASHIER_MIX if role == 'cashier' else MANAGER_MIX
+    names = list(mix)
+    step  = session.cashier_step if role == 'cashier' else session.manager_step
+    while not stop.is_set():
+        step(session.rnd.choices(names, weights=[mix[n] for n in names])[0])
+        if think:
+            time.sleep(session.rnd.expovariate(1 / think))
+
+
+# ───────────────────────── звіт ─────────────────────────
+def _pct(sorted_ms, q):
+    return sorted_ms[min(len(sorted_ms) - 1, int(len(sorted_ms) * q))]
+
+
+def summarize(samples, since, duration) -> dict:
+    by_endpoint = defaultdict(list)
+    for t0, endpoint, ms, outcome, db_ms in samples:
+        if t0 >= since:
+            by_endpoint[endpoint].append((ms, outcome, db_ms))
+            by_endpoint['ВСЬОГО'].append((ms, outcome, db_ms))
+
+    report = {}
+    for endpoint, rows in sorted(by_endpoint.items(), key=lambda kv: kv[0] == 'ВСЬОГО'):
+        ms = sorted(r[0] for r in rows)
+        db = sorted(r[2] for r in rows if r[2] is not None)
+        n  = len(rows)
+        errors     = sum(r[1] != 'ok' for r in rows)
+        contention = sum(r[1] == 'contention' for r in rows)
+        report[endpoint] = {
+            'requests':   n,
+            'rps':        round(n / duration, 1),
+            'p50':        round(_pct(ms, 0.50), 2),
+            'p95':        round(_pct(ms, 0.95), 2),
+            'p99':        round(_pct(ms, 0.99), 2),
+            'error_rate': round(errors / n, 4),
+            'contention_rate': round(contention / n, 4),
+            'db_p50':     round(_pct(db, 0.50), 2) if db else None,
+        }
+    return report
+
+
+def _print(report):
+    print(f"\n{'endpoint':<24} {'запитів':>8} {'запит/с':>8} {'p50, мс':>8} "
+          f"{'p95, мс':>8} {'p99, мс':>8} {'помилки':>8} {'блокув.':>8} {'БД p50':>7}")
+    for endpoint, r in report.items():
+        db = f"{r['db_p50']:>7.2f}" if r['db_p50'] is not None else f"{'—':>7}"
+        print(f"{endpoint:<24} {r['requests']:>8} {r['rps']:>8.1f} {r['p50']:>8.1f} "
+              f"{r['p95']:>8.1f} {r['p99']:>8.1f} {r['error_rate']:>8.2%} "
+              f"{r['contention_rate']:>8.2%} {db}")
+
+
+def _db_status(port) -> dict:
+    conn = http.client.HTTPConnection(HOST, port, timeout=10)
+    try:
+        conn.request('GET', '/db-status')
+        return json.loads(conn.getresponse().read())
+    except (OSError, http.client.HTTPException, ValueError):
+        return {}
+    finally:
+        conn.close()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def _parse_overrides(pairs) -> dict:
+    """KEY=VALUE → {KEY: значення}; VALUE читається як JSON, інакше — рядок."""
+    result = {}
+    for pair in pairs:
+        key, _, value = pair.partition('=')
+        try:
+            result[key] = json.loads(value)
+        except ValueError:
+            result[key] = value
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--cashiers', type=int, default=16, help='сесій кас')
+    parser.add_argument('--managers', type=int, default=4, help='сесій менеджерів')
+    parser.add_argument('--duration', type=float, default=30, help='секунд заміру')
+    parser.add_argument('--warmup', type=float, default=5, help='секунд прогріву')
+    parser.add_argument('--think', type=float, default=0,
+                        help='середня пауза між запитами сесії, с (0 — без пауз)')
+    parser.add_argument('--lines', type=int, default=100_000,
+                        help='рядків Sale у синтетичній базі')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help='ключ конфігурації застосунку (можна кілька)')
+    parser.add_argument('--json', help='зберегти підсумок у файл')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    overrides = _parse_overrides(args.set)
+
+    if args.serve:
+        serve(args, overrides)
+        return
+
+    # сервер — окремий процес, щоб клієнти не ділили з ним GIL
+    port = _free_port()
+    server_log = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+    cmd = [sys.executable, '-m', 'benchmarks.loadtest', '--serve',
+           '--port', str(port), '--lines', str(args.lines),
+           '--cashiers', str(args.cashiers), '--managers', str(args.managers)]
+    for pair in args.set:
+        cmd += ['--set', pair]
+    server = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=server_log,
+                              text=True, encoding='utf-8')
+    try:
+        line = server.stdout.readline()
+        if not line:
+            server_log.seek(0)
+            raise SystemExit("сервер не запустився:\n" + server_log.read())
+        info = json.loads(line)
+
+        rnd, stop, sessions, threads = random.Random(args.seed), threading.Event(), [], []
+        for role in ('cashier', 'manager'):
+            for username in info['users'][role]:
+                session = Session(port, username, info, random.Random(rnd.random()))
+                sessions.append(session)
+                threads.append(threading.Thread(
+                    target=_run_session, args=(session, role, stop, args.think),
+                    daemon=True
+                ))
+
+        print(f"сесій: {args.cashiers} кас + {args.managers} менеджерів, "
+              f"прогрів {args.warmup:g} с, замір {args.duration:g} с")
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        time.sleep(args.warmup + args.duration)
+        stop.set()
+        for t in threads:
+            t.join()
+        since = started + args.warmup
+
+        samples = [s for session in sessions for s in session.samples
+                   if s[0] < since + args.duration]
+        report  = summarize(samples, since, args.duration)
+        status  = _db_status(port)
+    finally:
+        server.terminate()
+        server.wait()
+
+    # 500 без тексту причини не розрізнити на клієнті — рахуємо за журналом
+    # сервера (за весь прогін, разом із прогрівом)
+    server_log.seek(0)
+    log = server_log.read()
+    server_errors = {label: log.count(marker)
+                     for marker, label in SERVER_MARKERS.items()}
+
+    _print(report)
+    print("\nжурнал сервера: " + ", ".join(f"{k}: {v}" for k, v in server_errors.items()))
+    for key in ('pool', 'checkout'):
+        if key in status:
+            print(f"{key}: {json.dumps(status[key], ensure_ascii=False)}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'params': vars(args), 'endpoints': report,
+                       'server_log': server_errors,
+                       'db_status': status},
+                      f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Спільні фікстури тестів: застосунок на тимчасовій SQLite-базі
+з невеликим синтетичним магазином (app.services.datagen), а також
+backend_app — той самий магазин на SQLite і на PostgreSQL.
+
+Пул з'єднань, блоки ID, кеш звітів і черга чеків живуть на рівні процесу,
+тож між тестами їх скидаємо — кожен застосунок бачить лише свою базу.
+
+PostgreSQL: сервер з ZLAGODA_TEST_PG_URL (будь-яка база, де можна
+CREATE DATABASE), інакше — тимчасовий локальний сервер пакета pgserver.
+Якщо немає ні того, ні іншого, PostgreSQL-варіанти тестів пропускаються.
+"""
+
+import os
+from datetime import date
+
+import pytest
+
+from app.services import datagen
+from app.utils.db import get_db
+
+from benchmarks.fixtures import (
+    make_schema, make_app, drop_database, make_pg_database, drop_pg_database
+)
+
+
+END = date(2025, 6, 30)          # останній день синтетичної історії
+
+# невеликий магазин: швидко будується, але всі таблиці не порожні
+SMALL_STORE = dict(categories=5, products=60, employees=6, cards=40,
+                   lines=600, days=30, end=END, seed=7)
+
+
+def reset_process_state():
+    """Забуває пул, блоки ID, кеші й письменника чеків попереднього застосунку."""
+    from app.utils import db, identity, report_cache
+    from app.services import id_allocator, checkout_queue
+
+    for name in ('_pool', '_aux_pool'):
+        pool = getattr(db, name)
+        if pool is not None:
+            pool.close_all()
+            setattr(db, name, None)
+    id_allocator._blocks.clear()
+    report_cache._cache.clear()
+    identity._cache.clear()
+    checkout_queue._writer = None
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Застосунок на SQLite-базі з SMALL_STORE."""
+    path = make_schema(str(tmp_path / 'zlagoda.db'))
+    reset_process_state()
+    application = make_app(path, SLOW_QUERY_MS=float('inf'))
+    with application.app_context():
+        datagen.generate(**SMALL_STORE)
+    yield application
+    reset_process_state()
+    drop_database(path)
+
+
+@pytest.fixture(scope='session')
+def pg_server(tmp_path_factory):
+    """Рядок підключення до сервера PostgreSQL для тимчасових баз."""
+    url = os.environ.get('ZLAGODA_TEST_PG_URL')
+    if url:
+        yield url           # явно вказаний сервер: недоступність — помилка
+        return
+    try:
+        import psycopg      # noqa: F401
+        import pgserver
+    except ImportError:
+        pytest.skip("PostgreSQL недоступний: задайте ZLAGODA_TEST_PG_URL "
+                    "або встановіть pgserver (requirements-dev.txt)")
+    server = pgserver.get_server(tmp_path_factory.mktemp('pgdata'),
+                                 cleanup_mode='stop')
+    yield server.get_uri()
+    server.cleanup()
+
+
+@pytest.fixture(params=['sqlite', 'postgres'])
+def backend_app(request, tmp_path):
+    """Застосунок із SMALL_STORE на кожному з бекендів (DB_BACKEND)."""
+    if request.param == 'postgres':
+        server = request.getfixturevalue('pg_server')
+        url = make_pg_database(server)
+        reset_process_state()
+        application = make_app(None, DB_BACKEND='postgres', DB_URL=url,
+                               SLOW_QUERY_MS=float('inf'))
+        drop = lambda: drop_pg_database(url)
+    else:
+        path = make_schema(str(tmp_path / 'zlagoda.db'))
+        reset_process_state()
+        application = make_app(path, SLOW_QUERY_MS=float('inf'))
+        drop = lambda: drop_database(path)
+    with application.app_context():
+        datagen.generate(**SMALL_STORE)
+    yield application
+    reset_process_state()
+    drop()
+
+
+@pytest.fixture
+def ctx(app):
+    """Контекст застосунку на час тесту."""
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def bctx(backend_app):
+    """Контекст застосунку backend_app на час тесту."""
+    with backend_app.app_context():
+        yield backend_app
+
+
+def one(sql, *params):
+    """Перший рядок запиту в поточному контексті."""
+    cur = get_db().cursor()
+    cur.execute(sql, params)
+    return cur.fetchone()
@@ -0,0 +1,213 @@
+"""
+Основні шляхи DAO на обох бекендах (DB_BACKEND = 'sqlite' / 'postgres'):
+міграції, читання для сторінок і звітів, оформлення й видалення чеків,
+видача ID. SQL у DAO пишеться діалектом PostgreSQL і перекладається для
+SQLite — тож помилка лише одного з діалектів падає тут.
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from app.dao import (
+    category_dao, check_dao, customer_card_dao, employee_dao, product_dao,
+    product_type_dao, report_dao, rollup_dao, sale_dao, store_product_dao
+)
+from app.services.checkout_queue import place_check
+from app.services import id_allocator
+from app.services.money import basket_totals
+from app.services.pricing import price_promo
+from app.utils import db
+from app.utils.db import get_db, backend
+from app.utils.migrations import MIGRATIONS
+
+from .conftest import END, one
+
+
+MONTH = (END - timedelta(days=29), END)
+
+
+def _stocked_upcs(n):
+    cur = get_db().cursor()
+    cur.execute("SELECT UPC FROM Store_Product WHERE products_number >= 5 "
+                "ORDER BY UPC LIMIT %s", (n,))
+    upcs = [r[0] for r in cur.fetchall()]
+    assert len(upcs) == n
+    return upcs
+
+
+def test_migrations_applied(bctx):
+    cur = get_db().cursor()
+    cur.execute("SELECT name FROM schema_migrations ORDER BY name")
+    assert [r[0] for r in cur.fetchall()] == sorted(n for n, _ in MIGRATIONS)
+
+
+def test_read_paths(bctx):
+    cashier = one('SELECT id_employee FROM "check" LIMIT 1')[0]
+    check   = one('SELECT check_number FROM "check" LIMIT 1')[0]
+    upc     = one('SELECT UPC FROM Sale LIMIT 1')[0]
+    surname = one('SELECT cust_surname FROM Customer_Card LIMIT 1')[0]
+
+    assert product_dao.count_store_products() == 60
+    assert product_dao.count_product_types() == 60
+    assert product_dao.get_products_page()
+    assert product_dao.lookup_products('товар')
+    assert product_dao.lookup_products(upc, limit=1)[0]['upc'] == upc
+    assert product_dao.get_all_product_types()
+    assert customer_card_dao.lookup_cards(surname[:3])
+    assert customer_card_dao.lookup_cards('C')
+    assert employee_dao.get_all_employees()
+    assert category_dao.get_all_categories()
+    assert store_product_dao.get_store_product_by_upc(upc)['upc'] == upc
+    assert len(store_product_dao.get_all_store_products()) == 60
+
+    details = check_dao.get_check_details(check)
+    assert details['items'] and details['header']['total'] > 0
+    assert check_dao.get_checks_all_period(*MONTH)
+    assert check_dao.get_checks_by_employee_period(cashier, *MONTH)
+    assert check_dao.get_total_sales_by_cashier_period(cashier, *MONTH)
+    assert check_dao.get_quantity_sold_period(upc, *MONTH)
+    assert check_dao.get_all_checks()
+
+    assert report_dao.categories_sold_by_cashier()
+    assert report_dao.category_price_stats(1)
+    assert report_dao.top_products_period(*MONTH)
+    report_dao.categories_without_promos(1)
+    report_dao.cashiers_every_check_has_category(
+        category_dao.get_all_categories()[0]['name'])
+
+
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_products_paging_every_sort_key(bctx, order):
+    """Курсори всіх ключів сортування (зокрема NUMERIC-ціни) вперед і назад."""
+    for sort_by in product_dao._PRODUCT_COLS:
+        pages, page = [], product_dao.get_products_page(sort_by, order, limit=7)
+        while True:
+            pages.append([p['upc'] for p in page['items']])
+            if page['next'] is None:
+                break
+            page = product_dao.get_products_page(sort_by, order,
+                                                 after=page['next'], limit=7)
+        seen = [upc for items in pages for upc in items]
+        assert sorted(seen) == sorted(set(seen)) and len(seen) == 60, sort_by
+
+        back = []
+        while page['prev'] is not None:
+            page = product_dao.get_products_page(sort_by, order,
+                                                 before=page['prev'], limit=7)
+            back.append([p['upc'] for p in page['items']])
+        assert back == pages[-2::-1], sort_by
+
+
+def test_checkout_and_deletes(bctx):
+    cashier = one("SELECT id_employee FROM Employee "
+                  "WHERE empl_role = 'cashier' LIMIT 1")[0]
+    card    = one("SELECT card_number FROM Customer_Card LIMIT 1")[0]
+    upcs    = _stocked_upcs(3)
+    before  = {u: store_product_dao.get_store_product_by_upc(u)['quantity']
+               for u in upcs}
+
+    number = place_check(cashier, card, [{'upc': u, 'qty': 2} for u in upcs])
+    details = check_dao.get_check_details(number)
+    assert {i['upc'] for i in details['items']} == set(upcs)
+    assert details['header']['card'] == card
+    for u in upcs:
+        assert (store_product_dao.get_store_product_by_upc(u)['quantity']
+                == before[u] - 2)
+    assert rollup_dao.verify_rollups() == {'sales_daily_cashier': 0,
+                                           'sales_daily_upc': 0}
+
+    assert sale_dao.delete_sale(upcs[0], number)
+    assert not sale_dao.delete_sale(upcs[0], number)
+    details = check_dao.get_check_details(number)
+    assert len(details['items']) == 2
+    # збережені підсумки й sum_total — за тими ж рядками, що лишилися
+    head = details['header']
+    t = basket_totals([i['price'] for i in details['items']],
+                      [i['qty'] for i in details['items']], head['disc'])
+    assert ((head['total'], head['subtotal'], head['discount'], head['vat'])
+            == (t.total, t.subtotal, t.discount, t.vat))
+    assert rollup_dao.verify_rollups() == {'sales_daily_cashier': 0,
+                                           'sales_daily_upc': 0}
+    assert check_dao.delete_check(number)
+    assert check_dao.get_check_details(number) is None
+    assert rollup_dao.verify_rollups() == {'sales_daily_cashier': 0,
+                                           'sales_daily_upc': 0}
+
+    with pytest.raises(ValueError):
+        place_check(cashier, None, [{'upc': upcs[0], 'qty': 10**6}])
+
+
+def test_promo_price_in_kopecks(bctx):
+    product = one("SELECT MIN(id_product) FROM Product")[0]
+    ok, upc = store_product_dao.create_store_product(
+        product, 10.03, 5, END.isoformat())      # термін минає — акція
+    assert ok
+    item = store_product_dao.get_store_product_by_upc(upc)
+    assert item['promotional'] and item['price'] == 8.02
+    assert product_dao.lookup_products(upc)[0]['price'] == price_promo(1003) == 802
+    assert all(isinstance(p['price'], int)
+               for p in product_dao.get_products_page()['items'])
+    checks = check_dao.get_all_checks()
+    assert all(isinstance(c['total'], int) for c in checks)
+    for c in checks[:20]:
+        assert c['total'] == check_dao.get_check_details(c['number'])['header']['total']
+
+
+def test_id_allocation(bctx):
+    cat = category_dao.create_category('Тестова категорія')
+    assert category_dao.get_category(cat)
+    first  = product_type_dao.create_product_type('Тип 1', 'Тестова категорія')
+    second = product_type_dao.create_product_type('Тип 2', 'Тестова категорія')
+    assert first != second
+    assert product_type_dao.get_product_type_by_id(second)
+    card = customer_card_dao.generate_card_number()
+    assert not customer_card_dao.lookup_cards(card)
+
+
+def test_id_refill_with_exhausted_pool(bctx):
+    """Резерв блоку ID не чекає на пул запитів, навіть коли той вичерпано."""
+    get_db()
+    pool = db._pool
+    held = [pool.acquire() for _ in range(pool.size - 1)]
+    try:
+        id_allocator._blocks.clear()
+        first = id_allocator.next_category_number()
+        assert id_allocator.next_product_id()
+        assert id_allocator.next_category_number() == first + 1
+    finally:
+        for conn in held:
+            pool.release(conn)
+
+
+def test_upc_sequence_overflow_is_rejected(bctx):
+    assert len(id_allocator.format_upc(10**11 - 1)) == 12
+    conn = get_db()
+    conn.cursor().execute("UPDATE id_sequence SET next_value = %s "
+                          "WHERE name = 'upc'", (10**11,))
+    conn.commit()
+    id_allocator._blocks.clear()
+    with pytest.raises(ValueError, match="'upc' вичерпано"):
+        id_allocator.next_upc()
+
+
+def test_id_refill_keeps_caller_transaction(bctx):
+    """Резерв нового блоку ID не комітить і не відкочує транзакцію запиту."""
+    conn = get_db()
+    cur  = conn.cursor()
+    id_allocator._blocks.clear()            # наступний next_value — резерв
+    if backend() == 'postgres':
+        cur.execute("INSERT INTO Category (category_number, category_name) "
+                    "VALUES (%s, %s)", (10**6, 'Незакомічена'))
+        id_allocator.next_category_number()
+        conn.rollback()
+        assert one("SELECT COUNT(*) FROM Category "
+                   "WHERE category_number = %s", 10**6)[0] == 0
+    else:
+        # на SQLite запис тримав би блокування, потрібне резерву, —
+        # перевіряємо, що відкрита транзакція читання пережила резерв
+        cur.execute("BEGIN")
+        cur.execute("SELECT COUNT(*) FROM Category")
+        id_allocator.next_category_number()
+        assert conn._conn.in_transaction
+        conn.rollback()
@@ -0,0 +1,79 @@
+"""
+Автодоповнення карток (customer_card_dao.lookup_cards): префікс номера
+та префікс прізвища незалежно від регістру, у якому його набрано й
+у якому його збережено (зокрема в картках, старших за міграцію 0004).
+"""
+
+import sqlite3
+
+import pytest
+
+from app.dao.customer_card_dao import lookup_cards, create_card
+
+from benchmarks.fixtures import (
+    make_schema, make_app, drop_database, make_pg_database, drop_pg_database
+)
+
+from .conftest import one, reset_process_state
+
+
+def test_bare_card_letter_is_card_prefix(ctx):
+    found = lookup_cards('C', limit=5)
+    assert len(found) == 5
+    assert all(c['number'].startswith('C') for c in found)
+    assert lookup_cards('c', limit=5) == found
+
+
+def test_surname_prefix_ignores_case(ctx):
+    surname = one("SELECT cust_surname FROM Customer_Card "
+                  "ORDER BY card_number LIMIT 1")[0]
+    prefix = surname[:4]
+    expected = lookup_cards(prefix)
+    assert expected
+    for typed in (prefix.lower(), prefix.upper(), prefix.swapcase()):
+        assert lookup_cards(typed) == expected
+
+
+def test_surname_stored_as_entered(ctx):
+    create_card('C999999999999', 'McDonald-ПЕТРЕНКО', 'Олена', None,
+                '+380501234567', None, None, None, 5)
+    assert one("SELECT cust_surname FROM Customer_Card WHERE card_number=%s",
+               'C999999999999')[0] == 'McDonald-ПЕТРЕНКО'
+    for typed in ('mcdonald-п', 'MCDONALD-П', 'McDonald'):
+        assert [c['number'] for c in lookup_cards(typed)] == ['C999999999999']
+
+
+@pytest.fixture(params=['sqlite', 'postgres'])
+def legacy_app(request, tmp_path):
+    """
+    База з карткою, внесеною до міграцій (прізвище в довільному регістрі):
+    ключ пошуку їй заповнює міграція 0004.
+    """
+    insert = ("INSERT INTO Customer_Card (card_number, cust_surname, "
+              "cust_name, percent) VALUES ('C000000000777', 'мАКДОНАЛЬД', "
+              "'Ян', 3)")
+    if request.param == 'postgres':
+        import psycopg
+        url = make_pg_database(request.getfixturevalue('pg_server'))
+        with psycopg.connect(url) as conn:
+            conn.execute(insert)
+        reset_process_state()
+        yield make_app(None, DB_BACKEND='postgres', DB_URL=url)
+        reset_process_state()
+        drop_pg_database(url)
+    else:
+        path = make_schema(str(tmp_path / 'legacy.db'))
+        with sqlite3.connect(path) as conn:
+            conn.execute(insert)
+        conn.close()
+        reset_process_state()
+        yield make_app(path)
+        reset_process_state()
+        drop_database(path)
+
+
+def test_legacy_mixed_case_surname_found(legacy_app):
+    with legacy_app.app_context():
+        assert one("SELECT cust_surname FROM Customer_Card")[0] == 'мАКДОНАЛЬД'
+        for typed in ('Макд', 'макдональд', 'МАКДОНАЛЬД'):
+            assert [c['number'] for c in lookup_cards(typed)] == ['C000000000777']
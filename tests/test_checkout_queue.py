@@ -0,0 +1,77 @@
+"""
+Тайм-аут каси в черзі чеків (app/services/checkout_queue.py): замовлення,
+що ще чекає в черзі, скасовується й не записується; те, що вже
+проводиться, дає CheckoutStatusUnknown і все одно комітиться.
+"""
+
+import threading
+
+import pytest
+
+from app.services import checkout_queue
+from app.services.checkout_queue import (
+    place_check, get_writer, CheckoutBusy, CheckoutStatusUnknown
+)
+
+from .conftest import one
+
+
+@pytest.fixture
+def gate(ctx, monkeypatch):
+    """write_check, що чекає на gate.set(); started — письменник узяв чек."""
+    gate, started = threading.Event(), threading.Event()
+    real = checkout_queue.write_check
+
+    def held(cur, *args):
+        started.set()
+        assert gate.wait(5)
+        return real(cur, *args)
+
+    monkeypatch.setattr(checkout_queue, 'write_check', held)
+    ctx.config['CHECKOUT_TIMEOUT'] = 0.2
+    gate.started = started
+    yield gate
+    gate.set()
+
+
+def _order():
+    cashier = one("SELECT id_employee FROM Employee "
+                  "WHERE empl_role = 'cashier' LIMIT 1")[0]
+    upc = one("SELECT UPC FROM Store_Product WHERE products_number >= 10 "
+              "ORDER BY UPC LIMIT 1")[0]
+    return cashier, None, [{'upc': upc, 'qty': 1}]
+
+
+def _checks():
+    return one('SELECT COUNT(*) FROM "check"')[0]
+
+
+def _drain(order):
+    """Чек «за» усіма попередніми: коли він готовий, черга оброблена."""
+    return get_writer().submit(*order).result(timeout=5)
+
+
+def test_queued_job_is_cancelled_on_timeout(gate):
+    order, before = _order(), _checks()
+    first = get_writer().submit(*order)
+    assert gate.started.wait(5)
+
+    with pytest.raises(CheckoutBusy):
+        place_check(*order)                 # стоїть у черзі за першим
+
+    gate.set()
+    first.result(timeout=5)
+    _drain(order)
+    assert _checks() == before + 2          # скасований не записано
+    assert get_writer().stats()['cancelled'] == 1
+
+
+def test_running_job_reports_unknown_status(gate):
+    order, before = _order(), _checks()
+    with pytest.raises(CheckoutStatusUnknown):
+        place_check(*order)                 # уже в write_check
+
+    gate.set()
+    _drain(order)
+    assert _checks() == before + 2          # той чек усе ж закомічено
+    assert get_writer().stats()['cancelled'] == 0
@@ -0,0 +1,32 @@
+"""
+POST /manager/db/checkpoint: за замовчуванням — режим планувальника
+(PASSIVE), інші режими — лише з WAL_CHECKPOINT_HTTP_MODES.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def manager(app):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'], sess['user_role'] = 1, 'manager'
+    return client
+
+
+def test_default_mode_is_passive(manager):
+    resp = manager.post('/manager/db/checkpoint')
+    assert resp.status_code == 200
+    assert resp.get_json()['mode'] == 'PASSIVE'
+
+
+@pytest.mark.parametrize('mode', ['truncate', 'RESTART', 'bogus'])
+def test_modes_outside_whitelist_rejected(manager, mode):
+    resp = manager.post('/manager/db/checkpoint', data={'mode': mode})
+    assert resp.status_code == 400
+
+
+def test_whitelisted_mode_accepted(manager):
+    resp = manager.post('/manager/db/checkpoint', data={'mode': 'full'})
+    assert resp.status_code == 200
+    assert resp.get_json()['mode'] == 'FULL'
@@ -0,0 +1,82 @@
+"""
+Журнал запитів (app/utils/query_log.py): час вибірки входить у підсумок,
+а сам журнал обмежений QUERY_LOG_KEEP записами.
+"""
+
+import re
+
+from flask import g
+
+from app.dao.export_dao import iter_export
+from app.utils import query_log
+from app.utils.db import get_db, backend
+
+
+def test_fetch_time_and_rows_are_counted(ctx):
+    query_log.reset()
+    rows = sum(1 for _ in iter_export('checks', batch=50)) - 1     # без заголовків
+
+    (entry,) = g.query_log
+    assert entry['rows'] == rows > 50                 # кілька порцій fetchmany
+    assert entry['fetch_ms'] > 0
+    assert entry['ms'] >= entry['fetch_ms']
+    assert query_log.summary() == {'count': 1, 'ms': entry['ms']}
+
+
+def test_log_keeps_only_slowest_entries(ctx):
+    ctx.config['QUERY_LOG_KEEP'] = 5
+    query_log.reset()
+    cur = get_db().cursor()
+    for _ in range(40):
+        cur.execute("SELECT 1")
+        cur.fetchone()
+    cur.execute('SELECT COUNT(*) FROM Sale JOIN "check" USING (check_number)')
+    cur.fetchone()
+
+    assert query_log.summary()['count'] == 41
+    assert len(g.query_log) <= 2 * 5
+    assert g.query_log[-1]['sql'].startswith('SELECT COUNT(*)')
+    assert query_log.summary()['ms'] >= sum(e['ms'] for e in g.query_log)
+
+
+def _uncommitted_category(cur):
+    cur.execute("INSERT INTO Category (category_number, category_name) "
+                "VALUES (%s, %s)", (10**6, 'Незакомічена'))
+
+
+def _category_saved(cur):
+    cur.execute("SELECT COUNT(*) FROM Category WHERE category_number = %s",
+                (10**6,))
+    return cur.fetchone()[0] == 1
+
+
+def _not_dml():
+    return ('PRAGMA user_version' if backend() == 'sqlite'
+            else 'SHOW search_path')
+
+
+def test_slow_non_dml_is_not_explained(bctx, caplog):
+    bctx.config['SLOW_QUERY_MS'] = 0
+    conn = get_db()
+    cur  = conn.cursor()
+    _uncommitted_category(cur)
+    cur.execute(_not_dml())
+    cur.fetchall()
+    assert 'EXPLAIN лише для' in caplog.text
+    conn.commit()                           # транзакція викликача ціла
+    assert _category_saved(cur)
+
+
+def test_failed_explain_keeps_caller_transaction(bctx, caplog, monkeypatch):
+    # EXPLAIN для не-DML гарантовано падає — транзакція має це пережити
+    monkeypatch.setattr(query_log, '_EXPLAINABLE_RE', re.compile(''))
+    bctx.config['SLOW_QUERY_MS'] = 0
+    conn = get_db()
+    cur  = conn.cursor()
+    _uncommitted_category(cur)
+    cur.execute(_not_dml())
+    cur.fetchall()
+    if backend() == 'postgres':           # SQLite дає порожній план
+        assert 'план недоступний' in caplog.text
+    conn.commit()
+    assert _category_saved(cur)
@@ -0,0 +1,83 @@
+"""
+Плани гарячих запитів DAO: індекси з міграцій 0001 / 0002 / 0004 мають
+використовуватися. Тест ганяє саму DAO-функцію, перехоплює виконаний SQL
+і перевіряє EXPLAIN QUERY PLAN — тож правка SQL, що повертає повний
+перегляд таблиці, впаде тут, а не на продакшн-базі.
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from app.dao import check_dao, customer_card_dao
+from app.utils.db import get_db, SQLiteCursorWrapper
+
+from .conftest import END, one
+
+
+@pytest.fixture
+def executed(monkeypatch):
+    """Список (SQL у діалекті SQLite, параметри) усіх виконаних інструкцій."""
+    calls = []
+    original = SQLiteCursorWrapper.execute
+
+    def spy(self, sql, params=None):
+        calls.append((self._translate(sql), params))
+        return original(self, sql, params)
+
+    monkeypatch.setattr(SQLiteCursorWrapper, 'execute', spy)
+    return calls
+
+
+def query_plan(sql, params) -> str:
+    rows = get_db()._conn.execute("EXPLAIN QUERY PLAN " + sql,
+                                  params or ()).fetchall()
+    return " | ".join(r[-1] for r in rows)     # кроки плану через « | »
+
+
+def _sample():
+    cashier = one('SELECT id_employee FROM "check" GROUP BY id_employee '
+                  'ORDER BY COUNT(*) DESC LIMIT 1')[0]
+    check = one('SELECT check_number FROM "check" ORDER BY check_number LIMIT 1')[0]
+    upc   = one('SELECT UPC FROM Sale GROUP BY UPC ORDER BY COUNT(*) DESC LIMIT 1')[0]
+    return cashier, check, upc
+
+
+MONTH = (END - timedelta(days=29), END)
+
+# назва → (виклик DAO, підрядок SQL потрібної інструкції, очікуваний індекс)
+CASES = {
+    'checks_all_period': (
+        lambda s: check_dao.get_checks_all_period(*MONTH),
+        'FROM "check"', 'ix_check_print_date'),
+    'checks_by_employee_period': (
+        lambda s: check_dao.get_checks_by_employee_period(s[0], *MONTH),
+        'FROM "check"', 'ix_check_employee_print_date'),
+    'check_details_lines': (
+        lambda s: check_dao.get_check_details(s[1]),
+        'FROM Sale', 'ix_sale_check_number'),
+    'quantity_sold_by_upc_and_date': (
+        lambda s: check_dao.get_quantity_sold_period(s[2], *MONTH),
+        'FROM sales_daily_upc', 'sqlite_autoindex_sales_daily_upc_1'),
+    'total_by_cashier_and_date': (
+        lambda s: check_dao.get_total_sales_by_cashier_period(s[0], *MONTH),
+        'FROM sales_daily_cashier', 'ix_sales_daily_cashier_empl'),
+    'card_surname_lookup': (
+        lambda s: customer_card_dao.lookup_cards('Ковал'),
+        'FROM Customer_Card', 'ix_card_surname_key'),
+}
+
+
+@pytest.mark.parametrize('name', CASES)
+def test_hot_query_uses_index(ctx, executed, name):
+    call, marker, index = CASES[name]
+    sample = _sample()
+    executed.clear()
+    call(sample)
+
+    statements = [(sql, p) for sql, p in executed if marker in sql]
+    assert statements, f"{name}: не виконано жодного запиту з {marker!r}"
+    plan = query_plan(*statements[0])
+    assert index in plan, f"{name}: {index} не використано, план: {plan}"
+    # жодного повного перегляду таблиці (SCAN) у жодному кроці плану
+    assert not any(step.startswith('SCAN') for step in plan.split(' | ')), plan
@@ -0,0 +1,118 @@
+"""
+Кеш звітів (app/utils/report_cache.py) під потоком чеків: покоління
+таблиць збільшуються раз на пакет черги, а не на кожен рядок Sale,
+тож звіти між пакетами віддаються з кешу.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.dao import category_dao, check_dao, report_dao
+from app.services.checkout_queue import place_check, get_writer
+from app.utils import db, report_cache
+from app.utils.db import get_db
+
+from .conftest import one
+
+CHECKOUTS = 60
+
+
+def _gens():
+    return dict(zip(('sale', 'check', 'store_product', 'category'),
+                    report_cache.generations(
+                        ('sale', 'check', 'store_product', 'category'))))
+
+
+def _orders():
+    cashier = one("SELECT id_employee FROM Employee "
+                  "WHERE empl_role = 'cashier' LIMIT 1")[0]
+    cur = get_db().cursor()
+    cur.execute("SELECT UPC FROM Store_Product WHERE products_number >= %s "
+                "ORDER BY UPC LIMIT 3", (CHECKOUTS,))
+    lines = [{'upc': r[0], 'qty': 1} for r in cur.fetchall()]
+    assert len(lines) == 3
+    return [(cashier, None, lines)] * CHECKOUTS
+
+
+def _checkout_load(app, orders):
+    """Чеки з 8 потоків; повертає номери."""
+    def one_check(order):
+        with app.app_context():
+            return place_check(*order)
+    with ThreadPoolExecutor(8) as pool:
+        return list(pool.map(one_check, orders))
+
+
+def test_plain_write_no_longer_bumps(bctx):
+    before = _gens()
+    conn = get_db()
+    conn.cursor().execute("INSERT INTO Category (category_number, category_name) "
+                          "VALUES (%s, %s)", (10**6, 'Без bump'))
+    conn.commit()
+    assert _gens() == before                # лише bump(), без тригерів
+    report_cache.bump(conn.cursor(), 'category')
+    conn.rollback()                         # покоління — разом із записом
+    assert _gens() == before
+    report_cache.bump(conn.cursor(), 'category')
+    conn.commit()
+    assert _gens()['category'] == before['category'] + 1
+
+
+def test_bump_with_exhausted_pool(bctx):
+    """Запис із bump не бере другого з'єднання: вичерпаний пул не заважає."""
+    orders = _orders()
+    before = _gens()
+    get_db()
+    pool = db._pool
+    held = [pool.acquire() for _ in range(pool.size - 1)]
+    try:
+        category_dao.create_category('Під навантаженням')
+        number = check_dao.create_check(None, *orders[0])
+        assert check_dao.delete_check(number)
+    finally:
+        for conn in held:
+            pool.release(conn)
+    after = _gens()
+    assert after['category'] == before['category'] + 1
+    # create_check + delete_check; delete_check не чіпає Store_Product
+    assert [after[t] - before[t] for t in ('sale', 'check', 'store_product')
+            ] == [2, 2, 1]
+
+
+def test_generation_bumped_once_per_batch(bctx):
+    orders  = _orders()
+    writer  = get_writer()
+    batches = writer.stats()['batches']
+    before  = _gens()
+
+    assert len(set(_checkout_load(bctx, orders))) == CHECKOUTS
+
+    batches = writer.stats()['batches'] - batches
+    after   = _gens()
+    for name in ('sale', 'check', 'store_product'):
+        assert after[name] - before[name] == batches
+    assert after['category'] == before['category']
+    # 3 рядки Sale на чек: інкремент на рядок дав би 3 × CHECKOUTS
+    assert batches <= CHECKOUTS
+
+
+def test_cache_hits_under_checkout_load(bctx):
+    orders = _orders()
+    report_dao.category_price_stats(1)      # прогрів
+    start  = report_cache.stats()
+    done   = threading.Event()
+    worker = threading.Thread(
+        target=lambda: (_checkout_load(bctx, orders), done.set()))
+    worker.start()
+    calls = 0
+    while not done.is_set():
+        report_dao.category_price_stats(1)
+        calls += 1
+    worker.join()
+
+    st = report_cache.stats()
+    hits, misses = st['hits'] - start['hits'], st['misses'] - start['misses']
+    assert hits + misses == calls
+    assert hits > 0
+    # перерахунок — лише коли між викликами закомічено новий пакет
+    assert misses <= get_writer().stats()['batches']